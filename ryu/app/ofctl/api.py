@@ -22,6 +22,9 @@ from ryu.base import app_manager
 import event
 
 
+DEFAULT_STREAM_QUEUE_SIZE = 16
+
+
 def get_datapath(app, dpid):
     """
     Get datapath object by dpid.
@@ -67,4 +70,58 @@ def send_msg(app, msg, reply_cls=None, reply_multi=False):
                                                  reply_multi=reply_multi))()
 
 
+def iter_stats(app, msg, reply_cls, queue_size=DEFAULT_STREAM_QUEUE_SIZE):
+    """
+    Send a multipart request and iterate over the body of the replies.
+
+    :param app: Client RyuApp instance
+    :param msg: An OpenFlow multipart (stats) request message to send
+    :param reply_cls: OpenFlow message class for expected replies
+    :param queue_size: The number of reply messages which may be
+        queued for the caller.  The default is DEFAULT_STREAM_QUEUE_SIZE.
+
+    Returns an iterator which yields the body entries (e.g. OFPFlowStats)
+    of each reply message as soon as the message arrives, so that
+    the whole table is never held in memory.  The request is sent when
+    the iteration starts.  ofctl_service doesn't wait for the caller
+    but yields to it once it has queued queue_size messages; when the
+    caller is still queue_size messages behind, the rest of the
+    replies are dropped and StreamOverflow is raised after the queued
+    ones.  A caller which blocks between the items, e.g. on I/O, should
+    use a larger queue_size.
+
+    Raise an exception on error.  Errors are detected by a barrier
+    after all the replies, i.e. they are raised at the end of the
+    iteration.
+
+    Example::
+
+        import ryu.app.ofctl.api as api
+
+        msg = parser.OFPFlowStatsRequest(datapath=datapath)
+        packet_count = 0
+        for stats in api.iter_stats(self, msg,
+                                    reply_cls=parser.OFPFlowStatsReply):
+            packet_count += stats.packet_count
+    """
+    req = event.StreamMsgRequest(msg=msg, reply_cls=reply_cls,
+                                 queue_size=queue_size)
+    app.send_request(req)()
+    try:
+        while True:
+            reply = req.stream.get()()
+            if reply is None:
+                return
+            if isinstance(reply.body, list):
+                for stats in reply.body:
+                    yield stats
+            else:
+                yield reply.body
+    finally:
+        # stop queueing if the caller gave up in the middle
+        req.cancelled = True
+        while not req.stream.empty():
+            req.stream.get()
+
+
 app_manager.require_app('ryu.app.ofctl.service', api_style=True)
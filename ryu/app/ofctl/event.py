@@ -17,6 +17,7 @@
 import numbers
 
 from ryu.controller import event
+from ryu.lib import hub
 
 
 # base classes
@@ -49,6 +50,22 @@ class SendMsgRequest(_RequestBase):
         self.reply_multi = reply_multi
 
 
+# stream multipart replies
+
+class StreamMsgRequest(_RequestBase):
+    def __init__(self, msg, reply_cls, queue_size):
+        super(StreamMsgRequest, self).__init__()
+        self.msg = msg
+        self.reply_cls = reply_cls
+        self.reply_multi = True
+        self.queue_size = queue_size
+        # Reply for each reply message, followed by a Reply without
+        # result when done.  it's unbounded so that ofctl_service never
+        # blocks; the service fails the stream at queue_size instead.
+        self.stream = hub.Queue()
+        self.cancelled = False
+
+
 # generic reply
 
 class Reply(_ReplyBase):
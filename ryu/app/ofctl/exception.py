@@ -35,3 +35,9 @@ class OFError(_ExceptionBase):
     """OFPErrorMsg is received."""
 
     message = 'OpenFlow errors %(result)s'
+
+
+class StreamOverflow(_ExceptionBase):
+    """The caller of iter_stats fell queue_size reply messages behind."""
+
+    message = 'Stream overflow, %(result)s reply messages behind'
@@ -18,12 +18,14 @@
 
 import numbers
 
+from ryu import exception as ryu_exception
 from ryu.base import app_manager
 
 from ryu.controller import ofp_event
 from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER,\
     DEAD_DISPATCHER
 from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
 
 import event
 import exception
@@ -94,6 +96,16 @@ class OfctlService(app_manager.RyuApp):
         if info.datapath is datapath:
             self.logger.debug('forget info %s' % (info,))
             self._switches.pop(id)
+            # fail the requests still waiting for their barriers
+            for req in info.xids.values():
+                if req.reply_cls is not None:
+                    self._unobserve_msg(req.reply_cls)
+                exc = ryu_exception.OFPDatapathDisconnected(dpid=id)
+                rep = event.Reply(exception=exc)
+                if isinstance(req, event.StreamMsgRequest):
+                    self._stream_reply(req, rep)
+                else:
+                    self.reply_to_request(req, rep)
 
     @set_ev_cls(event.GetDatapathRequest, MAIN_DISPATCHER)
     def _handle_get_datapath(self, req):
@@ -107,7 +119,8 @@ class OfctlService(app_manager.RyuApp):
         rep = event.Reply(result=datapath)
         self.reply_to_request(req, rep)
 
-    @set_ev_cls(event.SendMsgRequest, MAIN_DISPATCHER)
+    @set_ev_cls([event.SendMsgRequest, event.StreamMsgRequest],
+                MAIN_DISPATCHER)
     def _handle_send_msg(self, req):
         if req.reply_cls is not None:
             self._observe_msg(req.reply_cls)
@@ -131,6 +144,26 @@ class OfctlService(app_manager.RyuApp):
         datapath.send_msg(msg)
         datapath.send_msg(barrier)
 
+        if isinstance(req, event.StreamMsgRequest):
+            # the replies follow on req.stream
+            self.reply_to_request(req, event.Reply())
+
+    def _stream_reply(self, req, rep):
+        if req.cancelled:
+            return
+        if rep.result is not None and req.stream.qsize() >= req.queue_size:
+            # this service may have handled its backlog of replies
+            # before the client could run.  let it catch up.
+            hub.sleep(0)
+        # never block this service, which is shared by every request
+        # and datapath, on a slow client.  fail its stream instead and
+        # ignore the rest of the replies.
+        if rep.result is not None and req.stream.qsize() >= req.queue_size:
+            req.cancelled = True
+            exc = exception.StreamOverflow(result=req.stream.qsize())
+            rep = event.Reply(exception=exc)
+        req.stream.put(rep)
+
     @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
     def _handle_barrier(self, ev):
         msg = ev.msg
@@ -151,6 +184,8 @@ class OfctlService(app_manager.RyuApp):
             self._unobserve_msg(req.reply_cls)
         if any(self._is_error(r) for r in result):
             rep = event.Reply(exception=exception.OFError(result=result))
+        elif isinstance(req, event.StreamMsgRequest):
+            rep = event.Reply()
         elif req.reply_multi:
             rep = event.Reply(result=result)
         elif len(result) == 0:
@@ -160,7 +195,10 @@ class OfctlService(app_manager.RyuApp):
         else:
             rep = event.Reply(exception=exception.
                               UnexpectedMultiReply(result=result))
-        self.reply_to_request(req, rep)
+        if isinstance(req, event.StreamMsgRequest):
+            self._stream_reply(req, rep)
+        else:
+            self.reply_to_request(req, rep)
 
     @set_ev_cls(ofp_event.EventOFPErrorMsg, MAIN_DISPATCHER)
     def _handle_reply(self, ev):
@@ -181,6 +219,10 @@ class OfctlService(app_manager.RyuApp):
             self.logger.error('unexpected reply %s for xid %s' %
                               (ev, msg.xid,))
             return
+        if (isinstance(req, event.StreamMsgRequest) and
+                not self._is_error(msg)):
+            self._stream_reply(req, event.Reply(result=msg))
+            return
         try:
             si.results[msg.xid].append(ev.msg)
         except KeyError:
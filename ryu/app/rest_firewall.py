@@ -212,6 +212,8 @@ class RestFirewallAPI(app_manager.RyuApp):
 
         self.dpset = kwargs['dpset']
         wsgi = kwargs['wsgi']
+        # replies are correlated by Datapath.send_request().  'waiters'
+        # is only passed to ryu.lib.ofctl_* for compatibility.
         self.waiters = {}
         self.data = {}
         self.data['dpset'] = self.dpset
@@ -293,29 +295,6 @@ class RestFirewallAPI(app_manager.RyuApp):
                        conditions=dict(method=['DELETE']),
                        requirements=requirements)
 
-    def stats_reply_handler(self, ev):
-        msg = ev.msg
-        dp = msg.datapath
-
-        if dp.id not in self.waiters:
-            return
-        if msg.xid not in self.waiters[dp.id]:
-            return
-        lock, msgs = self.waiters[dp.id][msg.xid]
-        msgs.append(msg)
-
-        flags = 0
-        if dp.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION or \
-                dp.ofproto.OFP_VERSION == ofproto_v1_2.OFP_VERSION:
-            flags = dp.ofproto.OFPSF_REPLY_MORE
-        elif dp.ofproto.OFP_VERSION == ofproto_v1_3.OFP_VERSION:
-            flags = dp.ofproto.OFPMPF_REPLY_MORE
-
-        if msg.flags & flags:
-            return
-        del self.waiters[dp.id][msg.xid]
-        lock.set()
-
     @set_ev_cls(dpset.EventDP, dpset.DPSET_EV_DISPATCHER)
     def handler_datapath(self, ev):
         if ev.enter:
@@ -323,16 +302,6 @@ class RestFirewallAPI(app_manager.RyuApp):
         else:
             FirewallController.unregist_ofs(ev.dp)
 
-    # for OpenFlow version1.0
-    @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
-    def stats_reply_handler_v1_0(self, ev):
-        self.stats_reply_handler(ev)
-
-    # for OpenFlow version1.2 or later
-    @set_ev_cls(ofp_event.EventOFPStatsReply, MAIN_DISPATCHER)
-    def stats_reply_handler_v1_2(self, ev):
-        self.stats_reply_handler(ev)
-
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def packet_in_handler(self, ev):
         FirewallController.packet_in_handler(ev.msg)
@@ -688,7 +657,7 @@ class Firewall(object):
 
         cmd = self.dp.ofproto.OFPFC_ADD
 
-        if waiters:
+        if waiters is not None:
             msgs = self.ofctl.get_flow_stats(self.dp, waiters)
 
             if str(self.dp.id) in msgs:
@@ -24,10 +24,8 @@ from ryu.app import conf_switch_key as cs_key
 from ryu.app.wsgi import ControllerBase, WSGIApplication, route
 from ryu.base import app_manager
 from ryu.controller import conf_switch
-from ryu.controller import ofp_event
 from ryu.controller import dpset
 from ryu.controller.handler import set_ev_cls
-from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.exception import OFPUnknownVersion
 from ryu.lib import dpid as dpid_lib
 from ryu.lib import mac
@@ -273,6 +271,8 @@ class RestQoSAPI(app_manager.RyuApp):
         self.cs = kwargs['conf_switch']
         self.dpset = kwargs['dpset']
         wsgi = kwargs['wsgi']
+        # replies are correlated by Datapath.send_request().  'waiters'
+        # is only passed to ryu.lib.ofctl_* for compatibility.
         self.waiters = {}
         self.data = {}
         self.data['dpset'] = self.dpset
@@ -280,29 +280,6 @@ class RestQoSAPI(app_manager.RyuApp):
         wsgi.registory['QoSController'] = self.data
         wsgi.register(QoSController, self.data)
 
-    def stats_reply_handler(self, ev):
-        msg = ev.msg
-        dp = msg.datapath
-
-        if dp.id not in self.waiters:
-            return
-        if msg.xid not in self.waiters[dp.id]:
-            return
-        lock, msgs = self.waiters[dp.id][msg.xid]
-        msgs.append(msg)
-
-        flags = 0
-        if dp.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION or \
-                dp.ofproto.OFP_VERSION == ofproto_v1_2.OFP_VERSION:
-            flags = dp.ofproto.OFPSF_REPLY_MORE
-        elif dp.ofproto.OFP_VERSION == ofproto_v1_3.OFP_VERSION:
-            flags = dp.ofproto.OFPMPF_REPLY_MORE
-
-        if msg.flags & flags:
-            return
-        del self.waiters[dp.id][msg.xid]
-        lock.set()
-
     @set_ev_cls(conf_switch.EventConfSwitchSet)
     def conf_switch_set_handler(self, ev):
         if ev.key == cs_key.OVSDB_ADDR:
@@ -324,26 +301,6 @@ class RestQoSAPI(app_manager.RyuApp):
         else:
             QoSController.unregist_ofs(ev.dp)
 
-    # for OpenFlow version1.0
-    @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
-    def stats_reply_handler_v1_0(self, ev):
-        self.stats_reply_handler(ev)
-
-    # for OpenFlow version1.2 or later
-    @set_ev_cls(ofp_event.EventOFPStatsReply, MAIN_DISPATCHER)
-    def stats_reply_handler_v1_2(self, ev):
-        self.stats_reply_handler(ev)
-
-    # for OpenFlow version1.2 or later
-    @set_ev_cls(ofp_event.EventOFPQueueStatsReply, MAIN_DISPATCHER)
-    def queue_stats_reply_handler_v1_2(self, ev):
-        self.stats_reply_handler(ev)
-
-    # for OpenFlow version1.2 or later
-    @set_ev_cls(ofp_event.EventOFPMeterStatsReply, MAIN_DISPATCHER)
-    def meter_stats_reply_handler_v1_2(self, ev):
-        self.stats_reply_handler(ev)
-
 
 class QoSOfsList(dict):
 
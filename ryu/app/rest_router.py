@@ -221,6 +221,8 @@ class RestRouterAPI(app_manager.RyuApp):
         RouterController.set_logger(self.logger)
 
         wsgi = kwargs['wsgi']
+        # replies are correlated by Datapath.send_request().  'waiters'
+        # is only passed around for compatibility.
         self.waiters = {}
         self.data = {'waiters': self.waiters}
 
@@ -269,35 +271,6 @@ class RestRouterAPI(app_manager.RyuApp):
     def packet_in_handler(self, ev):
         RouterController.packet_in_handler(ev.msg)
 
-    def _stats_reply_handler(self, ev):
-        msg = ev.msg
-        dp = msg.datapath
-
-        if (dp.id not in self.waiters
-                or msg.xid not in self.waiters[dp.id]):
-            return
-        event, msgs = self.waiters[dp.id][msg.xid]
-        msgs.append(msg)
-
-        if ofproto_v1_3.OFP_VERSION == dp.ofproto.OFP_VERSION:
-            more = dp.ofproto.OFPMPF_REPLY_MORE
-        else:
-            more = dp.ofproto.OFPSF_REPLY_MORE
-        if msg.flags & more:
-            return
-        del self.waiters[dp.id][msg.xid]
-        event.set()
-
-    # for OpenFlow version1.0
-    @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
-    def stats_reply_handler_v1_0(self, ev):
-        self._stats_reply_handler(ev)
-
-    # for OpenFlow version1.2/1.3
-    @set_ev_cls(ofp_event.EventOFPStatsReply, MAIN_DISPATCHER)
-    def stats_reply_handler_v1_2(self, ev):
-        self._stats_reply_handler(ev)
-
     # TODO: Update routing table when port status is changed.
 
 
@@ -1583,19 +1556,13 @@ class OfCtl(object):
                       nw_proto=nw_proto, actions=actions)
 
     def send_stats_request(self, stats, waiters):
-        self.dp.set_xid(stats)
-        waiters_per_dp = waiters.setdefault(self.dp.id, {})
-        event = hub.Event()
-        msgs = []
-        waiters_per_dp[stats.xid] = (event, msgs)
-        self.dp.send_msg(stats)
-
+        future = self.dp.send_request(stats, timeout=OFP_REPLY_TIMER)
         try:
-            event.wait(timeout=OFP_REPLY_TIMER)
-        except hub.Timeout:
-            del waiters_per_dp[stats.xid]
-
-        return msgs
+            future.result()
+        except RyuException as e:
+            self.logger.debug('stats request failed: %s', e,
+                              extra=self.sw_id)
+        return future.msgs
 
 
 @OfCtl.register_of_version(ofproto_v1_0.OFP_VERSION)
@@ -1700,12 +1667,7 @@ class OfCtl_after_v1_2(OfCtl):
         pass
 
     def get_packetin_inport(self, msg):
-        in_port = self.dp.ofproto.OFPP_ANY
-        for match_field in msg.match.fields:
-            if match_field.header == self.dp.ofproto.OXM_OF_IN_PORT:
-                in_port = match_field.value
-                break
-        return in_port
+        return msg.match.get('in_port', self.dp.ofproto.OFPP_ANY)
 
     def get_all_flow(self, waiters):
         pass
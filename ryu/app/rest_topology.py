@@ -13,13 +13,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 from webob import Response
 
 from ryu.app.wsgi import ControllerBase, WSGIApplication, route
 from ryu.base import app_manager
 from ryu.lib import dpid as dpid_lib
-from ryu.topology.api import get_switch, get_link
+from ryu.topology import snapshot
 
 # REST API for switch configuration
 #
@@ -35,19 +34,36 @@ from ryu.topology.api import get_switch, get_link
 # get the links of a switch
 # GET /v1.0/topology/links/<dpid>
 #
+# get the changes after a version
+# GET /v1.0/topology/changes?since=<version>
+#
 # where
 # <dpid>: datapath id in 16 hex
+# <version>: "version" of the previous reply of changes, or the ETag
+#            header of the other replies, like "5437a2c1-12"
+#
+# The replies but changes have an ETag header of the topology version,
+# and are "304 Not Modified" if it matches the If-None-Match header.
+# The changes are a JSON object like
+# {"version": "5437a2c1-14",
+#  "changes": [{"event": "link_add", "data": <link>}, ...]}
+# where "event" is one of "switch_enter", "switch_leave",
+# "switch_modify", "link_add" and "link_delete".  If the changes after
+# the version are not kept anymore, or the version is from before
+# a restart of ryu, the reply is "410 Gone".
 
 
 class TopologyAPI(app_manager.RyuApp):
     _CONTEXTS = {
-        'wsgi': WSGIApplication
+        'wsgi': WSGIApplication,
+        'topology_snapshot': snapshot.TopologySnapshot,
     }
 
     def __init__(self, *args, **kwargs):
         super(TopologyAPI, self).__init__(*args, **kwargs)
 
         wsgi = kwargs['wsgi']
+        self.snapshot = kwargs['topology_snapshot'].snapshot
         wsgi.register(TopologyController, {'topology_api_app': self})
 
 
@@ -55,6 +71,7 @@ class TopologyController(ControllerBase):
     def __init__(self, req, link, data, **config):
         super(TopologyController, self).__init__(req, link, data, **config)
         self.topology_api_app = data['topology_api_app']
+        self.snapshot = self.topology_api_app.snapshot
 
     @route('topology', '/v1.0/topology/switches',
            methods=['GET'])
@@ -76,18 +93,39 @@ class TopologyController(ControllerBase):
     def get_links(self, req, **kwargs):
         return self._links(req, **kwargs)
 
+    @route('topology', '/v1.0/topology/changes',
+           methods=['GET'])
+    def list_changes(self, req, **kwargs):
+        try:
+            since = self.snapshot.version_of(req.GET['since'])
+        except (KeyError, ValueError):
+            return Response(status=400)
+        if since is None:
+            return Response(status=410)
+        body = self.snapshot.changes_json(since)
+        if body is None:
+            return Response(status=410)
+        # no ETag as the body depends on since
+        return Response(content_type='application/json', body=body)
+
+    def _response(self, req, body):
+        etag = self.snapshot.etag()
+        if etag in req.if_none_match:
+            return Response(status=304, etag=etag)
+        return Response(content_type='application/json', body=body,
+                        etag=etag)
+
     def _switches(self, req, **kwargs):
         dpid = None
         if 'dpid' in kwargs:
             dpid = dpid_lib.str_to_dpid(kwargs['dpid'])
-        switches = get_switch(self.topology_api_app, dpid)
-        body = json.dumps([switch.to_dict() for switch in switches])
-        return Response(content_type='application/json', body=body)
+        return self._response(req, self.snapshot.switches_json(dpid))
 
     def _links(self, req, **kwargs):
         dpid = None
         if 'dpid' in kwargs:
             dpid = dpid_lib.str_to_dpid(kwargs['dpid'])
-        links = get_link(self.topology_api_app, dpid)
-        body = json.dumps([link.to_dict() for link in links])
-        return Response(content_type='application/json', body=body)
+        return self._response(req, self.snapshot.links_json(dpid))
+
+
+app_manager.require_app('ryu.topology.switches')
@@ -21,7 +21,6 @@ from ryu.controller import ofp_event
 from ryu.controller.handler import MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.ofproto import ofproto_v1_2
-from ryu.lib.packet import packet
 from ryu.lib.packet import ethernet
 
 
@@ -56,8 +55,8 @@ class SimpleSwitch12(app_manager.RyuApp):
         ofproto = datapath.ofproto
         in_port = msg.match['in_port']
 
-        pkt = packet.Packet(msg.data)
-        eth = pkt.get_protocols(ethernet.ethernet)[0]
+        pkt = ev.packet
+        eth = pkt.get_protocol(ethernet.ethernet)
 
         dst = eth.dst
         src = eth.src
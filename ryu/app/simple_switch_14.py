@@ -18,7 +18,6 @@ from ryu.controller import ofp_event
 from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER
 from ryu.controller.handler import set_ev_cls
 from ryu.ofproto import ofproto_v1_4
-from ryu.lib.packet import packet
 from ryu.lib.packet import ethernet
 
 
@@ -66,8 +65,8 @@ class SimpleSwitch14(app_manager.RyuApp):
         parser = datapath.ofproto_parser
         in_port = msg.match['in_port']
 
-        pkt = packet.Packet(msg.data)
-        eth = pkt.get_protocols(ethernet.ethernet)[0]
+        pkt = ev.packet
+        eth = pkt.get_protocol(ethernet.ethernet)
 
         dst = eth.dst
         src = eth.src
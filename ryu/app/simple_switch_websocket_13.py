@@ -51,7 +51,6 @@ from ryu.app.wsgi import rpc_public, WebSocketRPCServer
 from ryu.controller import ofp_event
 from ryu.controller.handler import set_ev_cls
 from ryu.lib import hub
-from ryu.lib.packet import packet
 
 
 simple_switch_instance_name = 'simple_switch_api_app'
@@ -77,7 +76,7 @@ class SimpleSwitchWebSocket13(simple_switch_13.SimpleSwitch13):
     def _packet_in_handler(self, ev):
         super(SimpleSwitchWebSocket13, self)._packet_in_handler(ev)
 
-        pkt = packet.Packet(ev.msg.data)
+        pkt = ev.packet
         self._ws_manager.broadcast(str(pkt))
 
     @rpc_public
@@ -32,6 +32,12 @@ $ sudo mn --controller=remote --topo linear,2
 < {"params": [{"ports": [{"hw_addr": "56:c7:08:12:bb:36", "name": "s1-eth1", "port_no": "00000001", "dpid": "0000000000000001"}, {"hw_addr": "de:b9:49:24:74:3f", "name": "s1-eth2", "port_no": "00000002", "dpid": "0000000000000001"}], "dpid": "0000000000000001"}], "jsonrpc": "2.0", "method": "event_switch_leave", "id": 2}
 > {"id": 2, "jsonrpc": "2.0", "result": ""}
 ...
+
+The changes within WebSocketTopology.PUSH_INTERVAL are notified in a
+JSON-RPC batch, i.e. a list of the requests above, which is replied by
+a list of the results.  A link which goes down and up again within it
+is not notified.  If the changes are too many to be kept, the difference
+from the topology notified before is sent instead.
 """  # noqa
 
 from socket import error as SocketError
@@ -45,52 +51,104 @@ from ryu.app.wsgi import (
     WebSocketRPCClient
 )
 from ryu.base import app_manager
-from ryu.topology import event, switches
-from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
+from ryu.topology import snapshot, switches
 
 
 class WebSocketTopology(app_manager.RyuApp):
     _CONTEXTS = {
         'wsgi': WSGIApplication,
         'switches': switches.Switches,
+        'topology_snapshot': snapshot.TopologySnapshot,
     }
 
+    # the changes within this period are sent together, and a link
+    # going down and up within it is not notified.
+    PUSH_INTERVAL = 0.1
+
     def __init__(self, *args, **kwargs):
         super(WebSocketTopology, self).__init__(*args, **kwargs)
 
         self.rpc_clients = []
+        self.snapshot = kwargs['topology_snapshot'].snapshot
+        # the topology notified to the clients
+        self.version = self.snapshot.version
+        self.switches = dict(self.snapshot.switches)
+        self.links = dict(self.snapshot.links)
+        self.push_event = hub.Event()
+        self.snapshot.register_listener(self.push_event.set)
 
         wsgi = kwargs['wsgi']
         wsgi.register(WebSocketTopologyController, {'app': self})
 
-    @set_ev_cls(event.EventSwitchEnter)
-    def _event_switch_enter_handler(self, ev):
-        msg = ev.switch.to_dict()
-        self._rpc_broadcall('event_switch_enter', msg)
-
-    @set_ev_cls(event.EventSwitchLeave)
-    def _event_switch_leave_handler(self, ev):
-        msg = ev.switch.to_dict()
-        self._rpc_broadcall('event_switch_leave', msg)
-
-    @set_ev_cls(event.EventLinkAdd)
-    def _event_link_add_handler(self, ev):
-        msg = ev.link.to_dict()
-        self._rpc_broadcall('event_link_add', msg)
-
-    @set_ev_cls(event.EventLinkDelete)
-    def _event_link_delete_handler(self, ev):
-        msg = ev.link.to_dict()
-        self._rpc_broadcall('event_link_delete', msg)
-
-    def _rpc_broadcall(self, func_name, msg):
+    def start(self):
+        super(WebSocketTopology, self).start()
+        self.threads.append(hub.spawn(self.push_loop))
+
+    def stop(self):
+        self.snapshot.unregister_listener(self.push_event.set)
+        self.is_active = False
+        self.push_event.set()
+        super(WebSocketTopology, self).stop()
+
+    def push_loop(self):
+        while self.is_active:
+            self.push_event.wait()
+            if not self.is_active:
+                break
+            hub.sleep(self.PUSH_INTERVAL)
+            self.push_event.clear()
+            self.push_changes()
+
+    def push_changes(self):
+        changes = self.snapshot.changes(self.version)
+        if changes is None:
+            self.logger.warning('too many changes to notify, resync: '
+                                'version %d', self.snapshot.version)
+            changes = self._resync()
+        self.version = self.snapshot.version
+        if not changes:
+            return
+        self.switches = dict(self.snapshot.switches)
+        self.links = dict(self.snapshot.links)
+        calls = []
+        for name, msg in changes:
+            if name == 'switch_modify':
+                # ports were added, deleted or modified
+                name = 'switch_enter'
+            calls.append(('event_' + name, [msg]))
+        self._rpc_broadcall(calls)
+
+    def _resync(self):
+        # the changes from the notified topology to the current one
+        switches = self.snapshot.switches
+        links = self.snapshot.links
+        changes = []
+        for key in sorted(self.links):
+            if key not in links:
+                changes.append(('link_delete', self.links[key]))
+        for dpid in sorted(self.switches):
+            if dpid not in switches:
+                changes.append(('switch_leave', self.switches[dpid]))
+        for dpid in sorted(switches):
+            if self.switches.get(dpid) != switches[dpid]:
+                changes.append(('switch_enter', switches[dpid]))
+        for key in sorted(links):
+            if key not in self.links:
+                changes.append(('link_add', links[key]))
+        return changes
+
+    def _rpc_broadcall(self, calls):
         disconnected_clients = []
         for rpc_client in self.rpc_clients:
             # NOTE: Although broadcasting is desired,
             #       RPCClient#get_proxy(one_way=True) does not work well
-            rpc_server = rpc_client.get_proxy()
             try:
-                getattr(rpc_server, func_name)(msg)
+                if len(calls) == 1:
+                    func_name, args = calls[0]
+                    getattr(rpc_client.get_proxy(), func_name)(*args)
+                else:
+                    self._rpc_batch_call(rpc_client, calls)
             except SocketError:
                 self.logger.debug('WebSocket disconnected: %s' % rpc_client.ws)
                 disconnected_clients.append(rpc_client)
@@ -100,6 +158,16 @@ class WebSocketTopology(app_manager.RyuApp):
         for client in disconnected_clients:
             self.rpc_clients.remove(client)
 
+    @staticmethod
+    def _rpc_batch_call(rpc_client, calls):
+        # a JSON-RPC batch of the calls in a message.  the replies are
+        # not checked, as tinyrpc can't parse a batch reply.
+        protocol = rpc_client.protocol
+        req = protocol.create_batch_request()
+        for func_name, args in calls:
+            req.append(protocol.create_request(func_name, args))
+        rpc_client.transport.send_message(req.serialize())
+
 
 class WebSocketTopologyController(ControllerBase):
 
@@ -0,0 +1,397 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+sFlow v5 and NetFlow v5 collector.
+
+Usage::
+
+    ryu-manager ryu.app.xflow_collector
+
+Datagrams are decoded into per-flow counters which are aggregated for
+xflow_window seconds.  At the end of every window, the flows which sent
+the most octets are sent to the other applications as EventTopTalkers.
+
+Unlike ryu.lib.xflow, the decoders here read only the fields needed
+for the counters and reuse the same FlowRecord objects for every
+datagram.
+"""
+
+import heapq
+import select
+import socket
+import struct
+import time
+
+from ryu import cfg
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.lib import addrconv
+from ryu.lib import hub
+from ryu.lib.xflow import netflow
+from ryu.lib.xflow import sflow
+
+
+_MAX_DATAGRAM = 65535
+
+
+class FlowRecord(object):
+    """
+    Counters of a flow.
+
+    src and dst are packed addresses in the records filled by
+    the decoders and text in EventTopTalkers.
+    """
+
+    __slots__ = ('src', 'dst', 'proto', 'src_port', 'dst_port',
+                 'packets', 'octets')
+
+    def __init__(self, src=None, dst=None, proto=0, src_port=0, dst_port=0,
+                 packets=0, octets=0):
+        self.src = src
+        self.dst = dst
+        self.proto = proto
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self.packets = packets
+        self.octets = octets
+
+    def __repr__(self):
+        return ('FlowRecord(src=%r, dst=%r, proto=%d, src_port=%d, '
+                'dst_port=%d, packets=%d, octets=%d)' %
+                (self.src, self.dst, self.proto, self.src_port,
+                 self.dst_port, self.packets, self.octets))
+
+
+class _Decoder(object):
+    def __init__(self):
+        super(_Decoder, self).__init__()
+        # preallocated records, valid until the next decode()
+        self.records = []
+
+    def decode(self, buf):
+        """
+        Decode a datagram into self.records.
+
+        Returns the number of records filled.  Raises struct.error for
+        a truncated datagram.
+        """
+        raise NotImplementedError()
+
+
+class NetFlowV5Decoder(_Decoder):
+    # the same layouts as NetFlowV5 and NetFlowV5Flow in ryu.lib.xflow,
+    # skipping the fields which are not counted.
+    _HDR = struct.Struct('!HH18xH')
+    _FLOW = struct.Struct('!4s4s8xII8xHH2xB9x')
+
+    def decode(self, buf):
+        hdr = self._HDR
+        flow = self._FLOW
+        (version, count, sampling_interval) = hdr.unpack_from(buf)
+        if version != netflow.NETFLOW_V5:
+            return 0
+        # the lower 14 bits are the sampling interval
+        rate = sampling_interval & 0x3fff or 1
+        count = min(count, (len(buf) - hdr.size) // flow.size)
+
+        records = self.records
+        while len(records) < count:
+            records.append(FlowRecord())
+        offset = hdr.size
+        for i in xrange(count):
+            r = records[i]
+            (r.src, r.dst, packets, octets, r.src_port, r.dst_port,
+             r.proto) = flow.unpack_from(buf, offset)
+            r.packets = packets * rate
+            r.octets = octets * rate
+            offset += flow.size
+        return count
+
+
+class SFlowV5Decoder(_Decoder):
+    _HDR = struct.Struct('!II')
+    _AGENT = {
+        sflow.sFlowV5._AGENT_IPTYPE_V4: struct.Struct('!4s12xI'),
+        sflow.sFlowV5._AGENT_IPTYPE_V6: struct.Struct('!16s12xI'),
+    }
+    _SAMPLE = struct.Struct('!II')
+    # sampling_rate and the number of records
+    _FLOW_SAMPLE = struct.Struct('!8xI16xI')
+    _EXPANDED_FLOW_SAMPLE = struct.Struct('!12xI24xI')
+    _RAW_HEADER = struct.Struct('!IIII')
+
+    _FORMAT_FLOW_SAMPLE = 1
+    _FORMAT_EXPANDED_FLOW_SAMPLE = 3
+    _FORMAT_RAW_HEADER = 1
+    _HEADER_PROTOCOL_ETHERNET = 1
+
+    def decode(self, buf):
+        (version, address_type) = self._HDR.unpack_from(buf)
+        agent = self._AGENT.get(address_type)
+        if version != sflow.SFLOW_V5 or agent is None:
+            return 0
+        (_agent_address, samples_num) = agent.unpack_from(buf, 8)
+        offset = 8 + agent.size
+
+        buflen = len(buf)
+        n = 0
+        for i in xrange(samples_num):
+            if offset >= buflen:
+                break
+            (sample_format, sample_length) = self._SAMPLE.unpack_from(
+                buf, offset)
+            offset += self._SAMPLE.size
+            end = min(offset + sample_length, buflen)
+            if sample_format == self._FORMAT_FLOW_SAMPLE:
+                sample = self._FLOW_SAMPLE
+            elif sample_format == self._FORMAT_EXPANDED_FLOW_SAMPLE:
+                sample = self._EXPANDED_FLOW_SAMPLE
+            else:
+                # counter samples and enterprise specific ones
+                offset = end
+                continue
+            (sampling_rate, records_num) = sample.unpack_from(buf, offset)
+            n = self._decode_records(buf, offset + sample.size, end,
+                                     records_num, sampling_rate, n)
+            offset = end
+        return n
+
+    def _decode_records(self, buf, offset, end, records_num, sampling_rate,
+                        n):
+        records = self.records
+        for i in xrange(records_num):
+            if offset >= end:
+                break
+            (record_format, record_length) = self._SAMPLE.unpack_from(
+                buf, offset)
+            offset += self._SAMPLE.size
+            next_offset = offset + record_length
+            if record_format == self._FORMAT_RAW_HEADER:
+                (header_protocol, frame_length, _stripped,
+                 header_size) = self._RAW_HEADER.unpack_from(buf, offset)
+                if header_protocol == self._HEADER_PROTOCOL_ETHERNET:
+                    if n == len(records):
+                        records.append(FlowRecord())
+                    r = records[n]
+                    header = offset + self._RAW_HEADER.size
+                    if _decode_ethernet(r, buf, header,
+                                        min(header + header_size, end)):
+                        r.packets = sampling_rate
+                        r.octets = frame_length * sampling_rate
+                        n += 1
+            offset = next_offset
+        return n
+
+
+_ETHER = struct.Struct('!12xH')
+_VLAN = struct.Struct('!2xH')
+_IPV4 = struct.Struct('!B5xHxB2x4s4s')
+_IPV6 = struct.Struct('!6xBx16s16s')
+_PORTS = struct.Struct('!HH')
+_ETH_TYPE_IP = 0x0800
+_ETH_TYPE_IPV6 = 0x86dd
+_ETH_TYPE_VLANS = (0x8100, 0x88a8)
+_PORT_PROTOS = (6, 17, 132)     # tcp, udp and sctp
+
+
+def _decode_ethernet(r, buf, offset, end):
+    # fill r with the addresses and ports in the sampled header
+    if offset + _ETHER.size > end:
+        return False
+    (ethertype,) = _ETHER.unpack_from(buf, offset)
+    offset += _ETHER.size
+    while ethertype in _ETH_TYPE_VLANS and offset + _VLAN.size <= end:
+        (ethertype,) = _VLAN.unpack_from(buf, offset)
+        offset += _VLAN.size
+
+    if ethertype == _ETH_TYPE_IP and offset + _IPV4.size <= end:
+        (ver_hlen, frag, r.proto, r.src, r.dst) = _IPV4.unpack_from(
+            buf, offset)
+        offset += (ver_hlen & 0xf) * 4
+        has_ports = not frag & 0x1fff
+    elif ethertype == _ETH_TYPE_IPV6 and offset + _IPV6.size <= end:
+        # extension headers are not followed
+        (r.proto, r.src, r.dst) = _IPV6.unpack_from(buf, offset)
+        offset += _IPV6.size
+        has_ports = True
+    else:
+        return False
+
+    if has_ports and r.proto in _PORT_PROTOS and offset + _PORTS.size <= end:
+        (r.src_port, r.dst_port) = _PORTS.unpack_from(buf, offset)
+    else:
+        r.src_port = r.dst_port = 0
+    return True
+
+
+def _addr_to_text(addr):
+    if len(addr) == 4:
+        return addrconv.ipv4.bin_to_text(addr)
+    return addrconv.ipv6.bin_to_text(addr)
+
+
+class FlowTable(object):
+    """
+    Per-flow counters of the current window.
+    """
+
+    def __init__(self, now=None):
+        super(FlowTable, self).__init__()
+        self.flows = {}     # (src, dst, proto, src_port, dst_port) ->
+                            # [packets, octets]
+        self.start = time.time() if now is None else now
+
+    def add_records(self, records, n):
+        flows = self.flows
+        for i in xrange(n):
+            r = records[i]
+            key = (r.src, r.dst, r.proto, r.src_port, r.dst_port)
+            counters = flows.get(key)
+            if counters is None:
+                flows[key] = [r.packets, r.octets]
+            else:
+                counters[0] += r.packets
+                counters[1] += r.octets
+
+    def rotate(self, now=None):
+        """
+        Start a new window.
+
+        Returns (start, flows) of the window which has ended.
+        """
+        start, flows = self.start, self.flows
+        self.start = time.time() if now is None else now
+        self.flows = {}
+        return start, flows
+
+    @staticmethod
+    def top_talkers(flows, n):
+        """
+        Returns FlowRecords of the n flows with the most octets.
+        """
+        top = heapq.nlargest(n, flows.iteritems(),
+                             key=lambda key_counters: key_counters[1][1])
+        return [FlowRecord(_addr_to_text(src), _addr_to_text(dst), proto,
+                           src_port, dst_port, packets, octets)
+                for ((src, dst, proto, src_port, dst_port),
+                     (packets, octets)) in top]
+
+
+class EventTopTalkers(event.EventBase):
+    """
+    The flows which sent the most octets in a window.
+
+    talkers is a list of FlowRecord in descending order of octets.
+    """
+
+    def __init__(self, start, end, talkers):
+        super(EventTopTalkers, self).__init__()
+        self.start = start
+        self.end = end
+        self.talkers = talkers
+
+
+class XFlowCollector(app_manager.RyuApp):
+    _EVENTS = [EventTopTalkers]
+
+    def __init__(self, *args, **kwargs):
+        super(XFlowCollector, self).__init__(*args, **kwargs)
+        self.CONF.register_opts([
+            cfg.StrOpt('xflow-host', default='0.0.0.0',
+                       help='xflow collector listen host'),
+            cfg.IntOpt('sflow-port', default=6343,
+                       help='sFlow collector listen port (0 to disable)'),
+            cfg.IntOpt('netflow-port', default=2055,
+                       help='NetFlow collector listen port (0 to disable)'),
+            cfg.IntOpt('xflow-window', default=10,
+                       help='seconds to aggregate flows for'),
+            cfg.IntOpt('xflow-top', default=10,
+                       help='number of flows in EventTopTalkers'),
+            cfg.IntOpt('xflow-batch', default=64,
+                       help='max datagrams to receive in a row'),
+        ])
+        self.window = self.CONF.xflow_window
+        self.top = self.CONF.xflow_top
+        self.batch = self.CONF.xflow_batch
+        self.table = FlowTable()
+        self.failed_count = 0
+        self._socks = []
+        self._xflow_threads = []
+
+    def start(self):
+        super(XFlowCollector, self).start()
+        for port, decoder in ((self.CONF.sflow_port, SFlowV5Decoder()),
+                              (self.CONF.netflow_port, NetFlowV5Decoder())):
+            if not port:
+                continue
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.CONF.xflow_host, port))
+            self.logger.debug('listening on %s:%d', self.CONF.xflow_host,
+                              port)
+            self._socks.append(sock)
+            self._xflow_threads.append(
+                hub.spawn(self._recv_loop, sock, decoder))
+        t = hub.spawn(self._window_loop)
+        self._xflow_threads.append(t)
+        return t
+
+    def stop(self):
+        for t in self._xflow_threads:
+            hub.kill(t)
+        for sock in self._socks:
+            sock.close()
+        super(XFlowCollector, self).stop()
+
+    def _recv_loop(self, sock, decoder):
+        bufs = [bytearray(_MAX_DATAGRAM) for i in xrange(self.batch)]
+        views = [memoryview(buf) for buf in bufs]
+        lens = [0] * self.batch
+        while self.is_active:
+            # block for a datagram, then take the ones already queued
+            # without yielding to the other threads.
+            n = 0
+            while n < self.batch:
+                if n and not select.select([sock], [], [], 0)[0]:
+                    break
+                lens[n] = sock.recv_into(bufs[n])
+                n += 1
+            for i in xrange(n):
+                self.collect(decoder, views[i][:lens[i]])
+
+    def collect(self, decoder, buf):
+        """
+        Decode a datagram and count its flows in the current window.
+        """
+        try:
+            n = decoder.decode(buf)
+        except struct.error, e:
+            self.failed_count += 1
+            self.logger.debug('failed to decode: %s (total fail count: %d)',
+                              e, self.failed_count)
+            return
+        self.table.add_records(decoder.records, n)
+
+    def _window_loop(self):
+        while self.is_active:
+            hub.sleep(self.window)
+            self.end_window()
+
+    def end_window(self):
+        start, flows = self.table.rotate()
+        talkers = FlowTable.top_talkers(flows, self.top)
+        self.send_event_to_observers(
+            EventTopTalkers(start, self.table.start, talkers))
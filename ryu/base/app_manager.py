@@ -36,6 +36,7 @@ from ryu.controller.handler import register_instance, get_dependent_services
 from ryu.controller.controller import Datapath
 from ryu.controller import event
 from ryu.controller.event import EventRequestBase, EventReplyBase
+from ryu.lib import event_queue
 from ryu.lib import hub
 from ryu.ofproto import ofproto_protocol
 
@@ -127,6 +128,25 @@ class RyuApp(object):
     a different python module from the RyuApp subclass is.
     """
 
+    EVENT_QUEUE_POLICIES = {}
+    """
+    A dictionary of event classes to the policies of queueing them for
+    this RyuApp, instead of blocking the sender while the queue is full.
+    See ryu.lib.event_queue for the policies.  A policy of an event class
+    applies to its subclasses too.  The number of dropped events is
+    counted in self.events.dropped.  An invalid entry raises ValueError
+    when the RyuApp is instantiated.
+
+    Example::
+
+        EVENT_QUEUE_POLICIES = {
+            ofp_event.EventOFPStateChange: event_queue.PRIORITY,
+            ofp_event.EventOFPPacketIn: event_queue.DROP_OLDEST,
+            ofp_event.EventOFPPortStatus: event_queue.Coalesce(
+                lambda ev: (ev.msg.datapath.id, ev.msg.desc.port_no)),
+        }
+    """
+
     OFP_VERSIONS = None
     """
     A list of supported OpenFlow versions for this RyuApp.
@@ -153,8 +173,13 @@ class RyuApp(object):
         self.name = self.__class__.__name__
         self.event_handlers = {}        # ev_cls -> handlers:list
         self.observers = {}     # ev_cls -> observer-name -> states:set
+        # dispatch tables compiled from the above on demand.
+        # they are invalidated on (un)registration.
+        self._handlers_cache = {}   # (ev_cls, state) -> handlers:tuple
+        self._observers_cache = {}  # (ev_cls, state) -> observer-names:tuple
         self.threads = []
-        self.events = hub.Queue(128)
+        self.events = event_queue.EventQueue(
+            128, dict(self.EVENT_QUEUE_POLICIES))
         if hasattr(self.__class__, 'LOGGER_NAME'):
             self.logger = logging.getLogger(self.__class__.LOGGER_NAME)
         else:
@@ -165,6 +190,7 @@ class RyuApp(object):
         class _EventThreadStop(event.EventBase):
             pass
         self._event_stop = _EventThreadStop()
+        self.events.set_policy(_EventThreadStop, event_queue.PRIORITY)
         self.is_active = True
 
     def start(self):
@@ -182,25 +208,30 @@ class RyuApp(object):
         assert callable(handler)
         self.event_handlers.setdefault(ev_cls, [])
         self.event_handlers[ev_cls].append(handler)
+        self._handlers_cache.clear()
 
     def unregister_handler(self, ev_cls, handler):
         assert callable(handler)
         self.event_handlers[ev_cls].remove(handler)
         if not self.event_handlers[ev_cls]:
             del self.event_handlers[ev_cls]
+        self._handlers_cache.clear()
 
     def register_observer(self, ev_cls, name, states=None):
         states = states or set()
         ev_cls_observers = self.observers.setdefault(ev_cls, {})
         ev_cls_observers.setdefault(name, set()).update(states)
+        self._observers_cache.clear()
 
     def unregister_observer(self, ev_cls, name):
         observers = self.observers.get(ev_cls, {})
         observers.pop(name)
+        self._observers_cache.clear()
 
     def unregister_observer_all_event(self, name):
         for observers in self.observers.values():
             observers.pop(name, None)
+        self._observers_cache.clear()
 
     def observe_event(self, ev_cls, states=None):
         brick = _lookup_service_brick_by_ev_cls(ev_cls)
@@ -213,7 +244,7 @@ class RyuApp(object):
             brick.unregister_observer(ev_cls, self.name)
 
     def get_handlers(self, ev, state=None):
-        """Returns a list of handlers for the specific event.
+        """Returns a sequence of handlers for the specific event.
 
         :param ev: The event to handle.
         :param state: The current state. ("dispatcher")
@@ -221,12 +252,26 @@ class RyuApp(object):
                       Otherwise, returns only handlers that are interested
                       in the specified state.
                       The default is None.
+
+        The result is cached per (event class, state) until a handler
+        is registered or unregistered.
         """
         ev_cls = ev.__class__
+        key = (ev_cls, state)
+        try:
+            return self._handlers_cache[key]
+        except KeyError:
+            pass
+
         handlers = self.event_handlers.get(ev_cls, [])
-        if state is None:
-            return handlers
+        if state is not None:
+            handlers = self._filter_handlers(ev_cls, state, handlers)
+        handlers = tuple(handlers)
+        self._handlers_cache[key] = handlers
+        return handlers
 
+    @staticmethod
+    def _filter_handlers(ev_cls, state, handlers):
         def test(h):
             if not hasattr(h, 'callers') or ev_cls not in h.callers:
                 # dynamically registered handlers does not have
@@ -241,11 +286,20 @@ class RyuApp(object):
         return filter(test, handlers)
 
     def get_observers(self, ev, state):
+        ev_cls = ev.__class__
+        key = (ev_cls, state)
+        try:
+            return self._observers_cache[key]
+        except KeyError:
+            pass
+
         observers = []
-        for k, v in self.observers.get(ev.__class__, {}).iteritems():
+        for k, v in self.observers.get(ev_cls, {}).iteritems():
             if not state or not v or state in v:
                 observers.append(k)
 
+        observers = tuple(observers)
+        self._observers_cache[key] = observers
         return observers
 
     def send_request(self, req):
@@ -284,12 +338,12 @@ class RyuApp(object):
         if name in SERVICE_BRICKS:
             if isinstance(ev, EventRequestBase):
                 ev.src = self.name
-            LOG.debug("EVENT %s->%s %s" %
-                      (self.name, name, ev.__class__.__name__))
+            LOG.debug("EVENT %s->%s %s",
+                      self.name, name, ev.__class__.__name__)
             SERVICE_BRICKS[name]._send_event(ev, state)
         else:
-            LOG.debug("EVENT LOST %s->%s %s" %
-                      (self.name, name, ev.__class__.__name__))
+            LOG.debug("EVENT LOST %s->%s %s",
+                      self.name, name, ev.__class__.__name__)
 
     def send_event_to_observers(self, ev, state=None):
         """
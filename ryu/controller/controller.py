@@ -30,6 +30,8 @@ from ryu.lib.hub import StreamServer
 import traceback
 import random
 import ssl
+import struct
+import time
 from socket import IPPROTO_TCP, TCP_NODELAY
 
 import ryu.base.app_manager
@@ -42,6 +44,7 @@ from ryu.ofproto import nx_match
 
 from ryu.controller import handler
 from ryu.controller import ofp_event
+from ryu.controller import xid_table
 
 from ryu.lib.dpid import dpid_to_str
 
@@ -56,7 +59,12 @@ CONF.register_cli_opts([
                help='openflow ssl listen port'),
     cfg.StrOpt('ctl-privkey', default=None, help='controller private key'),
     cfg.StrOpt('ctl-cert', default=None, help='controller certificate'),
-    cfg.StrOpt('ca-certs', default=None, help='CA certificates')
+    cfg.StrOpt('ca-certs', default=None, help='CA certificates'),
+    cfg.IntOpt('ofp-recv-buffer-size', default=64 * 1024,
+               help='initial size of the per datapath receive buffer'),
+    cfg.IntOpt('ofp-send-queue-size', default=16,
+               help='maximum number of messages queued for sending '
+                    'per datapath')
 ])
 
 
@@ -113,12 +121,18 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.socket.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
         self.address = address
         self.is_active = True
+        self.recv_buf_size = max(CONF.ofp_recv_buffer_size,
+                                 ofproto_common.OFP_HEADER_SIZE)
 
-        # The limit is arbitrary. We need to limit queue size to
-        # prevent it from eating memory up
-        self.send_q = hub.Queue(16)
+        # We need to limit queue size to prevent it from eating memory up.
+        # Producers block in send() while the queue is full.
+        self.send_q = hub.Queue(CONF.ofp_send_queue_size)
+        # statistics of the send queue
+        self.send_q_high_water = 0      # the largest number of queued msgs
+        self.send_blocked_time = 0.0    # seconds producers spent blocked
 
         self.xid = random.randint(0, self.ofproto.MAX_XID)
+        self.xid_table = xid_table.XidTable(self)
         self.id = None  # datapath_id is unknown yet
         self.ports = None
         self.flow_format = ofproto_v1_0.NXFF_OPENFLOW10
@@ -126,6 +140,7 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.set_state(handler.HANDSHAKE_DISPATCHER)
 
     def close(self):
+        self.xid_table.cancel_all()
         self.set_state(handler.DEAD_DISPATCHER)
 
     def set_state(self, state):
@@ -137,37 +152,55 @@ class Datapath(ofproto_protocol.ProtocolDesc):
     # Low level socket handling layer
     @_deactivate
     def _recv_loop(self):
-        buf = bytearray()
+        # Received data is read in large chunks into a reusable buffer.
+        # 'start' is the offset of the first unparsed byte and 'end' is
+        # the offset just past the last received byte.  Headers are
+        # decoded in place and the consumed part is discarded only when
+        # the buffer runs out of space.
+        buf = bytearray(self.recv_buf_size)
+        start = end = 0
         required_len = ofproto_common.OFP_HEADER_SIZE
 
         count = 0
         while self.is_active:
-            ret = self.socket.recv(required_len)
-            if len(ret) == 0:
+            if end == len(buf) or len(buf) - start < required_len:
+                if len(buf) < required_len:
+                    buf = _grow_buffer(buf, start, end, required_len)
+                else:
+                    buf[:end - start] = buf[start:end]
+                end -= start
+                start = 0
+
+            ret = self.socket.recv_into(memoryview(buf)[end:])
+            if ret == 0:
                 self.is_active = False
                 break
-            buf += ret
-            while len(buf) >= required_len:
-                (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
-                required_len = msg_len
-                if len(buf) < required_len:
+            end += ret
+            while end - start >= required_len:
+                (version, msg_type, msg_len, xid) = struct.unpack_from(
+                    ofproto_common.OFP_HEADER_PACK_STR, buf, start)
+                required_len = max(msg_len, ofproto_common.OFP_HEADER_SIZE)
+                if end - start < required_len:
                     break
 
-                msg = ofproto_parser.msg(self,
-                                         version, msg_type, msg_len, xid, buf)
+                # the message object outlives this loop (it is queued
+                # to applications), so it gets its own copy of the bytes
+                # while the receive buffer is reused.
+                msg = ofproto_parser.msg(
+                    self, version, msg_type, msg_len, xid,
+                    buf[start:start + required_len])
                 # LOG.debug('queue msg %s cls %s', msg, msg.__class__)
                 if msg:
+                    if self.xid_table:
+                        self.xid_table.dispatch(msg)
                     ev = ofp_event.ofp_msg_to_ev(msg)
                     self.ofp_brick.send_event_to_observers(ev, self.state)
 
-                    dispatchers = lambda x: x.callers[ev.__class__].dispatchers
-                    handlers = [handler for handler in
-                                self.ofp_brick.get_handlers(ev) if
-                                self.state in dispatchers(handler)]
+                    handlers = self.ofp_brick.get_handlers(ev, self.state)
                     for handler in handlers:
                         handler(ev)
 
-                buf = buf[required_len:]
+                start += required_len
                 required_len = ofproto_common.OFP_HEADER_SIZE
 
                 # We need to schedule other greenlets. Otherwise, ryu
@@ -179,11 +212,23 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                     count = 0
                     hub.sleep(0)
 
+            if start == end:
+                start = end = 0
+
     @_deactivate
     def _send_loop(self):
         try:
             while self.is_active:
                 buf = self.send_q.get()
+                # coalesce everything queued so far into a single write.
+                bufs = [buf]
+                try:
+                    while True:
+                        bufs.append(self.send_q.get(block=False))
+                except hub.QueueEmpty:
+                    pass
+                if len(bufs) > 1:
+                    buf = bytearray().join(bufs)
                 self.socket.sendall(buf)
         finally:
             q = self.send_q
@@ -198,8 +243,16 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                 pass
 
     def send(self, buf):
-        if self.send_q:
-            self.send_q.put(buf)
+        send_q = self.send_q
+        if send_q:
+            if send_q.full():
+                start = time.time()
+                send_q.put(buf)
+                self.send_blocked_time += time.time() - start
+            else:
+                send_q.put(buf)
+            self.send_q_high_water = max(self.send_q_high_water,
+                                         send_q.qsize())
 
     def set_xid(self, msg):
         self.xid += 1
@@ -215,6 +268,52 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         # LOG.debug('send_msg %s', msg)
         self.send(msg.buf)
 
+    def send_request(self, msg, timeout=None):
+        """
+        Send a request message and return a ReplyFuture for its replies.
+
+        The replies are still delivered to applications as events.
+        The request fails with OFPRequestTimeout if it is not complete
+        in timeout seconds (None means no timeout) and with
+        OFPDatapathDisconnected when the connection is closed.
+        """
+        self.set_xid(msg)
+        future = self.xid_table.register(msg.xid, timeout)
+        self.send_msg(msg)
+        return future
+
+    def send_msgs(self, msgs, barrier=True, timeout=None):
+        """
+        Send a batch of messages (e.g. FlowMods) in a single write.
+
+        With barrier=True, a BarrierRequest follows the batch and
+        a BatchFuture is returned.  It is completed by the BarrierReply,
+        i.e. when the switch has processed the whole batch, and maps
+        error replies back to the messages of the batch by xid.
+        timeout is the same as send_request().
+        With barrier=False, returns None.
+        """
+        msgs = list(msgs)
+        buf = bytearray()
+        for msg in msgs:
+            assert isinstance(msg, self.ofproto_parser.MsgBase)
+            if msg.xid is None:
+                self.set_xid(msg)
+            msg.serialize()
+            buf += msg.buf
+
+        future = None
+        if barrier:
+            req = self.ofproto_parser.OFPBarrierRequest(self)
+            self.set_xid(req)
+            req.serialize()
+            buf += req.buf
+            future = self.xid_table.register_batch(req.xid, msgs, timeout)
+
+        if buf:
+            self.send(buf)
+        return future
+
     def serve(self):
         send_thr = hub.spawn(self._send_loop)
 
@@ -299,6 +398,15 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         return port_no > self.ofproto.OFPP_MAX
 
 
+def _grow_buffer(buf, start, end, required_len):
+    size = len(buf)
+    while size < required_len:
+        size *= 2
+    new_buf = bytearray(size)
+    new_buf[:end - start] = buf[start:end]
+    return new_buf
+
+
 def datapath_connection_factory(socket, address):
     LOG.debug('connected socket:%s address:%s', socket, address)
     with contextlib.closing(Datapath(socket, address)) as datapath:
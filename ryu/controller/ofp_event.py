@@ -18,9 +18,12 @@
 OpenFlow event definitions.
 """
 
+import copy
 import inspect
 
 from ryu.controller import handler
+from ryu.lib import hub
+from ryu.lib.packet import packet
 from ryu import ofproto
 from ryu import utils
 from . import event
@@ -32,12 +35,85 @@ class EventOFPMsgBase(event.EventBase):
         self.msg = msg
 
 
+def _copy_protocol(proto):
+    # a shallow copy, which is much cheaper than copy.copy() or decoding
+    try:
+        attrs = proto.__dict__
+    except AttributeError:
+        # the payload
+        return copy.copy(proto)
+    copied = proto.__class__.__new__(proto.__class__)
+    copied.__dict__.update(attrs)
+    return copied
+
+
+class _ObserverPacket(packet.Packet):
+    """
+    The Packet of an observer of a PacketIn event, which copies
+    the headers decoded by the Packet shared by the observers on demand.
+    """
+
+    def __init__(self, shared):
+        super(_ObserverPacket, self).__init__()
+        self.data = shared.data
+        self._shared = shared
+        # None when no headers are left to copy
+        self._parse_cls = _ObserverPacket
+
+    def _parse_next(self):
+        if self._parse_cls is None:
+            return False
+        i = len(self._protocols)
+        shared = self._shared
+        while len(shared._protocols) <= i:
+            if not shared._parse_next():
+                self._parse_cls = None
+                return False
+        self._protocols.append(_copy_protocol(shared._protocols[i]))
+        return True
+
+
+class EventOFPPacketInBase(EventOFPMsgBase):
+    """
+    The base class of the PacketIn events.
+
+    The packet property is the Packet decoded from msg.data.
+    msg.data is decoded lazily and only once per event.  Each observer,
+    i.e. the thread calling the handlers of an application, gets its
+    own Packet with copies of the headers, so that a handler which
+    modifies a header, e.g. to send it in a PacketOut, doesn't affect
+    the other observers.  The copies are shallow; values such as lists
+    of options are shared and must not be modified in place.
+    """
+
+    def __init__(self, msg):
+        super(EventOFPPacketInBase, self).__init__(msg)
+        self._packet = None     # shared by the observers
+        self._packets = {}      # thread -> _ObserverPacket
+
+    @property
+    def packet(self):
+        thread = hub.getcurrent()
+        pkt = self._packets.get(thread)
+        if pkt is None:
+            if self._packet is None:
+                self._packet = packet.Packet(self.msg.data, lazy=True)
+            pkt = self._packets[thread] = _ObserverPacket(self._packet)
+        return pkt
+
+
 #
 # Create ofp_event type corresponding to OFP Msg
 #
 
 _OFP_MSG_EVENTS = {}
 
+# msg class name -> the base class of the event class
+_OFP_MSG_EV_BASES = {
+    'OFPPacketIn': EventOFPPacketInBase,
+    'NXTPacketIn': EventOFPPacketInBase,
+}
+
 
 def _ofp_msg_name_to_ev_name(msg_name):
     return 'Event' + msg_name
@@ -59,7 +135,8 @@ def _create_ofp_msg_ev_class(msg_cls):
     if name in _OFP_MSG_EVENTS:
         return
 
-    cls = type(name, (EventOFPMsgBase,),
+    base = _OFP_MSG_EV_BASES.get(msg_cls.__name__, EventOFPMsgBase)
+    cls = type(name, (base,),
                dict(__init__=lambda self, msg:
                     super(self.__class__, self).__init__(msg)))
     globals()[name] = cls
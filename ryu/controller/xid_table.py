@@ -0,0 +1,188 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Correlation of OpenFlow requests and their replies by xid.
+
+Every Datapath has an XidTable.  Datapath.send_request() registers the
+xid of the request and returns a ReplyFuture, which is completed by
+the receive loop of the datapath when the (last part of the) reply
+arrives, when the switch replies with an error, when the request
+times out or when the datapath disconnects.
+
+Datapath.send_msgs() registers the barrier following a batch of
+messages and returns a BatchFuture, which additionally collects the
+error replies to the messages of the batch.
+"""
+
+from ryu import exception
+from ryu.lib import hub
+from ryu.lib import timer_wheel
+
+
+# shared by all the datapaths
+_wheel = timer_wheel.TimerWheel()
+
+_REPLY_MORE = 1 << 0    # OFPSF_REPLY_MORE, OFPMPF_REPLY_MORE
+
+
+class ReplyFuture(object):
+    def __init__(self, xid):
+        super(ReplyFuture, self).__init__()
+        self.xid = xid
+        self.msgs = []      # replies received so far
+        self._event = hub.Event()
+        self._exception = None
+        self._timer = None
+        self._table = None
+
+    def done(self):
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the request to complete and return the list of
+        the reply messages.  Multipart replies result in a message per
+        part.
+
+        Raise OFPRequestTimeout if the request did not complete in
+        timeout seconds, OFPRequestError if the switch replied with an
+        error, and OFPDatapathDisconnected if the switch is gone.
+        The request is given up on timeout; a late reply is ignored.
+        """
+        if not self._event.wait(timeout):
+            exc = exception.OFPRequestTimeout(xid=self.xid)
+            if self._table is not None:
+                self._table._cancel(self, exc)
+            raise exc
+        if self._exception is not None:
+            raise self._exception
+        return self.msgs
+
+    def _complete(self, exc=None):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._exception = exc
+        self._event.set()
+
+
+class BatchFuture(ReplyFuture):
+    """
+    A ReplyFuture for the barrier following a batch of messages.
+
+    result() returns the barrier reply in a list, or raises
+    OFPBatchError if any message of the batch caused an error reply.
+    """
+
+    def __init__(self, xid, batch):
+        super(BatchFuture, self).__init__(xid)
+        self.batch = dict((msg.xid, msg) for msg in batch)
+        self.errors = []    # (message, OFPErrorMsg)
+
+    def _complete(self, exc=None):
+        if exc is None and self.errors:
+            exc = exception.OFPBatchError(errors=self.errors)
+        super(BatchFuture, self)._complete(exc)
+
+
+class XidTable(object):
+    def __init__(self, dp):
+        super(XidTable, self).__init__()
+        self.dp = dp
+        self._futures = {}      # xid -> ReplyFuture
+        self._batch_xids = {}   # xid of a batched message -> BatchFuture
+
+    def __len__(self):
+        return len(self._futures)
+
+    def __contains__(self, xid):
+        return xid in self._futures
+
+    def register(self, xid, timeout=None):
+        assert xid not in self._futures
+        future = ReplyFuture(xid)
+        future._table = self
+        self._futures[xid] = future
+        if timeout is not None:
+            future._timer = _wheel.add(timeout, self._timeout, future)
+        return future
+
+    def register_batch(self, barrier_xid, batch, timeout=None):
+        assert barrier_xid not in self._futures
+        future = BatchFuture(barrier_xid, batch)
+        future._table = self
+        self._futures[barrier_xid] = future
+        for xid in future.batch:
+            self._batch_xids[xid] = future
+        if timeout is not None:
+            future._timer = _wheel.add(timeout, self._timeout, future)
+        return future
+
+    def _pop(self, xid):
+        future = self._futures.pop(xid)
+        if isinstance(future, BatchFuture):
+            for batch_xid in future.batch:
+                if self._batch_xids.get(batch_xid) is future:
+                    del self._batch_xids[batch_xid]
+        return future
+
+    def _cancel(self, future, exc):
+        if self._futures.get(future.xid) is future:
+            self._pop(future.xid)
+            future._complete(exc)
+
+    def _timeout(self, future):
+        future._timer = None
+        self._cancel(future, exception.OFPRequestTimeout(xid=future.xid))
+
+    def dispatch(self, msg):
+        """
+        Pass a received message to the future waiting for it, if any.
+        """
+        ofp = self.dp.ofproto
+        future = self._futures.get(msg.xid)
+        if future is None:
+            future = self._batch_xids.get(msg.xid)
+            if future is not None and msg.cls_msg_type == ofp.OFPT_ERROR:
+                future.errors.append((future.batch[msg.xid], msg))
+            return
+        if msg.cls_msg_type == ofp.OFPT_ERROR:
+            self._pop(msg.xid)
+            future._complete(exception.OFPRequestError(xid=msg.xid,
+                                                       error=msg))
+            return
+        future.msgs.append(msg)
+        if (msg.cls_msg_type == _multipart_reply_type(ofp) and
+                msg.flags & _REPLY_MORE):
+            return
+        self._pop(msg.xid)
+        future._complete()
+
+    def cancel_all(self):
+        """Fail all the outstanding requests.  Called on disconnection."""
+        futures = self._futures
+        self._futures = {}
+        self._batch_xids = {}
+        for future in futures.values():
+            future._complete(exception.OFPDatapathDisconnected(
+                dpid=self.dp.id))
+
+
+def _multipart_reply_type(ofp):
+    try:
+        return ofp.OFPT_MULTIPART_REPLY
+    except AttributeError:
+        return ofp.OFPT_STATS_REPLY
@@ -39,6 +39,27 @@ class OFPMalformedMessage(RyuException):
     message = 'malformed message'
 
 
+class OFPRequestTimeout(RyuException):
+    message = 'no reply for request xid %(xid)s'
+
+
+class OFPRequestError(RyuException):
+    message = 'error reply %(error)s for request xid %(xid)s'
+
+
+class OFPBatchError(RyuException):
+    message = 'error replies for %(count)d messages of the batch'
+
+    def __init__(self, errors):
+        # list of (message, OFPErrorMsg) in the order of the errors
+        self.errors = errors
+        super(OFPBatchError, self).__init__(count=len(errors))
+
+
+class OFPDatapathDisconnected(RyuException):
+    message = 'datapath %(dpid)s disconnected'
+
+
 class NetworkNotFound(RyuException):
     message = 'no such network id %(network_id)s'
 
@@ -14,6 +14,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""
+Conversion between the text and the binary representations of
+IPv4, IPv6 and MAC addresses.
+
+The common forms are converted with the socket module and binascii.
+The others, e.g. '10.1' or '00-11-22-33-44-55', are passed to netaddr,
+so the results and the errors are the same as netaddr's.
+"""
+
+import binascii
+import socket
+
 import netaddr
 
 
@@ -30,11 +42,79 @@ class AddressConverter(object):
         return str(self._addr(self._strat.packed_to_int(bin),
                               **self._addr_kwargs))
 
-ipv4 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv4, version=4)
-ipv6 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv6, version=6)
+
+class _IPAddressConverter(AddressConverter):
+    def __init__(self, family, *args, **kwargs):
+        super(_IPAddressConverter, self).__init__(*args, **kwargs)
+        self._family = family
+
+    def text_to_bin(self, text):
+        try:
+            return socket.inet_pton(self._family, text)
+        except (socket.error, TypeError, ValueError):
+            return super(_IPAddressConverter, self).text_to_bin(text)
+
+    def bin_to_text(self, bin):
+        try:
+            return socket.inet_ntop(self._family, bin)
+        except (socket.error, TypeError, ValueError):
+            return super(_IPAddressConverter, self).bin_to_text(bin)
+
+
+class _MACAddressConverter(AddressConverter):
+    # the results are cached as the same addresses come again and
+    # again.  the caches are cleared when they are full.  it is cheaper
+    # than keeping them in LRU order.
+    _CACHE_SIZE = 4096
+
+    def __init__(self, *args, **kwargs):
+        super(_MACAddressConverter, self).__init__(*args, **kwargs)
+        self._bin_cache = {}
+        self._text_cache = {}
+
+    def _cache(self, cache, key, value):
+        if len(cache) >= self._CACHE_SIZE:
+            cache.clear()
+        cache[key] = value
+
+    def text_to_bin(self, text):
+        try:
+            return self._bin_cache[text]
+        except (KeyError, TypeError):
+            pass
+        if (isinstance(text, basestring) and len(text) == 17 and
+                text[2::3] == ':::::'):
+            try:
+                bin = binascii.unhexlify(text.replace(':', ''))
+            except TypeError:
+                bin = None
+        else:
+            bin = None
+        if bin is None:
+            return super(_MACAddressConverter, self).text_to_bin(text)
+        self._cache(self._bin_cache, text, bin)
+        return bin
+
+    def bin_to_text(self, bin):
+        try:
+            return self._text_cache[bin]
+        except (KeyError, TypeError):
+            pass
+        if not isinstance(bin, str) or len(bin) != 6:
+            return super(_MACAddressConverter, self).bin_to_text(bin)
+        h = binascii.hexlify(bin)
+        text = '%s:%s:%s:%s:%s:%s' % (h[0:2], h[2:4], h[4:6],
+                                      h[6:8], h[8:10], h[10:12])
+        self._cache(self._text_cache, bin, text)
+        return text
+
+ipv4 = _IPAddressConverter(socket.AF_INET, netaddr.IPAddress,
+                           netaddr.strategy.ipv4, version=4)
+ipv6 = _IPAddressConverter(socket.AF_INET6, netaddr.IPAddress,
+                           netaddr.strategy.ipv6, version=6)
 
 
 class mac_mydialect(netaddr.mac_unix):
     word_fmt = '%.2x'
-mac = AddressConverter(netaddr.EUI, netaddr.strategy.eui48, version=48,
-                       dialect=mac_mydialect)
+mac = _MACAddressConverter(netaddr.EUI, netaddr.strategy.eui48, version=48,
+                           dialect=mac_mydialect)
@@ -745,7 +745,7 @@ class BFDLib(app_manager.RyuApp):
         parser = datapath.ofproto_parser
         in_port = msg.match['in_port']
 
-        pkt = packet.Packet(msg.data)
+        pkt = ev.packet
 
         # If there's someone asked for an IP address associated
         # with a BFD session, generate an ARP reply for it.
@@ -0,0 +1,206 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Event queue of a RyuApp with a policy per event class.
+
+A full hub.Queue blocks the sender, e.g. Datapath._recv_loop, so that a
+slow application stalls the other applications and every switch.  The
+policy of an event class decides what happens instead:
+
+- BLOCK: the sender waits for room.  This is the default.
+- DROP_NEWEST: the event is dropped.
+- DROP_OLDEST: the oldest queued event of the same class is dropped to
+  make room.  If there is none, the event is dropped.
+- Coalesce(key): an event replaces the queued event of the same class
+  and key(ev), keeping its position.  If there is none and the queue is
+  full, the event is dropped.
+- PRIORITY: the event is queued in a lane which is served before the
+  others and isn't limited by maxsize.
+
+The policy of an event class is that of the nearest class in its MRO
+which has one, so that a policy of a base class applies to the
+subclasses.  DROP_OLDEST and Coalesce treat the events of the classes
+sharing a policy as the same class.
+
+The items are (ev, state) tuples as those of hub.Queue.
+"""
+
+import collections
+import inspect
+import logging
+
+from ryu.lib import hub
+
+
+LOG = logging.getLogger('ryu.lib.event_queue')
+
+BLOCK = 'block'
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+PRIORITY = 'priority'
+
+
+class Coalesce(object):
+    def __init__(self, key):
+        super(Coalesce, self).__init__()
+        self.key = key
+
+
+def check_policy(ev_cls, policy):
+    """
+    Raise ValueError unless ev_cls is a class and policy is a policy.
+    """
+    if ev_cls is not None and not inspect.isclass(ev_cls):
+        raise ValueError('%r is not an event class' % (ev_cls,))
+    if (policy not in (BLOCK, DROP_NEWEST, DROP_OLDEST, PRIORITY) and
+            not isinstance(policy, Coalesce)):
+        raise ValueError('unknown event queue policy %r for %s' %
+                         (policy, ev_cls))
+
+
+class EventQueue(object):
+    def __init__(self, maxsize=128, policies=None, default=BLOCK):
+        super(EventQueue, self).__init__()
+        self.maxsize = maxsize
+        check_policy(None, default)
+        self.default = default
+        self._policies = {}     # ev_cls -> policy
+        # ev_cls -> (policy, the class in the MRO of ev_cls with it)
+        self._resolved = {}
+        for ev_cls, policy in (policies or {}).items():
+            self.set_policy(ev_cls, policy)
+        self.dropped = {}       # ev_cls -> the number of dropped events
+        self.coalesced = {}     # ev_cls -> the number of replaced events
+        self._priority = collections.deque()
+        # [ev, state, tag] where ev is None if dropped.  tag is
+        # the deque of _oldest or the key of _coalesce, if any.
+        self._slots = collections.deque()
+        self._size = 0
+        self._oldest = {}       # ev_cls -> deque of slots for DROP_OLDEST
+        self._coalesce = {}     # (ev_cls, key) -> slot for Coalesce
+        self._putters = 0
+        self._getting = False
+        self._not_empty = hub.Event()
+        self._not_full = hub.Event()
+
+    @property
+    def policies(self):
+        """A copy of the dictionary of event classes to policies."""
+        return dict(self._policies)
+
+    def set_policy(self, ev_cls, policy):
+        check_policy(ev_cls, policy)
+        self._policies[ev_cls] = policy
+        self._resolved.clear()
+
+    def _policy(self, ev_cls):
+        try:
+            return self._resolved[ev_cls]
+        except KeyError:
+            pass
+        resolved = (self.default, ev_cls)
+        for cls in inspect.getmro(ev_cls):
+            if cls in self._policies:
+                resolved = (self._policies[cls], cls)
+                break
+        self._resolved[ev_cls] = resolved
+        return resolved
+
+    def qsize(self):
+        return len(self._priority) + self._size
+
+    def empty(self):
+        return not self.qsize()
+
+    def full(self):
+        return self._size >= self.maxsize
+
+    def _drop(self, ev):
+        ev_cls = ev.__class__
+        self.dropped[ev_cls] = self.dropped.get(ev_cls, 0) + 1
+        LOG.debug('dropped %s', ev_cls.__name__)
+
+    def _append(self, ev, state, tag=None):
+        slot = [ev, state, tag]
+        self._slots.append(slot)
+        self._size += 1
+        if self._getting:
+            self._not_empty.set()
+        return slot
+
+    def put(self, item):
+        ev, state = item
+        policy, ev_cls = self._policy(ev.__class__)
+        if policy == BLOCK:
+            while self.full():
+                self._putters += 1
+                self._not_full.clear()
+                self._not_full.wait()
+                self._putters -= 1
+            self._append(ev, state)
+        elif policy == PRIORITY:
+            self._priority.append(item)
+            if self._getting:
+                self._not_empty.set()
+        elif policy == DROP_NEWEST:
+            if self.full():
+                self._drop(ev)
+            else:
+                self._append(ev, state)
+        elif policy == DROP_OLDEST:
+            oldest = self._oldest.setdefault(ev_cls, collections.deque())
+            if self.full():
+                if not oldest:
+                    self._drop(ev)
+                    return
+                slot = oldest.popleft()
+                self._drop(slot[0])
+                slot[0] = None
+                self._size -= 1
+            oldest.append(self._append(ev, state, oldest))
+        else:
+            key = (ev_cls, policy.key(ev))
+            slot = self._coalesce.get(key)
+            if slot is not None:
+                slot[0] = ev
+                slot[1] = state
+                count = self.coalesced.get(ev.__class__, 0)
+                self.coalesced[ev.__class__] = count + 1
+            elif self.full():
+                self._drop(ev)
+            else:
+                self._coalesce[key] = self._append(ev, state, key)
+
+    def get(self):
+        while True:
+            if self._priority:
+                return self._priority.popleft()
+            while self._slots:
+                ev, state, tag = self._slots.popleft()
+                if ev is None:
+                    continue
+                self._size -= 1
+                if tag.__class__ is tuple:
+                    del self._coalesce[tag]
+                elif tag is not None:
+                    tag.popleft()
+                if self._putters:
+                    self._not_full.set()
+                return ev, state
+            self._getting = True
+            self._not_empty.clear()
+            self._not_empty.wait()
+            self._getting = False
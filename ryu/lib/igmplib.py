@@ -107,7 +107,7 @@ class IgmpLib(app_manager.RyuApp):
         msg = evt.msg
         dpid = msg.datapath.id
 
-        req_pkt = packet.Packet(msg.data)
+        req_pkt = evt.packet
         req_igmp = req_pkt.get_protocol(igmp.igmp)
         if req_igmp:
             if self._querier.dpid == dpid:
@@ -19,11 +19,11 @@ import socket
 import logging
 import netaddr
 
+from ryu import exception
 from ryu.ofproto import ether
 from ryu.ofproto import inet
 from ryu.ofproto import ofproto_v1_2
 from ryu.ofproto import ofproto_v1_2_parser
-from ryu.lib import hub
 from ryu.lib import mac
 
 
@@ -380,15 +380,14 @@ def match_vid_to_str(value, mask):
 
 
 def send_stats_request(dp, stats, waiters, msgs):
-    dp.set_xid(stats)
-    waiters_per_dp = waiters.setdefault(dp.id, {})
-    lock = hub.Event()
-    waiters_per_dp[stats.xid] = (lock, msgs)
-    dp.send_msg(stats)
-
-    lock.wait(timeout=DEFAULT_TIMEOUT)
-    if not lock.is_set():
-        del waiters_per_dp[stats.xid]
+    # 'waiters' is not used any more and kept for compatibility.
+    # the replies are correlated by the datapath.
+    future = dp.send_request(stats, timeout=DEFAULT_TIMEOUT)
+    try:
+        future.result()
+    except exception.RyuException as e:
+        LOG.debug('stats request failed: %s', e)
+    msgs.extend(future.msgs)
 
 
 def get_desc_stats(dp, waiters):
@@ -15,10 +15,14 @@
 # vim: tabstop=4 shiftwidth=4 softtabstop=4
 
 import logging
+import socket
+import struct
 from abc import ABCMeta, abstractmethod
 import six
 
-from ryu.lib.packet import packet
+from ryu.lib import addrconv
+from ryu.ofproto import ether
+from ryu.ofproto import inet
 
 LOG = logging.getLogger(__name__)
 
@@ -26,10 +30,15 @@ LOG = logging.getLogger(__name__)
 def packet_in_filter(cls, args=None, logging=False):
     def _packet_in_filter(packet_in_handler):
         def __packet_in_filter(self, ev):
-            pkt = packet.Packet(ev.msg.data)
-            if not packet_in_handler.pkt_in_filter.filter(pkt):
+            pkt_in_filter = packet_in_handler.pkt_in_filter
+            if isinstance(pkt_in_filter, RawPacketInFilterBase):
+                passed = pkt_in_filter.filter_data(ev.msg.data)
+            else:
+                passed = pkt_in_filter.filter(ev.packet)
+            if not passed:
                 if logging:
-                    LOG.debug('The packet is discarded by %s: %s' % (cls, pkt))
+                    LOG.debug('The packet is discarded by %s: %s' %
+                              (cls, ev.packet))
                 return
             return packet_in_handler(self, ev)
         pkt_in_filter = cls(args)
@@ -56,3 +65,193 @@ class RequiredTypeFilter(PacketInFilterBase):
             if not pkt.get_protocol(required_type):
                 return False
         return True
+
+
+class RawPacketInFilterBase(PacketInFilterBase):
+    """
+    Base class of filters which look at the raw packet data.
+
+    packet_in_filter calls filter_data() with ev.msg.data and does not
+    decode the packet.
+    """
+
+    @abstractmethod
+    def filter_data(self, data):
+        pass
+
+    def filter(self, pkt):
+        return self.filter_data(pkt.data)
+
+
+_UINT8 = struct.Struct('!B')
+_UINT16 = struct.Struct('!H')
+_UINT32 = struct.Struct('!I')
+# a MAC address and the following 2 bytes
+_UINT64 = struct.Struct('!Q')
+_VLAN = struct.Struct('!HH')
+_IPV4 = struct.Struct('!BxxxxxHxB')
+
+_VLAN_TYPES = (ether.ETH_TYPE_8021Q, ether.ETH_TYPE_8021AD)
+
+_L2 = 0
+_L3 = 1
+_L4 = 2
+
+
+def _mac_to_int(mac):
+    (value, ) = _UINT64.unpack(addrconv.mac.text_to_bin(mac) + '\x00\x00')
+    return value
+
+
+def _ipv4_to_int(ip):
+    if isinstance(ip, six.integer_types):
+        return ip
+    (value, ) = _UINT32.unpack(socket.inet_aton(ip))
+    return value
+
+
+# field name -> (layer, offset in the layer, struct, value converter,
+#                full mask, eth_type, ip_proto)
+# eth_type and ip_proto are the prerequisites of the field.
+_FIELDS = {
+    'eth_dst': (_L2, 0, _UINT64, _mac_to_int, 0xffffffffffff0000,
+                None, None),
+    'eth_src': (_L2, 6, _UINT64, _mac_to_int, 0xffffffffffff0000,
+                None, None),
+    'ipv4_src': (_L3, 12, _UINT32, _ipv4_to_int, 0xffffffff,
+                 ether.ETH_TYPE_IP, None),
+    'ipv4_dst': (_L3, 16, _UINT32, _ipv4_to_int, 0xffffffff,
+                 ether.ETH_TYPE_IP, None),
+    'tcp_src': (_L4, 0, _UINT16, int, 0xffff, None, inet.IPPROTO_TCP),
+    'tcp_dst': (_L4, 2, _UINT16, int, 0xffff, None, inet.IPPROTO_TCP),
+    'udp_src': (_L4, 0, _UINT16, int, 0xffff, None, inet.IPPROTO_UDP),
+    'udp_dst': (_L4, 2, _UINT16, int, 0xffff, None, inet.IPPROTO_UDP),
+}
+
+
+class MatchFilter(RawPacketInFilterBase):
+    """
+    Pass the packets which match all the fields in args.
+
+    The fields are named after OFPMatch.
+
+    ============ =================================================
+    Field        Value
+    ============ =================================================
+    eth_dst      MAC address string, or (address, mask) tuple
+    eth_src      MAC address string, or (address, mask) tuple
+    eth_type     Ethertype after the VLAN tags
+    vlan_vid     VID of the outermost VLAN tag
+    ip_proto     IPv4 protocol or IPv6 next header
+    ipv4_src     IPv4 address string, or (address, mask) tuple
+    ipv4_dst     IPv4 address string, or (address, mask) tuple
+    tcp_src      TCP port
+    tcp_dst      TCP port
+    udp_src      UDP port
+    udp_dst      UDP port
+    ============ =================================================
+
+    The fields are compiled into offset/mask checks on the raw data
+    by the constructor, so filtering does not decode the packet.
+    Like OFPMatch, ipv4_* imply eth_type IPv4 and tcp_*/udp_* imply
+    ip_proto TCP/UDP.  Non-first IPv4 fragments do not match
+    tcp_*/udp_*.  IPv6 extension headers are not skipped.
+    """
+
+    def __init__(self, args):
+        # packet_in_filter(MatchFilter) passes None; match every packet
+        super(MatchFilter, self).__init__(args or {})
+        self._checks = ([], [], [])
+        self._vlan_vid = None
+        self._eth_type = None
+        self._ip_proto = None
+        for field, value in self.args.items():
+            if field == 'vlan_vid':
+                self._vlan_vid = value
+            elif field == 'eth_type':
+                self._set('eth_type', value)
+            elif field == 'ip_proto':
+                self._set('ip_proto', value)
+            elif field in _FIELDS:
+                self._compile(field, value)
+            else:
+                raise ValueError('unknown field %s' % field)
+        if (self._ip_proto is not None and
+                self._eth_type not in (None, ether.ETH_TYPE_IP,
+                                       ether.ETH_TYPE_IPV6)):
+            raise ValueError('ip_proto needs IPv4 or IPv6')
+        self._need_l3 = (self._vlan_vid is not None or
+                         self._eth_type is not None or
+                         self._ip_proto is not None or
+                         bool(self._checks[_L3]))
+
+    def _set(self, name, value):
+        attr = '_' + name
+        if getattr(self, attr) not in (None, value):
+            raise ValueError('conflicting %s' % name)
+        setattr(self, attr, value)
+
+    def _compile(self, field, value):
+        (layer, offset, fmt, conv, full_mask,
+         eth_type, ip_proto) = _FIELDS[field]
+        if isinstance(value, tuple):
+            value, mask = value
+            mask = conv(mask) & full_mask
+        else:
+            mask = full_mask
+        if eth_type is not None:
+            self._set('eth_type', eth_type)
+        if ip_proto is not None:
+            self._set('ip_proto', ip_proto)
+        self._checks[layer].append((offset, fmt, mask, conv(value) & mask))
+
+    @staticmethod
+    def _match(checks, data, base):
+        for offset, fmt, mask, value in checks:
+            (field, ) = fmt.unpack_from(data, base + offset)
+            if field & mask != value:
+                return False
+        return True
+
+    def filter_data(self, data):
+        try:
+            if not self._match(self._checks[_L2], data, 0):
+                return False
+            if not self._need_l3:
+                return True
+
+            (eth_type, ) = _UINT16.unpack_from(data, 12)
+            offset = 14
+            if self._vlan_vid is not None:
+                if eth_type not in _VLAN_TYPES:
+                    return False
+                (tci, ) = _UINT16.unpack_from(data, offset)
+                if tci & 0xfff != self._vlan_vid:
+                    return False
+            while eth_type in _VLAN_TYPES:
+                (_tci, eth_type) = _VLAN.unpack_from(data, offset)
+                offset += _VLAN.size
+            if self._eth_type is not None and eth_type != self._eth_type:
+                return False
+            if not self._match(self._checks[_L3], data, offset):
+                return False
+            if self._ip_proto is None:
+                return True
+
+            if eth_type == ether.ETH_TYPE_IP:
+                (ver_ihl, frag, ip_proto) = _IPV4.unpack_from(data, offset)
+                if frag & 0x1fff and self._checks[_L4]:
+                    # no L4 header in non-first fragments
+                    return False
+                offset += (ver_ihl & 0xf) * 4
+            elif eth_type == ether.ETH_TYPE_IPV6:
+                (ip_proto, ) = _UINT8.unpack_from(data, offset + 6)
+                offset += 40
+            else:
+                return False
+            if ip_proto != self._ip_proto:
+                return False
+            return self._match(self._checks[_L4], data, offset)
+        except struct.error:
+            # truncated
+            return False
@@ -2161,13 +2161,15 @@ class BGPMessage(packet_base.PacketBase, _TypeDisp):
         if len(buf) < cls._HDR_LEN:
             raise stream_parser.StreamParser.TooSmallException(
                 '%d < %d' % (len(buf), cls._HDR_LEN))
-        (marker, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR,
-                                                   buffer(buf))
+        (marker, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR, buf)
         msglen = len_
         if len(buf) < msglen:
             raise stream_parser.StreamParser.TooSmallException(
                 '%d < %d' % (len(buf), msglen))
         binmsg = buf[cls._HDR_LEN:msglen]
+        if isinstance(binmsg, memoryview):
+            # the message must not refer to the buffer of StreamParser
+            binmsg = binmsg.tobytes()
         rest = buf[msglen:]
         subcls = cls._lookup_type(type_)
         kwargs = subcls.parser(binmsg)
@@ -131,8 +131,7 @@ class BMPMessage(packet_base.PacketBase, _TypeDisp):
         if len(buf) < cls._HDR_LEN:
             raise stream_parser.StreamParser.TooSmallException(
                 '%d < %d' % (len(buf), cls._HDR_LEN))
-        (version, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR,
-                                                    buffer(buf))
+        (version, len_, type_) = struct.unpack_from(cls._HDR_PACK_STR, buf)
 
         return version, len_, type_
 
@@ -148,6 +147,9 @@ class BMPMessage(packet_base.PacketBase, _TypeDisp):
                 '%d < %d' % (len(buf), msglen))
 
         binmsg = buf[cls._HDR_LEN:msglen]
+        if isinstance(binmsg, memoryview):
+            # the message must not refer to the buffer of StreamParser
+            binmsg = binmsg.tobytes()
         rest = buf[msglen:]
         subcls = cls._lookup_type(type_)
 
@@ -759,3 +761,14 @@ class BMPTermination(BMPMessage):
             msg += value
 
         return msg
+
+
+class StreamParser(stream_parser.StreamParser):
+    """Streaming parser for BMP messages.
+
+    This is a subclass of ryu.lib.packet.stream_parser.StreamParser.
+    Its parse method returns a list of BMPMessage subclass instances.
+    """
+
+    def try_parse(self, data):
+        return BMPMessage.parser(data)
@@ -13,11 +13,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import inspect
+import numbers
+import socket
 import struct
 
 from . import packet_base
 from . import ethernet
+from . import ipv4
+from . import ipv6
+from . import tcp
+from . import udp
+from . import vlan
+from ryu.ofproto import ether
+from ryu.ofproto import inet
 
 
 class Packet(object):
@@ -31,30 +41,76 @@ class Packet(object):
     Protocol headers are instances of subclass of packet_base.PacketBase.
     The payload is a bytearray.  They are iterated in on-wire order.
 
+    If *lazy* is True, headers are decoded on demand, i.e. only as deep
+    as get_protocol() or iteration reaches.  Accessing the whole list
+    of protocols (e.g. self.protocols, len(), get_protocols())
+    decodes all the headers.
+
     *data* should be omitted when encoding a packet.
     """
 
-    def __init__(self, data=None, protocols=None, parse_cls=ethernet.ethernet):
+    def __init__(self, data=None, protocols=None, parse_cls=ethernet.ethernet,
+                 lazy=False):
         super(Packet, self).__init__()
         self.data = data
         if protocols is None:
-            self.protocols = []
+            self._protocols = []
         else:
-            self.protocols = protocols
+            self._protocols = protocols
+        # the class and the data of the next header to decode
+        self._parse_cls = None
+        self._rest_data = None
         if self.data:
-            self._parser(parse_cls)
-
-    def _parser(self, cls):
-        rest_data = self.data
-        while cls:
-            try:
-                proto, cls, rest_data = cls.parser(rest_data)
-            except struct.error:
-                break
+            self._parse_cls = parse_cls
+            self._rest_data = self.data
+            if not lazy:
+                self._parser()
+
+    @property
+    def protocols(self):
+        if self._parse_cls is not None:
+            self._parser()
+        return self._protocols
+
+    @protocols.setter
+    def protocols(self, protocols):
+        self._protocols = protocols
+        self._parse_cls = None
+        self._rest_data = None
+
+    def _parse_next(self):
+        # decode the next header.  returns False if nothing is left.
+        cls = self._parse_cls
+        if cls is None:
+            return False
+        rest_data = self._rest_data
+        try:
+            proto, cls, rest_data = cls.parser(rest_data)
+        except struct.error:
+            cls = None
+        else:
             if proto:
-                self.protocols.append(proto)
-        if rest_data:
-            self.protocols.append(rest_data)
+                self._protocols.append(proto)
+        if cls is None:
+            if rest_data:
+                self._protocols.append(rest_data)
+            rest_data = None
+        self._parse_cls = cls
+        self._rest_data = rest_data
+        return True
+
+    def _parser(self):
+        while self._parse_next():
+            pass
+
+    def _iter_protocols(self):
+        i = 0
+        while True:
+            if i < len(self._protocols):
+                yield self._protocols[i]
+                i += 1
+            elif not self._parse_next():
+                return
 
     def serialize(self):
         """Encode a packet and store the resulted bytearray in self.data.
@@ -100,9 +156,12 @@ class Packet(object):
         """Returns the firstly found protocol that matches to the
         specified protocol.
         """
-        result = self.get_protocols(protocol)
-        if len(result) > 0:
-            return result[0]
+        if isinstance(protocol, packet_base.PacketBase):
+            protocol = protocol.__class__
+        assert issubclass(protocol, packet_base.PacketBase)
+        for p in self._iter_protocols():
+            if isinstance(p, protocol):
+                return p
         return None
 
     def __div__(self, trailer):
@@ -110,9 +169,13 @@ class Packet(object):
         return self
 
     def __iter__(self):
-        return iter(self.protocols)
+        return self._iter_protocols()
 
     def __getitem__(self, idx):
+        if isinstance(idx, numbers.Integral) and idx >= 0:
+            while len(self._protocols) <= idx and self._parse_next():
+                pass
+            return self._protocols[idx]
         return self.protocols[idx]
 
     def __setitem__(self, idx, item):
@@ -135,6 +198,116 @@ class Packet(object):
     __repr__ = __str__  # note: str(list) uses __repr__ for elements
 
 
+PacketHeaders = collections.namedtuple('PacketHeaders', [
+    'eth_dst',      # MAC address string like '08:60:6e:7f:74:e7'
+    'eth_src',
+    'eth_type',     # ethertype after the VLAN tags, see parse_fast()
+    'vlan_vid',     # VID of the outermost VLAN tag, None if untagged
+    'ip_proto',     # protocol (IPv4) or next header (IPv6)
+    'ip_src',       # IPv4/IPv6 address string
+    'ip_dst',
+    'src_port',     # TCP/UDP ports
+    'dst_port',
+    'offset',       # offset of the first byte not parsed
+])
+
+_ETH = struct.Struct('!6s6sH')
+_VLAN = struct.Struct('!HH')
+_IPV4 = struct.Struct('!B5xHxB2x4s4s')
+_IPV6 = struct.Struct('!6xBx16s16s')
+_TCP = struct.Struct('!HH8xB')
+_UDP = struct.Struct('!HH')
+_MAC = struct.Struct('!6B')
+
+_VLAN_TYPES = (ether.ETH_TYPE_8021Q, ether.ETH_TYPE_8021AD)
+
+# the protocol classes parse_fast() can stop after
+_LEVEL_L2 = 1
+_LEVEL_VLAN = 2
+_LEVEL_L3 = 3
+_LEVEL_L4 = 4
+_LEVELS = {
+    ethernet.ethernet: _LEVEL_L2,
+    vlan.vlan: _LEVEL_VLAN,
+    vlan.svlan: _LEVEL_VLAN,
+    ipv4.ipv4: _LEVEL_L3,
+    ipv6.ipv6: _LEVEL_L3,
+    tcp.tcp: _LEVEL_L4,
+    udp.udp: _LEVEL_L4,
+    None: _LEVEL_L4,
+}
+
+
+def _mac_to_text(buf):
+    return '%02x:%02x:%02x:%02x:%02x:%02x' % _MAC.unpack(buf)
+
+
+def parse_fast(data, upto=None):
+    """Extract the common L2-L4 header fields of a packet.
+
+    This is a fast alternative to Packet(data) for the cases where
+    only the addresses and ports are needed, e.g. for PacketIn.
+    No protocol objects are created and the payload is not copied.
+
+    *upto* is one of the protocol classes ethernet, vlan, ipv4, ipv6,
+    tcp and udp.  Parsing stops after the header of the class.
+    None means as deep as possible.  With upto=ethernet the VLAN tags
+    are not parsed, so 'eth_type' is the ethertype of the ethernet
+    header, i.e. the TPID (0x8100 or 0x88a8) of a tagged packet,
+    and 'vlan_vid' is None.
+
+    Returns a PacketHeaders.  Fields which are not parsed, because of
+    *upto*, an unsupported protocol, a non-first IPv4 fragment or
+    a truncated packet, are None.  'offset' is the offset in *data*
+    where parsing stopped, i.e. the payload of the innermost parsed
+    header.
+    """
+    level = _LEVELS[upto]
+    eth_dst = eth_src = eth_type = vlan_vid = None
+    ip_proto = ip_src = ip_dst = src_port = dst_port = None
+    offset = 0
+    try:
+        dst, src, eth_type = _ETH.unpack_from(data)
+        eth_dst = _mac_to_text(dst)
+        eth_src = _mac_to_text(src)
+        offset = _ETH.size
+        if level >= _LEVEL_VLAN:
+            while eth_type in _VLAN_TYPES:
+                tci, eth_type = _VLAN.unpack_from(data, offset)
+                if vlan_vid is None:
+                    vlan_vid = tci & 0xfff
+                offset += _VLAN.size
+
+        if level >= _LEVEL_L3:
+            if eth_type == ether.ETH_TYPE_IP:
+                (ver_ihl, frag, ip_proto, src, dst) = _IPV4.unpack_from(
+                    data, offset)
+                ip_src = socket.inet_ntoa(src)
+                ip_dst = socket.inet_ntoa(dst)
+                offset += (ver_ihl & 0xf) * 4
+                if frag & 0x1fff:
+                    # no L4 header in non-first fragments
+                    level = _LEVEL_L3
+            elif eth_type == ether.ETH_TYPE_IPV6:
+                (ip_proto, src, dst) = _IPV6.unpack_from(data, offset)
+                ip_src = socket.inet_ntop(socket.AF_INET6, src)
+                ip_dst = socket.inet_ntop(socket.AF_INET6, dst)
+                offset += ipv6.ipv6._MIN_LEN
+
+        if level >= _LEVEL_L4:
+            if ip_proto == inet.IPPROTO_TCP:
+                (src_port, dst_port, off) = _TCP.unpack_from(data, offset)
+                offset += (off >> 4) * 4
+            elif ip_proto == inet.IPPROTO_UDP:
+                (src_port, dst_port) = _UDP.unpack_from(data, offset)
+                offset += udp.udp._MIN_LEN
+    except struct.error:
+        pass
+    return PacketHeaders(eth_dst, eth_src, eth_type, vlan_vid,
+                         ip_proto, ip_src, ip_dst, src_port, dst_port,
+                         offset)
+
+
 # XXX: Hack for preventing recursive import
 def _PacketBase__div__(self, trailer):
     pkt = Packet()
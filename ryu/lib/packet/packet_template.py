@@ -0,0 +1,319 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pre-built packet templates.
+
+A PacketTemplate serializes a packet once.  Then it makes new frames by
+copying the bytes and patching the declared fields at fixed offsets.
+Checksums which cover a patched field are updated incrementally.
+No protocol objects are created per frame.
+
+Sample usage::
+
+    from ryu.lib.packet import arp
+    from ryu.lib.packet import ethernet
+    from ryu.lib.packet import packet_template
+    from ryu.ofproto import ether
+
+    tmpl = packet_template.PacketTemplate(
+        [ethernet.ethernet(ethertype=ether.ETH_TYPE_ARP),
+         arp.arp_ip(arp.ARP_REQUEST, src_mac, src_ip,
+                    '00:00:00:00:00:00', '0.0.0.0')],
+        src_mac=[(ethernet.ethernet, 'src'), (arp.arp, 'src_mac')],
+        dst_ip=(arp.arp, 'dst_ip'))
+
+    for dst_ip in targets:
+        datapath.send_packet_out(..., data=tmpl.build(dst_ip=dst_ip))
+
+Only fixed-size fields can be patched, so frames keep the length of
+the template.  The fields of each protocol are listed in _FIELDS.
+"""
+
+import struct
+
+from ryu.lib import addrconv
+from . import arp
+from . import bfd
+from . import ethernet
+from . import icmp
+from . import icmpv6
+from . import ipv4
+from . import ipv6
+from . import lldp
+from . import packet
+from . import packet_base
+from . import packet_utils
+from . import tcp
+from . import udp
+
+
+class _Addr(object):
+    def __init__(self, conv, size):
+        self._conv = conv
+        self.size = size
+
+    def pack(self, value):
+        return self._conv.text_to_bin(value)
+
+
+class _Bytes(object):
+    # raw bytes of the same length as in the template
+    def __init__(self, size):
+        self.size = size
+
+    def pack(self, value):
+        value = str(value)
+        if len(value) != self.size:
+            raise ValueError('length must be %d bytes' % self.size)
+        return value
+
+
+_MAC = _Addr(addrconv.mac, 6)
+_IPV4 = _Addr(addrconv.ipv4, 4)
+_IPV6 = _Addr(addrconv.ipv6, 16)
+_UINT8 = struct.Struct('!B')
+_UINT16 = struct.Struct('!H')
+_UINT32 = struct.Struct('!I')
+
+
+def _lldp_fields(proto):
+    # the values of the ChassisID, PortID and TTL TLVs
+    fields = {}
+    offset = 0
+    for tlv in proto.tlvs:
+        value = offset + lldp.LLDP_TLV_SIZE
+        if isinstance(tlv, lldp.ChassisID):
+            fields['chassis_id'] = (value + 1, _Bytes(len(tlv.chassis_id)))
+        elif isinstance(tlv, lldp.PortID):
+            fields['port_id'] = (value + 1, _Bytes(len(tlv.port_id)))
+        elif isinstance(tlv, lldp.TTL):
+            fields['ttl'] = (value, _UINT16)
+        offset = value + tlv.len
+    return fields
+
+
+# attribute name -> (offset in the header, encoder)
+# or a function which returns such a dict for a protocol instance.
+_FIELDS = {
+    ethernet.ethernet: {
+        'dst': (0, _MAC),
+        'src': (6, _MAC),
+        'ethertype': (12, _UINT16),
+    },
+    arp.arp: {
+        'opcode': (6, _UINT16),
+        'src_mac': (8, _MAC),
+        'src_ip': (14, _IPV4),
+        'dst_mac': (18, _MAC),
+        'dst_ip': (24, _IPV4),
+    },
+    ipv4.ipv4: {
+        'tos': (1, _UINT8),
+        'identification': (4, _UINT16),
+        'ttl': (8, _UINT8),
+        'src': (12, _IPV4),
+        'dst': (16, _IPV4),
+    },
+    ipv6.ipv6: {
+        'hop_limit': (7, _UINT8),
+        'src': (8, _IPV6),
+        'dst': (24, _IPV6),
+    },
+    tcp.tcp: {
+        'src_port': (0, _UINT16),
+        'dst_port': (2, _UINT16),
+        'seq': (4, _UINT32),
+        'ack': (8, _UINT32),
+    },
+    udp.udp: {
+        'src_port': (0, _UINT16),
+        'dst_port': (2, _UINT16),
+    },
+    icmp.icmp: {
+        # icmp.echo
+        'id': (4, _UINT16),
+        'seq': (6, _UINT16),
+    },
+    bfd.bfd: {
+        'detect_mult': (2, _UINT8),
+        'my_discr': (4, _UINT32),
+        'your_discr': (8, _UINT32),
+        'desired_min_tx_interval': (12, _UINT32),
+        'required_min_rx_interval': (16, _UINT32),
+        'required_min_echo_rx_interval': (20, _UINT32),
+    },
+    lldp.lldp: _lldp_fields,
+}
+
+
+def _pseudo_header(prev, prev_offset):
+    # the ranges of the addresses in the IP pseudo header
+    if isinstance(prev, ipv4.ipv4):
+        return [(prev_offset + 12, prev_offset + 20)]
+    elif isinstance(prev, ipv6.ipv6):
+        return [(prev_offset + 8, prev_offset + 40)]
+    raise ValueError('%s needs IPv4 or IPv6' % prev.protocol_name)
+
+
+def _checksum(proto, offset, length, total, prev, prev_offset):
+    # returns the offset of the checksum of the header and the ranges
+    # of the frame which it covers, or None.
+    if isinstance(proto, ipv4.ipv4):
+        return offset + 10, [(offset, offset + length)]
+    elif isinstance(proto, icmp.icmp):
+        return offset + 2, [(offset, offset + length)]
+    elif isinstance(proto, (tcp.tcp, udp.udp, icmpv6.icmpv6)):
+        if isinstance(proto, tcp.tcp):
+            csum_offset = offset + 16
+        elif isinstance(proto, udp.udp):
+            csum_offset = offset + 6
+        else:
+            csum_offset = offset + 2
+        return (csum_offset,
+                _pseudo_header(prev, prev_offset) + [(offset, total)])
+    return None
+
+
+class PacketTemplate(object):
+    """A packet serialized once and copied with some fields patched.
+
+    *protocols* is a Packet or a list of protocols in on-wire order
+    like Packet.protocols.  They are serialized by the constructor.
+
+    *fields* declares the fields which build() patches.  A value is
+    (proto, attr) or a list of them to patch several places at once.
+    proto is a protocol class, meaning the first header of the class,
+    or a protocol instance in *protocols*.  attr is one of the keys of
+    _FIELDS for the class.
+    """
+
+    def __init__(self, protocols, **fields):
+        super(PacketTemplate, self).__init__()
+        if isinstance(protocols, packet.Packet):
+            protocols = protocols.protocols
+        self.protocols = protocols
+        offsets, self.data = self._serialize(protocols)
+
+        self._csums = []
+        for i, proto in enumerate(protocols):
+            if not isinstance(proto, packet_base.PacketBase):
+                continue
+            length = offsets[i + 1] - offsets[i]
+            if i:
+                prev, prev_offset = protocols[i - 1], offsets[i - 1]
+            else:
+                prev, prev_offset = None, None
+            csum = _checksum(proto, offsets[i], length, len(self.data),
+                             prev, prev_offset)
+            if csum is not None:
+                self._csums.append(csum)
+        for _csum_offset, ranges in self._csums:
+            for start, _end in ranges:
+                # checksum_update() works on 16-bit words
+                assert start % 2 == 0
+
+        self._fields = {}
+        for name, places in fields.items():
+            if not isinstance(places, list):
+                places = [places]
+            self._fields[name] = [self._field(offsets, proto, attr)
+                                  for proto, attr in places]
+
+    @staticmethod
+    def _serialize(protocols):
+        # same as Packet.serialize except for recording the offset of
+        # each header.  the last offset is the length of the frame.
+        data = bytearray()
+        ends = []
+        r = protocols[::-1]
+        for i, p in enumerate(r):
+            if isinstance(p, packet_base.PacketBase):
+                if i == len(r) - 1:
+                    prev = None
+                else:
+                    prev = r[i + 1]
+                data = p.serialize(data, prev) + data
+            else:
+                data = str(p) + data
+            ends.append(len(data))
+        total = len(data)
+        offsets = [total - end for end in reversed(ends)]
+        offsets.append(total)
+        return offsets, bytearray(data)
+
+    def _field(self, offsets, proto, attr):
+        for i, p in enumerate(self.protocols):
+            if p is proto or (isinstance(proto, type) and
+                              isinstance(p, proto)):
+                break
+        else:
+            raise ValueError('%s is not in the template' % proto)
+
+        fields = None
+        for cls in type(p).__mro__:
+            if cls in _FIELDS:
+                fields = _FIELDS[cls]
+                break
+        if callable(fields):
+            fields = fields(p)
+        if not fields or attr not in fields:
+            raise ValueError('%s.%s can not be patched' %
+                             (p.protocol_name, attr))
+        offset, encoder = fields[attr]
+        return offsets[i] + offset, encoder
+
+    def _patch(self, buf, offset, value, skip=None):
+        end = offset + len(value)
+        # the 16-bit words which contain the field
+        word_start = offset & ~1
+        word_end = (end + 1) & ~1
+        old = buf[word_start:word_end]
+        buf[offset:end] = value
+        new = buf[word_start:word_end]
+        if len(old) % 2:
+            # the last odd byte is padded with zero
+            old.append(0)
+            new.append(0)
+
+        for csum in self._csums:
+            if csum is skip:
+                continue
+            csum_offset, ranges = csum
+            for start, range_end in ranges:
+                if word_start < range_end and start < word_end:
+                    break
+            else:
+                continue
+            (old_csum, ) = _UINT16.unpack_from(buf, csum_offset)
+            new_csum = packet_utils.checksum_update(old_csum, old, new)
+            # the checksum might be covered by another one
+            self._patch(buf, csum_offset, _UINT16.pack(new_csum), csum)
+
+    def build(self, **values):
+        """Returns a new frame as a bytearray.
+
+        Each keyword argument sets the field declared with the name.
+        The other fields keep the values of the template.
+        """
+        buf = bytearray(self.data)
+        for name, value in values.items():
+            try:
+                places = self._fields[name]
+            except KeyError:
+                raise ValueError('unknown field %s' % name)
+            for offset, encoder in places:
+                self._patch(buf, offset, encoder.pack(value))
+        return buf
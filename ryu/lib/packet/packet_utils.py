@@ -18,23 +18,78 @@ import socket
 import struct
 from ryu.lib import addrconv
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# use numpy for data of this size or larger, where it outruns array
+_NUMPY_MIN_LEN = 1024
+
 
 def carry_around_add(a, b):
     c = a + b
     return (c & 0xffff) + (c >> 16)
 
 
+def _fold(s):
+    while s >> 16:
+        s = (s & 0xffff) + (s >> 16)
+    return s
+
+
+def _checksum_numpy(data, length):
+    words = numpy.frombuffer(data, dtype='>u2', count=length // 2)
+    s = int(words.sum(dtype=numpy.uint64))
+    if length % 2:
+        s += bytearray(data[-1:])[0] << 8
+    return ~_fold(s) & 0xffff
+
+
 def checksum(data):
-    if len(data) % 2:
-        data += '\x00'
+    """
+    calculate the Internet checksum (RFC 1071) of data
 
-    data = str(data)    # input can be bytearray.
+    data can be str, bytearray or memoryview.  If numpy is available,
+    it is used for large data.
+    """
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    length = len(data)
+    if numpy is not None and length >= _NUMPY_MIN_LEN:
+        return _checksum_numpy(data, length)
+
+    if length % 2:
+        # not data += '\x00', which would extend a bytearray in place
+        data = str(data) + '\x00'
+    else:
+        data = str(data)    # input can be bytearray.
     s = sum(array.array('H', data))
     s = (s & 0xffff) + (s >> 16)
     s += (s >> 16)
     return socket.ntohs(~s & 0xffff)
 
 
+def checksum_update(csum, old, new):
+    """
+    update the Internet checksum incrementally (RFC 1624)
+
+    Returns the checksum of data whose checksum was csum after the
+    bytes old in it are replaced with new, e.g. the TTL and protocol
+    fields of an IPv4 header or an address.  old and new must be of
+    the same even length and start at an even offset in the data.
+    """
+    assert len(old) == len(new) and len(old) % 2 == 0
+    n = len(old) // 2
+    fmt = '!%dH' % n
+    # HC' = ~(~HC + ~m + m')  [RFC 1624 Eqn. 3]
+    # where the sum of ~m is n * 0xffff - sum(m)
+    s = ((~csum & 0xffff) + n * 0xffff -
+         sum(struct.unpack(fmt, str(old))) + sum(struct.unpack(fmt, str(new))))
+    return ~_fold(s) & 0xffff
+
+
 # avoid circular import
 _IPV4_PSEUDO_HEADER_PACK_STR = '!4s4sxBH'
 _IPV6_PSEUDO_HEADER_PACK_STR = '!16s16sI3xB'
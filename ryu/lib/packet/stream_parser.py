@@ -34,8 +34,31 @@ class StreamParser(object):
     class TooSmallException(Exception):
         pass
 
+    # the consumed bytes at the head of the buffer are removed when
+    # they exceed this size or when all the bytes have been consumed.
+    _COMPACT_SIZE = 65536
+
     def __init__(self):
         self._q = bytearray()
+        # the offset of the first byte not consumed yet in self._q
+        self._offset = 0
+
+    def _append(self, data):
+        offset = self._offset
+        if offset == len(self._q):
+            self._q = bytearray(data)
+            self._offset = 0
+            return
+        try:
+            if offset >= self._COMPACT_SIZE:
+                del self._q[:offset]
+                self._offset = 0
+            self._q += data
+        except BufferError:
+            # a message returned by try_parse refers to the buffer.
+            # leave it alone and start a new one.
+            self._q = self._q[self._offset:] + data
+            self._offset = 0
 
     def parse(self, data):
         """Tries to extract messages from a raw byte stream.
@@ -50,14 +73,23 @@ class StreamParser(object):
         kept internally and will be used when more data is come.
         I.e. next time this method is called again.
         """
-        self._q.append(data)
+        self._append(data)
         msgs = []
-        while True:
-            try:
-                msg, self._q = self.try_parse(self._q)
-            except self.TooSmallException:
-                break
-            msgs.append(msg)
+        q = self._q
+        view = memoryview(q)
+        offset = self._offset
+        try:
+            while True:
+                try:
+                    msg, rest = self.try_parse(view[offset:])
+                except self.TooSmallException:
+                    break
+                offset = len(q) - len(rest)
+                msgs.append(msg)
+        finally:
+            self._offset = offset
+            # release the buffer so that it can be resized
+            del view
         return msgs
 
     @abstractmethod
@@ -67,7 +99,11 @@ class StreamParser(object):
         This is an override point for subclasses.
 
         This method tries to extract a message from bytes given by the
-        argument.
+        argument.  The argument is a memoryview of the buffered data.
+
+        Returns a tuple of the message and the rest of the data, which
+        is a tail of the argument.  The message should not refer to
+        the memoryview because the buffer is reused.
 
         Raises TooSmallException if the given data is not enough to
         extract a complete message but there's still a chance to extract
@@ -2,6 +2,10 @@
 Parsing libpcap and reading/writing PCAP file.
 Reference source: http://wiki.wireshark.org/Development/LibpcapFileFormat
 
+Reader also understands pcap files with nanosecond timestamps and
+pcapng files (Section Header, Interface Description, Enhanced,
+Simple and obsolete Packet Blocks; other blocks are skipped).
+
 
                   Libpcap File Format
 
@@ -43,7 +47,7 @@ Sample usage of dump packets:
             # Dump the data packet into PCAP file
             self.pcap_pen.write_pkt(msg.data)
 
-            pkt = packet.Packet(msg.data)
+            pkt = ev.packet
 
 Sample usage of reading PCAP files:
 
@@ -51,26 +55,49 @@ Sample usage of reading PCAP files:
     from ryu.lib.packet import packet
 
     frame_count = 0
-    # Using the Reader iterator that yields packets in PCAP file
-    for ts, buf in pcaplib.Reader(open('test.pcap', 'rb')):
-        frame_count += 1
-        pkt = packet.Packet(buf)
+    # Using the Reader iterator that yields packets in PCAP file.
+    with pcaplib.Reader(open('test.pcap', 'rb')) as reader:
+        for ts, buf in reader:
+            frame_count += 1
+            pkt = packet.Packet(buf)
 
-        eth = pkt.get_protocols(ethernet.ethernet)[0]
+            eth = pkt.get_protocols(ethernet.ethernet)[0]
 
-        dst = eth.dst
-        src = eth.src
-        # print frames count, timestamp, ethernet src, ethernet dst
-        # and raw packet.
-        print frame_count, ts, dst, src, pkt
+            dst = eth.dst
+            src = eth.src
+            # print frames count, timestamp, ethernet src, ethernet dst
+            # and raw packet.
+            print frame_count, ts, dst, src, pkt
 
 """
 
+import mmap
 import struct
-import sys
 import time
 
 
+_PCAP_MAGIC = 0xa1b2c3d4
+# timestamps in nanoseconds instead of microseconds
+_PCAP_MAGIC_NSEC = 0xa1b23c4d
+_PCAP_FILE_HDR_LEN = 24
+
+_PCAPNG_SHB_TYPE = '\x0a\x0d\x0d\x0a'
+_PCAPNG_BYTE_ORDER_MAGIC = 0x1a2b3c4d
+_PCAPNG_BYTE_ORDER_MAGIC_SWAPPED = 0x4d3c2b1a
+# block type, block total length and the trailing block total length
+_PCAPNG_BLOCK_HDR_LEN = 12
+
+# pcapng block types
+_PCAPNG_IDB = 1     # Interface Description Block
+_PCAPNG_PB = 2      # Packet Block (obsolete)
+_PCAPNG_SPB = 3     # Simple Packet Block
+_PCAPNG_EPB = 6     # Enhanced Packet Block
+
+# pcapng option codes
+_PCAPNG_OPT_ENDOFOPT = 0
+_PCAPNG_OPT_IF_TSRESOL = 9
+
+
 class PcapFileHdr(object):
     """
     Global Header
@@ -117,11 +144,11 @@ class PcapFileHdr(object):
 
     @classmethod
     def parser(cls, buf):
-        if buf[:4] == '\xa1\xb2\xc3\xd4':
+        if buf[:4] in ('\xa1\xb2\xc3\xd4', '\xa1\xb2\x3c\x4d'):
             # Big Endian
             cls._FILE_HDR_FMT = '>IHHIIII'
             byteorder = '>'
-        elif buf[:4] == '\xd4\xc3\xb2\xa1':
+        elif buf[:4] in ('\xd4\xc3\xb2\xa1', '\x4d\x3c\xb2\xa1'):
             # Little Endian
             cls._FILE_HDR_FMT = '<IHHIIII'
             byteorder = '<'
@@ -194,95 +221,246 @@ class PcapPktHdr(object):
 
 
 class Reader(object):
-    _FILE_HDR_FMT = '>IHHIIII'
-    _PKT_HDR_FMT = '>IIII'
+    """
+    Iterator over the packet records in a pcap or pcapng file.
 
-    _PKT_HDR_LEN = struct.calcsize(_PKT_HDR_FMT)
-    _FILE_HDR_FMT_LEN = struct.calcsize(_FILE_HDR_FMT)
+    Yields (ts, buf) tuples.  ts is the timestamp in seconds as a float,
+    or None for pcapng Simple Packet Blocks which carry no timestamp.
+    buf is a str of the captured data.
 
-    def __init__(self, file_obj):
-        self._fp = file_obj
-        # self.__filename = filename
-        self._file_byteorder = None
-        self._hdr_data = None
-        self.incl_len_pos = 0
+    Regular files are memory-mapped.  Other file objects are read
+    chunk_size bytes at a time.  Either way each record is located in
+    constant time and the whole capture is never held in memory.
 
-    def __iter__(self):
-        buf = self._fp.read(Reader._FILE_HDR_FMT_LEN)
-        # Only Read PCAP file from 0 to 24th byte
-        (filehdr, self._file_byteorder) = PcapFileHdr.parser(buf)
+    The file is closed at the end of the iteration, by close(), or at
+    the end of a with statement.
+    """
+
+    _CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, file_obj, chunk_size=_CHUNK_SIZE):
+        self._fp = file_obj
+        self._chunk_size = chunk_size
+        self._records = None
+        self._eof = False
+        try:
+            self._buf = mmap.mmap(file_obj.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except (AttributeError, EnvironmentError, ValueError):
+            # not a regular file, or an empty one
+            self._buf = ''
+            self._pos = 0
+            self._map = False
+        else:
+            self._pos = file_obj.tell()
+            self._map = True
 
-        # self._fp.seek(Reader._FILE_HDR_FMT_LEN)
+    def __enter__(self):
+        return self
 
-        # Read PCAP file from 24th byte to EOF
-        self._hdr_data = self._fp.read()
+    def __exit__(self, *_args):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and close the file.  The iteration
+        ends.
+        """
+        if self._map:
+            self._buf.close()
+            self._map = False
+        self._buf = ''
+        self._pos = 0
+        self._eof = True
         self._fp.close()
 
+    def _ensure(self, size):
+        # make sure that size bytes are available at self._pos
+        avail = len(self._buf) - self._pos
+        if avail >= size:
+            return True
+        if self._map or self._eof:
+            return False
+
+        chunks = [self._buf[self._pos:]]
+        while avail < size:
+            data = self._fp.read(max(self._chunk_size, size - avail))
+            if not data:
+                self._eof = True
+                break
+            chunks.append(data)
+            avail += len(data)
+        self._buf = ''.join(chunks)
+        self._pos = 0
+        return avail >= size
+
+    def _record(self, offset, length):
+        # a copy, which stays valid after the buffer is refilled or
+        # unmapped.  Packet and Writer expect str.
+        return self._buf[offset:offset + length]
+
+    def _iter_pcap(self):
+        (filehdr, byteorder) = PcapFileHdr.parser(
+            self._buf[self._pos:self._pos + _PCAP_FILE_HDR_LEN])
+        self._pos += _PCAP_FILE_HDR_LEN
+        if filehdr.magic == _PCAP_MAGIC_NSEC:
+            ts_div = 1e9
+        else:
+            ts_div = 1e6
+
+        pkt_hdr = struct.Struct(byteorder + 'IIII')
+        while self._ensure(pkt_hdr.size):
+            (ts_sec, ts_frac, incl_len,
+             _orig_len) = pkt_hdr.unpack_from(self._buf, self._pos)
+            if not self._ensure(pkt_hdr.size + incl_len):
+                break
+            offset = self._pos + pkt_hdr.size
+            self._pos = offset + incl_len
+            yield ts_sec + ts_frac / ts_div, self._record(offset, incl_len)
+
+    def _if_ts_div(self, byteorder, offset, end):
+        # returns the divisor of timestamps from the if_tsresol option
+        # in the options of an Interface Description Block.
+        opt_hdr = struct.Struct(byteorder + 'HH')
+        while offset + opt_hdr.size <= end:
+            code, length = opt_hdr.unpack_from(self._buf, offset)
+            if code == _PCAPNG_OPT_ENDOFOPT:
+                break
+            if code == _PCAPNG_OPT_IF_TSRESOL and length >= 1:
+                (tsresol, ) = struct.unpack_from('B', self._buf,
+                                                 offset + opt_hdr.size)
+                if tsresol & 0x80:
+                    return float(2 ** (tsresol & 0x7f))
+                return float(10 ** tsresol)
+            offset += opt_hdr.size + length + (-length % 4)
+        return 1e6
+
+    def _iter_pcapng(self):
+        byteorder = None
+        ts_divs = []
+        while self._ensure(_PCAPNG_BLOCK_HDR_LEN):
+            pos = self._pos
+            if self._buf[pos:pos + 4] == _PCAPNG_SHB_TYPE:
+                # Section Header Block, which decides the byte order
+                # of the section.
+                (bom, ) = struct.unpack_from('<I', self._buf, pos + 8)
+                if bom == _PCAPNG_BYTE_ORDER_MAGIC:
+                    byteorder = '<'
+                elif bom == _PCAPNG_BYTE_ORDER_MAGIC_SWAPPED:
+                    byteorder = '>'
+                else:
+                    raise Exception('Invalid pcapng file.')
+                ts_divs = []
+            elif byteorder is None:
+                raise Exception('Invalid pcapng file.')
+
+            (block_type, block_len) = struct.unpack_from(byteorder + 'II',
+                                                         self._buf, pos)
+            if block_len < _PCAPNG_BLOCK_HDR_LEN:
+                raise Exception('Invalid pcapng block length.')
+            if not self._ensure(block_len):
+                break
+            pos = self._pos
+            self._pos = pos + block_len
+            end = pos + block_len - 4
+
+            if block_type == _PCAPNG_IDB:
+                ts_divs.append(self._if_ts_div(byteorder, pos + 16, end))
+            elif block_type in (_PCAPNG_EPB, _PCAPNG_PB):
+                if block_type == _PCAPNG_EPB:
+                    (if_id, ts_high, ts_low, caplen,
+                     _len) = struct.unpack_from(byteorder + 'IIIII',
+                                                self._buf, pos + 8)
+                else:
+                    (if_id, _drops, ts_high, ts_low, caplen,
+                     _len) = struct.unpack_from(byteorder + 'HHIIII',
+                                                self._buf, pos + 8)
+                if if_id < len(ts_divs):
+                    ts_div = ts_divs[if_id]
+                else:
+                    ts_div = 1e6
+                ts = ((ts_high << 32) | ts_low) / ts_div
+                yield ts, self._record(pos + 28, min(caplen, end - pos - 28))
+            elif block_type == _PCAPNG_SPB:
+                (orig_len, ) = struct.unpack_from(byteorder + 'I',
+                                                  self._buf, pos + 8)
+                yield None, self._record(pos + 12,
+                                         min(orig_len, end - pos - 12))
+
+    def _iter_records(self):
+        if self._ensure(4):
+            if self._buf[self._pos:self._pos + 4] == _PCAPNG_SHB_TYPE:
+                records = self._iter_pcapng()
+            elif self._ensure(_PCAP_FILE_HDR_LEN):
+                records = self._iter_pcap()
+            else:
+                raise Exception('Invalid pcap file.')
+            for record in records:
+                yield record
+        self.close()
+
+    def __iter__(self):
+        if self._records is None:
+            self._records = self._iter_records()
         return self
 
     def next(self):
-        try:
-            pkt_hdr, pkt_data = PcapPktHdr.parser(self._file_byteorder,
-                                                  self._hdr_data
-                                                  [self.incl_len_pos:])
+        return iter(self)._records.next()
 
-            next_pos = pkt_hdr.incl_len + Reader._PKT_HDR_LEN
-            self.incl_len_pos += next_pos
-        except IndexError:
-            raise StopIteration
 
-        return float(pkt_hdr.ts_sec + (pkt_hdr.ts_usec / 1e6)), pkt_data
+class Writer(object):
+    _PKT_HDR = struct.Struct('=IIII')
 
+    # flush write_pkts() after this many bytes
+    _BATCH_SIZE = 1024 * 1024
 
-class Writer(object):
     def __init__(self, file_obj, snaplen=65535, linktype=1):
         self._f = file_obj
         self._write_pcap_file_hdr(snaplen, linktype)
 
     def _write_pcap_file_hdr(self, snaplen, linktype):
-        if sys.byteorder == 'little':
-            pcap_file_hdr = PcapFileHdr(magic=0xa1b2c3d4,
-                                        snaplen=snaplen,
-                                        linktype=linktype)
-            p = pcap_file_hdr.serialize(fmt='<IHHIIII')
-        else:
-            pcap_file_hdr, byteorder = PcapFileHdr(magic=0xd4c3b2a1,
-                                                   naplen=snaplen,
-                                                   linktype=linktype)
-            p = pcap_file_hdr.serialize(fmt='>IHHIIII')
-        self._f.write(str(p))
-
-    def _write_pkt_hdr(self, ts, buf_str_len):
-        sec = int(ts)
-        if sec == 0:
-            usec = 0
-        else:
-            usec = int(ts * 1e6) % int(ts)
-
-        if sys.byteorder == 'little':
-            # usec = int(ts * 1e6) % int(ts)
-            # old_usec = int((float(ts) - int(ts)) * 1e6)
-            pc_pkt_hdr = PcapPktHdr(ts_sec=sec,
-                                    ts_usec=usec,
-                                    incl_len=buf_str_len,
-                                    orig_len=buf_str_len)
-            p = pc_pkt_hdr.serialize(fmt='<IIII')
-        else:
-            pc_pkt_hdr = PcapPktHdr(ts_sec=sec,
-                                    ts_usec=usec,
-                                    incl_len=buf_str_len,
-                                    orig_len=buf_str_len)
-            p = pc_pkt_hdr.serialize(fmt='>IIII')
-        self._f.write(str(p))
+        # written in the native byte order, which the magic tells readers
+        pcap_file_hdr = PcapFileHdr(magic=_PCAP_MAGIC,
+                                    snaplen=snaplen,
+                                    linktype=linktype)
+        self._f.write(pcap_file_hdr.serialize(fmt='=IHHIIII'))
 
-    def write_pkt(self, buf, ts=None):
+    def _serialize_pkt(self, buf, ts):
         if ts is None:
             ts = time.time()
-
-        buf_str = str(buf)
+        if isinstance(buf, memoryview):
+            buf_str = buf.tobytes()
+        else:
+            buf_str = str(buf)
         buf_str_len = len(buf_str)
-        self._write_pkt_hdr(ts, buf_str_len)
-        self._f.write(buf_str)
+        sec, usec = divmod(int(round(ts * 1e6)), 1000000)
+        return self._PKT_HDR.pack(sec, usec, buf_str_len,
+                                  buf_str_len), buf_str
+
+    def write_pkt(self, buf, ts=None):
+        pkt_hdr, buf_str = self._serialize_pkt(buf, ts)
+        self._f.write(pkt_hdr + buf_str)
+
+    def write_pkts(self, pkts):
+        """
+        Write an iterable of (ts, buf) records, e.g. a Reader.
+
+        The records are joined and written to the file in batches
+        instead of with two writes per packet.
+        """
+        chunks = []
+        size = 0
+        for ts, buf in pkts:
+            pkt_hdr, buf_str = self._serialize_pkt(buf, ts)
+            chunks.append(pkt_hdr)
+            chunks.append(buf_str)
+            size += len(pkt_hdr) + len(buf_str)
+            if size >= self._BATCH_SIZE:
+                self._f.write(''.join(chunks))
+                del chunks[:]
+                size = 0
+        if chunks:
+            self._f.write(''.join(chunks))
 
     def __del__(self):
         self._f.close()
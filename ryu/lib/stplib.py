@@ -267,7 +267,7 @@ class Stp(app_manager.RyuApp):
     def packet_in_handler(self, ev):
         if ev.msg.datapath.id in self.bridge_list:
             bridge = self.bridge_list[ev.msg.datapath.id]
-            bridge.packet_in_handler(ev.msg)
+            bridge.packet_in_handler(ev.msg, ev.packet)
 
     @set_ev_cls(ofp_event.EventOFPPortStatus, handler.MAIN_DISPATCHER)
     def port_status_handler(self, ev):
@@ -448,17 +448,13 @@ class Bridge(object):
         if init_stp_flg:
             self.recalculate_spanning_tree()
 
-    def packet_in_handler(self, msg):
+    def packet_in_handler(self, msg, pkt):
         dp = msg.datapath
         if dp.ofproto == ofproto_v1_0:
             in_port_no = msg.in_port
         else:
             assert dp.ofproto == ofproto_v1_2 or dp.ofproto == ofproto_v1_3
-            in_port_no = None
-            for match_field in msg.match.fields:
-                if match_field.header == dp.ofproto.OXM_OF_IN_PORT:
-                    in_port_no = match_field.value
-                    break
+            in_port_no = msg.match.get('in_port')
         if in_port_no not in self.ports:
             return
 
@@ -466,7 +462,6 @@ class Bridge(object):
         if in_port.state == PORT_STATE_DISABLE:
             return
 
-        pkt = packet.Packet(msg.data)
         if bpdu.ConfigurationBPDUs in pkt:
             """ Receive Configuration BPDU.
                  - If receive superior BPDU:
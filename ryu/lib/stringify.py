@@ -38,12 +38,11 @@ import inspect
 # 'len', 'property', 'set', 'type'
 # A bit more generic way is adopted
 import __builtin__
-_RESERVED_KEYWORD = dir(__builtin__)
+_RESERVED_KEYWORD = frozenset(dir(__builtin__))
 
 
 _mapdict = lambda f, d: dict([(k, f(v)) for k, v in d.items()])
 _mapdict_key = lambda f, d: dict([(f(k), v) for k, v in d.items()])
-_mapdict_kv = lambda f, d: dict([(k, f(k, v)) for k, v in d.items()])
 
 
 class TypeDescr(object):
@@ -76,6 +75,23 @@ _types = {
 }
 
 
+# The encode/decode plans are computed once per class and cached below.
+#
+# class -> {attribute name: TypeDescr or None}
+_type_plans = {}
+# (class, encode_string) -> the default encoder
+_default_encoders = {}
+# (class, decode_string) -> the default decoder
+_default_decoders = {}
+# the callers may give a new encode_string each time.
+_DEFAULT_CODERS_MAX = 1024
+# class -> {tuple of the instance attribute names: the stringify attributes}
+_attr_plans = {}
+_ATTR_PLANS_MAX = 64
+# class -> True if obj_python_attrs() can use the plans
+_use_attr_plans = {}
+
+
 class StringifyMixin(object):
 
     _TYPE = {}
@@ -141,18 +157,36 @@ class StringifyMixin(object):
 
     @classmethod
     def _get_type(cls, k):
-        if hasattr(cls, '_TYPE'):
-            for t, attrs in cls._TYPE.iteritems():
-                if k in attrs:
-                    return _types[t]
-        return None
+        try:
+            types = _type_plans[cls]
+        except KeyError:
+            types = {}
+            for t, attrs in getattr(cls, '_TYPE', {}).iteritems():
+                for attr in attrs:
+                    types.setdefault(attr, _types[t])
+            _type_plans[cls] = types
+        return types.get(k)
+
+    @classmethod
+    def _get_default_coder(cls, coders, get_coder, string_coder):
+        key = (cls, string_coder)
+        try:
+            return coders[key]
+        except KeyError:
+            pass
+        if len(coders) >= _DEFAULT_CODERS_MAX:
+            coders.clear()
+        coder = coders[key] = get_coder(string_coder)
+        return coder
 
     @classmethod
     def _get_encoder(cls, k, encode_string):
         t = cls._get_type(k)
         if t:
             return t.encode
-        return cls._get_default_encoder(encode_string)
+        return cls._get_default_coder(_default_encoders,
+                                      cls._get_default_encoder,
+                                      encode_string)
 
     @classmethod
     def _encode_value(cls, k, v, encode_string=base64.b64encode):
@@ -161,7 +195,10 @@ class StringifyMixin(object):
     @classmethod
     def _get_default_encoder(cls, encode_string):
         def _encode(v):
-            if isinstance(v, (bytes, unicode)):
+            if v is None or isinstance(v, (int, long, float)):
+                # no to_jsondict()
+                json_value = v
+            elif isinstance(v, (bytes, unicode)):
                 json_value = encode_string(v)
             elif isinstance(v, list):
                 json_value = map(_encode, v)
@@ -209,9 +246,9 @@ class StringifyMixin(object):
         =============  =====================================================
         """
         dict_ = {}
-        encode = lambda k, x: self._encode_value(k, x, encode_string)
+        get_encoder = self._get_encoder
         for k, v in obj_attrs(self):
-            dict_[k] = encode(k, v)
+            dict_[k] = get_encoder(k, encode_string)(v)
         return {self.__class__.__name__: dict_}
 
     @classmethod
@@ -233,7 +270,9 @@ class StringifyMixin(object):
         t = cls._get_type(k)
         if t:
             return t.decode
-        return cls._get_default_decoder(decode_string)
+        return cls._get_default_coder(_default_decoders,
+                                      cls._get_default_decoder,
+                                      decode_string)
 
     @classmethod
     def _decode_value(cls, k, json_value, decode_string=base64.b64decode,
@@ -243,7 +282,10 @@ class StringifyMixin(object):
     @classmethod
     def _get_default_decoder(cls, decode_string):
         def _decode(json_value, **additional_args):
-            if isinstance(json_value, (bytes, unicode)):
+            if json_value is None or isinstance(json_value,
+                                                (int, long, float)):
+                v = json_value
+            elif isinstance(json_value, (bytes, unicode)):
                 v = decode_string(json_value)
             elif isinstance(json_value, list):
                 v = map(_decode, json_value)
@@ -296,9 +338,12 @@ class StringifyMixin(object):
         additional_args (Optional) Additional kwargs for constructor.
         =============== =====================================================
         """
-        decode = lambda k, x: cls._decode_value(k, x, decode_string,
-                                                **additional_args)
-        kwargs = cls._restore_args(_mapdict_kv(decode, dict_))
+        decode_value = cls._decode_value
+        kwargs = {}
+        for k, json_value in dict_.iteritems():
+            kwargs[k] = decode_value(k, json_value, decode_string,
+                                     **additional_args)
+        kwargs = cls._restore_args(kwargs)
         try:
             return cls(**dict(kwargs, **additional_args))
         except TypeError:
@@ -324,6 +369,41 @@ def obj_python_attrs(msg_):
         for k in msg_._fields:
             yield(k, getattr(msg_, k))
         return
+    cls = msg_.__class__
+    try:
+        use_plans = _use_attr_plans[cls]
+    except KeyError:
+        # dir() of an instance is the names in its __dict__ and dir() of
+        # its class unless __dir__ is overridden.
+        use_plans = _use_attr_plans[cls] = '__dir__' not in dir(cls)
+    dict_ = getattr(msg_, '__dict__', None)
+    if not use_plans or dict_ is None:
+        for k, v in _obj_python_attrs_slow(msg_):
+            yield (k, v)
+        return
+
+    # the same as _obj_python_attrs_slow().  the names other than
+    # the ones in __dict__ are attributes of the class.
+    keys = tuple(dict_)
+    plans = _attr_plans.setdefault(cls, {})
+    try:
+        attrs = plans[keys]
+    except KeyError:
+        base = getattr(msg_, '_base_attributes', [])
+        attrs = sorted(k for k in keys
+                       if not k.startswith('_') and k not in base and
+                       not hasattr(cls, k))
+        if len(plans) >= _ATTR_PLANS_MAX:
+            plans.clear()
+        plans[keys] = attrs
+    for k in attrs:
+        v = dict_[k]
+        if callable(v):
+            continue
+        yield (k, v)
+
+
+def _obj_python_attrs_slow(msg_):
     base = getattr(msg_, '_base_attributes', [])
     for k, v in inspect.getmembers(msg_):
         if k.startswith('_'):
@@ -0,0 +1,101 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Hashed timer wheel for a large number of coarse timeouts.
+
+Adding and cancelling a timer is O(1) and a single thread serves every
+timer of a wheel, unlike hub.spawn_after() which spawns a thread per
+timer.  Timers expire on tick boundaries, i.e. up to one tick late and
+never early.
+"""
+
+import logging
+import math
+
+from ryu.lib import hub
+
+
+LOG = logging.getLogger('ryu.lib.timer_wheel')
+
+
+class Timer(object):
+    def __init__(self, rounds, callback, args):
+        super(Timer, self).__init__()
+        self.rounds = rounds
+        self.callback = callback
+        self.args = args
+        self.slot = None
+
+    def cancel(self):
+        """Cancel the timer.  Cancelling an expired timer is no-op."""
+        if self.slot is not None:
+            self.slot.discard(self)
+            self.slot = None
+
+
+class TimerWheel(object):
+    def __init__(self, tick=0.1, num_slots=512):
+        super(TimerWheel, self).__init__()
+        self.tick = tick
+        self._slots = [set() for _i in range(num_slots)]
+        self._cursor = 0
+        self._thread = None
+
+    def __len__(self):
+        return sum(len(slot) for slot in self._slots)
+
+    def add(self, timeout, callback, *args):
+        """
+        Call callback(*args) after timeout seconds.
+
+        Returns a Timer which can be cancelled.
+        """
+        ticks = max(1, int(math.ceil(timeout / self.tick)))
+        if self._thread is not None:
+            # part of the current tick has passed.  don't count it.
+            ticks += 1
+        num_slots = len(self._slots)
+        timer = Timer((ticks - 1) // num_slots, callback, args)
+        timer.slot = self._slots[(self._cursor + ticks) % num_slots]
+        timer.slot.add(timer)
+        if self._thread is None:
+            self._thread = hub.spawn(self._run)
+        return timer
+
+    def advance(self):
+        """Move the wheel by one tick and fire the expired timers."""
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+        expired = []
+        for timer in slot:
+            if timer.rounds:
+                timer.rounds -= 1
+            else:
+                expired.append(timer)
+        for timer in expired:
+            timer.cancel()
+            try:
+                timer.callback(*timer.args)
+            except:
+                LOG.exception('timer callback %s failed', timer.callback)
+
+    def _run(self):
+        try:
+            while any(self._slots):
+                hub.sleep(self.tick)
+                self.advance()
+        finally:
+            self._thread = None
@@ -970,7 +970,9 @@ class OFPMatch(StringifyMixin):
         self.fields.append(OFPMatchField.make(header, value, mask))
 
     def _composed_with_old_api(self):
-        return (self.fields and not self._fields2) or \
+        # check _fields2 first not to decode the fields for the old API
+        # of a parsed match.
+        return (not self._fields2 and self.fields) or \
             self._wc.__dict__ != FlowWildcards().__dict__
 
     def serialize(self, buf, offset):
@@ -1240,6 +1242,10 @@ class OFPMatch(StringifyMixin):
         """
         Returns an object which is generated from a buffer including the
         expression of the wire protocol of the flow match.
+
+        The match fields are decoded on first access.  The list of
+        OFPMatchField for the old API (``fields`` attribute) is decoded
+        only if it is accessed.
         """
         match = OFPMatch()
         type_, length = struct.unpack_from('!HH', buf, offset)
@@ -1251,18 +1257,37 @@ class OFPMatch(StringifyMixin):
         offset += 4
         length -= 4
 
-        # XXXcompat
-        cls.parser_old(match, buf, offset, length)
+        # keep the OXM TLVs.  they are decoded on demand by __getattr__.
+        match._oxm_buf = buf[offset:offset + length]
+        del match.fields
+        del match._fields2
+        return match
+
+    def __getattr__(self, name):
+        # called only for missing attributes, i.e. the fields of
+        # a parsed match which have not been decoded yet.
+        if name == '_fields2':
+            self._fields2 = self._parse_fields2(self._oxm_buf)
+            return self._fields2
+        elif name == 'fields':
+            # XXXcompat
+            self.fields = []
+            self.parser_old(self, self._oxm_buf, 0, len(self._oxm_buf))
+            return self.fields
+        raise AttributeError(name)
 
+    @staticmethod
+    def _parse_fields2(buf):
         fields = []
+        offset = 0
+        length = len(buf)
         while length > 0:
             n, value, mask, field_len = ofproto.oxm_parse(buf, offset)
             k, uv = ofproto.oxm_to_user(n, value, mask)
             fields.append((k, uv))
             offset += field_len
             length -= field_len
-        match._fields2 = fields
-        return match
+        return fields
 
     @staticmethod
     def parser_old(match, buf, offset, length):
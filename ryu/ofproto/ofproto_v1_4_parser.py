@@ -728,6 +728,8 @@ class OFPMatch(StringifyMixin):
         """
         Returns an object which is generated from a buffer including the
         expression of the wire protocol of the flow match.
+
+        The match fields are decoded on first access.
         """
         match = OFPMatch()
         type_, length = struct.unpack_from('!HH', buf, offset)
@@ -739,15 +741,31 @@ class OFPMatch(StringifyMixin):
         offset += 4
         length -= 4
 
+        # keep the OXM TLVs.  they are decoded on demand by __getattr__.
+        match._oxm_buf = buf[offset:offset + length]
+        del match._fields2
+        return match
+
+    def __getattr__(self, name):
+        # called only for missing attributes, i.e. the fields of
+        # a parsed match which have not been decoded yet.
+        if name == '_fields2':
+            self._fields2 = self._parse_fields2(self._oxm_buf)
+            return self._fields2
+        raise AttributeError(name)
+
+    @staticmethod
+    def _parse_fields2(buf):
         fields = []
+        offset = 0
+        length = len(buf)
         while length > 0:
             n, value, mask, field_len = ofproto.oxm_parse(buf, offset)
             k, uv = ofproto.oxm_to_user(n, value, mask)
             fields.append((k, uv))
             offset += field_len
             length -= field_len
-        match._fields2 = fields
-        return match
+        return fields
 
     def serialize(self, buf, offset):
         """
@@ -50,7 +50,6 @@ class VRRPInterfaceMonitorOpenFlow(monitor.VRRPInterfaceMonitor):
         self.logger.debug('packet_in_handler')
         msg = ev.msg
         datapath = msg.datapath
-        ofproto = datapath.ofproto
 
         # TODO: subscribe only the designated datapath
         dpid = datapath.id
@@ -60,11 +59,7 @@ class VRRPInterfaceMonitorOpenFlow(monitor.VRRPInterfaceMonitor):
                               dpid_lib.dpid_to_str(self.interface.dpid))
             return
 
-        in_port = None
-        for field in msg.match.fields:
-            if field.header == ofproto.OXM_OF_IN_PORT:
-                in_port = field.value
-                break
+        in_port = msg.match.get('in_port')
 
         if in_port != self.interface.port_no:
             self.logger.debug('packet_in_handler in_port %s %s',
@@ -443,19 +443,15 @@ class RouterIPV4OpenFlow(RouterIPV4):
     def packet_in_handler(self, ev):
         msg = ev.msg
         datapath = msg.datapath
-        ofproto = datapath.ofproto
 
         # TODO: subscribe only the datapath that we route
         dpid = datapath.dpid
         if dpid != self.interface.dpid:
             return
 
-        for field in msg.match.fields:
-            header = field.header
-            if header == ofproto.OXM_OF_IN_PORT:
-                if field.value != self.interface.port_no:
-                    return
-                break
+        in_port = msg.match.get('in_port')
+        if in_port is not None and in_port != self.interface.port_no:
+            return
 
         self._arp_process(msg.data)
 
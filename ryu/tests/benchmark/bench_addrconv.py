@@ -0,0 +1,79 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure addresses/sec of text_to_bin() followed by bin_to_text() with
+ryu.lib.addrconv and with plain netaddr converters.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_addrconv [count]
+
+The MAC addresses are taken from 1000 hosts as a switch sees them.
+The IP addresses are all different.
+"""
+
+import sys
+import time
+
+import netaddr
+
+from ryu.lib import addrconv
+
+
+_NETADDR = {
+    'mac': addrconv.AddressConverter(netaddr.EUI, netaddr.strategy.eui48,
+                                     version=48,
+                                     dialect=addrconv.mac_mydialect),
+    'ipv4': addrconv.AddressConverter(netaddr.IPAddress,
+                                      netaddr.strategy.ipv4, version=4),
+    'ipv6': addrconv.AddressConverter(netaddr.IPAddress,
+                                      netaddr.strategy.ipv6, version=6),
+}
+
+
+def _addresses(name, count):
+    if name == 'mac':
+        return ['02:00:00:00:%02x:%02x' % (i % 1000 >> 8, i % 1000 & 0xff)
+                for i in xrange(count)]
+    elif name == 'ipv4':
+        return ['10.%d.%d.%d' % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff)
+                for i in xrange(count)]
+    else:
+        return ['2001:db8::%x:%x' % (i >> 16, i & 0xffff)
+                for i in xrange(count)]
+
+
+def run(conv, addresses):
+    text_to_bin = conv.text_to_bin
+    bin_to_text = conv.bin_to_text
+    start = time.time()
+    for text in addresses:
+        bin_to_text(text_to_bin(text))
+    return len(addresses) / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for name in ('mac', 'ipv4', 'ipv6'):
+        addresses = _addresses(name, count)
+        for conv_name, conv in (('netaddr', _NETADDR[name]),
+                                ('addrconv', getattr(addrconv, name))):
+            print('%-4s %-8s: %.0f addresses/sec' %
+                  (name, conv_name, run(conv, addresses)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure packet_utils.checksum and packet_utils.checksum_update.
+
+'array' is the pure Python path and 'numpy' is used for large data
+if numpy is installed.  'update' rewrites one 16-bit word, e.g. the
+TTL of an IPv4 header, instead of recomputing the whole checksum.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_checksum [count]
+"""
+
+import os
+import sys
+import time
+
+from ryu.lib.packet import packet_utils
+
+
+SIZES = [64, 128, 256, 512, 1024, 1500, 4096, 9000]
+
+
+def run(func, count):
+    start = time.time()
+    for _i in xrange(count):
+        func()
+    return (time.time() - start) / count * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    numpy = packet_utils.numpy
+    for size in SIZES:
+        data = os.urandom(size)
+        csum = packet_utils.checksum(data)
+        results = []
+        packet_utils.numpy = None
+        results.append(('array', run(lambda: packet_utils.checksum(data),
+                                     count)))
+        packet_utils.numpy = numpy
+        if numpy is not None:
+            results.append(('numpy', run(
+                lambda: packet_utils._checksum_numpy(data, size), count)))
+        results.append(('update', run(
+            lambda: packet_utils.checksum_update(csum, '\x40\x06',
+                                                 '\x3f\x06'), count)))
+        print('%5dB  ' % size +
+              '  '.join('%s %7.2f usec' % r for r in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure events/sec through RyuApp.send_event_to_observers.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_event_dispatch [count] [observers]
+
+An event source app sends count events to the given number of observer
+apps, each of which runs its own event loop and handler.  The rate is
+the number of events sent by the source per second until every
+observer has handled all of them.
+"""
+
+import sys
+import time
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller import handler
+from ryu.controller.handler import set_ev_cls, MAIN_DISPATCHER
+from ryu.lib import hub
+
+
+class _EventBench(event.EventBase):
+    pass
+
+
+class _SourceApp(app_manager.RyuApp):
+    pass
+
+
+class _ObserverApp(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(_ObserverApp, self).__init__(*args, **kwargs)
+        self.count = 0
+        self.done = hub.Event()
+        self.expected = 0
+
+    @set_ev_cls(_EventBench, MAIN_DISPATCHER)
+    def _handler(self, ev):
+        self.count += 1
+        if self.count == self.expected:
+            self.done.set()
+
+
+def run(count, num_observers):
+    source = _SourceApp()
+    observers = []
+    for i in range(num_observers):
+        app = _ObserverApp()
+        app.name = 'bench_observer_%d' % i
+        app.expected = count
+        handler.register_instance(app)
+        source.register_observer(_EventBench, app.name, [MAIN_DISPATCHER])
+        app_manager.SERVICE_BRICKS[app.name] = app
+        app.start()
+        observers.append(app)
+
+    try:
+        ev = _EventBench()
+        start = time.time()
+        for _i in xrange(count):
+            source.send_event_to_observers(ev, MAIN_DISPATCHER)
+        for app in observers:
+            app.done.wait()
+        elapsed = time.time() - start
+    finally:
+        for app in observers:
+            app.stop()
+            del app_manager.SERVICE_BRICKS[app.name]
+    return count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    num_observers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print('%d events, %d observers: %.0f events/sec' %
+          (count, num_observers, run(count, num_observers)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure how a slow RyuApp delays the sender of events and another app
+with the event queue policies of ryu.lib.event_queue.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_event_queue [events] [delay]
+
+A sender, like Datapath._recv_loop, sends the events to a fast app and
+a slow app, which spends delay seconds in each handler.  Then a state
+change event is sent to the slow app, whose latency is measured.
+"""
+
+import sys
+import time
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller import handler
+from ryu.lib import event_queue
+from ryu.lib import hub
+
+
+class _EventPacketIn(event.EventBase):
+    pass
+
+
+class _EventStateChange(event.EventBase):
+    def __init__(self):
+        super(_EventStateChange, self).__init__()
+        self.sent = time.time()
+
+
+class _FastApp(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(_FastApp, self).__init__(*args, **kwargs)
+        self.handled = 0
+
+    @handler.set_ev_cls(_EventPacketIn)
+    def packet_in_handler(self, ev):
+        self.handled += 1
+
+
+class _SlowApp(_FastApp):
+    DELAY = 0.001
+
+    def __init__(self, *args, **kwargs):
+        super(_SlowApp, self).__init__(*args, **kwargs)
+        self.latency = None
+
+    @handler.set_ev_cls(_EventPacketIn)
+    def packet_in_handler(self, ev):
+        self.handled += 1
+        hub.sleep(self.DELAY)
+
+    @handler.set_ev_cls(_EventStateChange)
+    def state_change_handler(self, ev):
+        self.latency = time.time() - ev.sent
+
+
+def run(policies, count):
+    fast = _FastApp()
+    slow = _SlowApp()
+    for ev_cls, policy in policies.items():
+        slow.events.set_policy(ev_cls, policy)
+    for app in (fast, slow):
+        handler.register_instance(app)
+        app.start()
+
+    start = time.time()
+    for _i in xrange(count):
+        ev = _EventPacketIn()
+        fast._send_event(ev, None)
+        slow._send_event(ev, None)
+        # as receiving the next message
+        hub.sleep(0)
+    elapsed = time.time() - start
+    fast_handled = fast.handled
+
+    slow._send_event(_EventStateChange(), None)
+    while slow.latency is None:
+        hub.sleep(0.001)
+    for app in (fast, slow):
+        app.stop()
+    return (count / elapsed, fast_handled, slow.handled,
+            sum(slow.events.dropped.values()), slow.latency)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    _SlowApp.DELAY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.001
+
+    for name, policies in (
+            ('block', {}),
+            ('drop_oldest', {_EventPacketIn: event_queue.DROP_OLDEST}),
+            ('priority', {_EventPacketIn: event_queue.DROP_OLDEST,
+                          _EventStateChange: event_queue.PRIORITY})):
+        rate, fast, slow, dropped, latency = run(policies, count)
+        print('%-11s: sent %.0f events/sec, fast app %d, slow app %d '
+              'dropped %d, state change latency %.3f sec' %
+              (name, rate, fast, slow, dropped, latency))
+
+
+if __name__ == '__main__':
+    main()
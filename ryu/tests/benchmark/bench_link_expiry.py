@@ -0,0 +1,80 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the link expiry check of ryu.topology.switches with a large
+number of links.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_link_expiry [links] [expired]
+
+"scan" is the former check which looked into the timestamp of every
+link.  "index" is LinkState.expired().  expired links out of all have
+not been updated for LINK_TIMEOUT.
+"""
+
+import sys
+import time
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.topology import switches
+
+
+def _links(num_links):
+    # a pair of ports per two links
+    ports = []
+    for i in xrange(num_links):
+        ofpport = ofproto_v1_3_parser.OFPPort(
+            i % 48 + 1, '02:00:00:00:00:01', 'eth', 0, 0, 0, 0, 0, 0, 0, 0)
+        ports.append(switches.Port(i // 48 + 1, ofproto_v1_3, ofpport))
+    return [(ports[i], ports[i ^ 1]) for i in xrange(num_links)]
+
+
+def _scan(links, now, timeout):
+    return [link for (link, timestamp) in links.items()
+            if timestamp + timeout < now]
+
+
+def main():
+    num_links = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    num_expired = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    timeout = switches.Switches.LINK_TIMEOUT
+    pairs = _links(num_links)
+
+    links = switches.LinkState()
+    start = time.time()
+    for src, dst in pairs:
+        links.update_link(src, dst)
+    print('update_link: %.0f links/sec' %
+          (num_links / (time.time() - start)))
+    for link in list(links)[:num_expired]:
+        links.rev_link_set_timestamp(link, time.time() - timeout * 2)
+
+    now = time.time()
+    for name, check in (('scan', lambda: _scan(links, now, timeout)),
+                        ('index', lambda: links.expired(now - timeout))):
+        count = 100
+        start = time.time()
+        for _i in xrange(count):
+            assert len(check()) == num_expired
+        elapsed = time.time() - start
+        print('%-5s %d links: %.3f ms/check' %
+              (name, num_links, elapsed / count * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure LLDP packets/sec sent by the link discovery of
+ryu.topology.switches to a large number of ports.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_lldp_scheduler [switches] \\
+        [ports_per_switch] [duration]
+
+Fake datapaths serialize the PacketOuts and count them.  All ports are
+due at the start, as when the links of every port are being checked.
+"guard" is the former lldp_loop which slept LLDP_SEND_GUARD after each
+port.  "sweep" is the time to send an LLDP packet to every port.
+"""
+
+import sys
+import time
+
+from ryu import cfg
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.topology import switches
+
+
+class _FakeDatapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = ofproto_v1_3_parser
+
+    def __init__(self, dpid):
+        super(_FakeDatapath, self).__init__()
+        self.id = dpid
+        self.xid = 0
+        self.packets = 0
+        self.writes = 0
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+
+    def send_msg(self, msg):
+        self.send_msgs([msg], barrier=False)
+
+    def send_msgs(self, msgs, barrier=True):
+        for msg in msgs:
+            self.set_xid(msg)
+            msg.serialize()
+        self.packets += len(msgs)
+        self.writes += 1
+
+
+class _GuardedSwitches(switches.Switches):
+    # the former lldp_loop
+    def lldp_loop(self):
+        while self.is_active:
+            self.lldp_event.clear()
+            for port in self.ports.pop_expired(time.time(), len(self.ports)):
+                if not self.is_active:
+                    return
+                port_data = self.ports.get(port)
+                guard = (port_data is not None and
+                         port_data.timestamp is not None)
+                self.send_lldp_packet(port)
+                if guard:
+                    hub.sleep(self.LLDP_SEND_GUARD)      # don't burst
+            deadline = self.ports.next_deadline()
+            timeout = None
+            if deadline is not None:
+                timeout = max(0, deadline - time.time())
+            self.lldp_event.wait(timeout=timeout)
+
+
+def run(cls, num_switches, ports_per_switch, duration):
+    app = cls()
+    dps = []
+    for dpid in xrange(1, num_switches + 1):
+        dp = _FakeDatapath(dpid)
+        app.dps[dpid] = dp
+        dps.append(dp)
+        for port_no in xrange(1, ports_per_switch + 1):
+            ofpport = ofproto_v1_3_parser.OFPPort(
+                port_no, '02:00:00:00:00:01', 'eth%d' % port_no, 0, 0,
+                0, 0, 0, 0, 0, 0)
+            port = switches.Port(dpid, ofproto_v1_3, ofpport)
+            app._port_added(port)
+            # sent before, not a new port
+            app.ports.get_port(port).timestamp = 0.0
+
+    start = time.time()
+    app.lldp_event.set()
+    hub.sleep(duration)
+    app.close()
+    elapsed = time.time() - start
+
+    packets = sum(dp.packets for dp in dps)
+    writes = sum(dp.writes for dp in dps)
+    return packets / elapsed, writes / elapsed
+
+
+def main():
+    num_switches = int(sys.argv[1]) if len(sys.argv) > 1 else 160
+    ports_per_switch = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    num_ports = num_switches * ports_per_switch
+    cfg.CONF.set_override('observe_links', True)
+    cfg.CONF.set_override('install_lldp_flow', False)
+
+    for name, cls in (('guard', _GuardedSwitches),
+                      ('pps', switches.Switches)):
+        pps, writes = run(cls, num_switches, ports_per_switch, duration)
+        print('%-5s %d ports: %.0f packets/sec %.0f writes/sec '
+              'sweep %.1f sec' % (name, num_ports, pps, writes,
+                                  num_ports / pps))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure messages/sec of the OpenFlow message parsers.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_ofp_parse [count]
+
+Messages from ryu/tests/packet_data are parsed with
+ryu.ofproto.ofproto_parser.msg.  "access" additionally reads
+the in_port match field of each parsed message (or of each flow
+entry of a FlowStatsReply).
+"""
+
+import os
+import sys
+import time
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_2
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_4
+
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__), '../packet_data')
+
+MESSAGES = [
+    (ofproto_v1_2, 'of12/3-4-ofp_packet_in.packet'),
+    (ofproto_v1_3, 'of13/4-4-ofp_packet_in.packet'),
+    (ofproto_v1_3, 'of13/4-12-ofp_flow_stats_reply.packet'),
+    (ofproto_v1_4, 'of14/5-12-ofp_flow_stats_reply.packet'),
+]
+
+
+def _load_packet(name):
+    with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def _access(msg):
+    if hasattr(msg, 'match'):
+        msg.match.get('in_port')
+    for stats in getattr(msg, 'body', []):
+        stats.match.get('in_port')
+
+
+def run(ofp, name, count, access=False):
+    dp = ofproto_protocol.ProtocolDesc(ofp.OFP_VERSION)
+    buf = _load_packet(name)
+    (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+
+    start = time.time()
+    for _i in xrange(count):
+        msg = ofproto_parser.msg(dp, version, msg_type, msg_len, xid, buf)
+        if access:
+            _access(msg)
+    return count / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for ofp, name in MESSAGES:
+        for access in (False, True):
+            print('%-40s %-6s: %.0f msgs/sec' %
+                  (name, 'access' if access else 'parse',
+                   run(ofp, name, count, access)))
+
+
+if __name__ == '__main__':
+    main()
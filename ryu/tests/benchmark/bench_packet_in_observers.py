@@ -0,0 +1,135 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure PacketIn events/sec handled by several observer apps which
+look into the packet.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_packet_in_observers [count] \\
+        [observers]
+
+Each observer gets the ethernet and the IPv4 headers of a TCP packet
+like simple_switch does.  The packet is decoded in three ways:
+
+- decode: packet.Packet(msg.data) in each observer
+- lazy: packet.Packet(msg.data, lazy=True) in each observer
+- shared: ev.packet, which is decoded once per event
+"""
+
+import sys
+import time
+
+from ryu.base import app_manager
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller.handler import set_ev_cls, MAIN_DISPATCHER
+from ryu.lib import hub
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.ofproto import inet
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.ofproto.ofproto_protocol import ProtocolDesc
+
+
+_DECODE = {
+    'decode': lambda ev: packet.Packet(ev.msg.data),
+    'lazy': lambda ev: packet.Packet(ev.msg.data, lazy=True),
+    'shared': lambda ev: ev.packet,
+}
+
+
+class _SourceApp(app_manager.RyuApp):
+    pass
+
+
+class _ObserverApp(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(_ObserverApp, self).__init__(*args, **kwargs)
+        self.count = 0
+        self.done = hub.Event()
+        self.expected = 0
+        self.decode = None
+
+    @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
+    def _packet_in_handler(self, ev):
+        pkt = self.decode(ev)
+        pkt.get_protocol(ethernet.ethernet)
+        pkt.get_protocol(ipv4.ipv4)
+        self.count += 1
+        if self.count == self.expected:
+            self.done.set()
+
+
+def _events(count):
+    datapath = ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet())
+    pkt.add_protocol(ipv4.ipv4(proto=inet.IPPROTO_TCP))
+    pkt.add_protocol(tcp.tcp(src_port=1024, dst_port=80))
+    pkt.add_protocol('x' * 64)
+    pkt.serialize()
+    data = str(pkt.data)
+    # generated as received, so that the handled events are freed
+    for _i in xrange(count):
+        yield ofp_event.EventOFPPacketIn(
+            ofproto_v1_3_parser.OFPPacketIn(datapath, data=data))
+
+
+def run(decode, count, num_observers):
+    source = _SourceApp()
+    observers = []
+    for i in range(num_observers):
+        app = _ObserverApp()
+        app.name = 'bench_observer_%d' % i
+        app.expected = count
+        app.decode = decode
+        handler.register_instance(app)
+        source.register_observer(ofp_event.EventOFPPacketIn, app.name,
+                                 [MAIN_DISPATCHER])
+        app_manager.SERVICE_BRICKS[app.name] = app
+        app.start()
+        observers.append(app)
+
+    try:
+        events = _events(count)
+        start = time.time()
+        for ev in events:
+            source.send_event_to_observers(ev, MAIN_DISPATCHER)
+        for app in observers:
+            app.done.wait()
+        elapsed = time.time() - start
+    finally:
+        for app in observers:
+            app.stop()
+            del app_manager.SERVICE_BRICKS[app.name]
+    return count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    num_observers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    for name in ('decode', 'lazy', 'shared'):
+        print('%-6s %d observers: %.0f events/sec' %
+              (name, num_observers, run(_DECODE[name], count,
+                                        num_observers)))
+
+
+if __name__ == '__main__':
+    main()
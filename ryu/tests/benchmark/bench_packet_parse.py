@@ -0,0 +1,114 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure packets/sec of packet.Packet and packet.parse_fast.
+
+'Packet lazy' decodes only the ethernet header, as L2 switches do.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_packet_parse [count]
+
+The packets are the payloads of the PacketIn messages in
+ryu/tests/packet_data and a few packets built with ryu.lib.packet.
+"""
+
+import os
+import sys
+import time
+
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_2
+from ryu.ofproto import ofproto_v1_3
+
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__), '../packet_data')
+
+PACKET_INS = [
+    (ofproto_v1_2, 'of12/3-4-ofp_packet_in.packet'),
+    (ofproto_v1_3, 'of13/4-4-ofp_packet_in.packet'),
+]
+
+
+def _packet_in_data(ofp, name):
+    with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+        buf = f.read()
+    dp = ofproto_protocol.ProtocolDesc(ofp.OFP_VERSION)
+    (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+    msg = ofproto_parser.msg(dp, version, msg_type, msg_len, xid, buf)
+    return str(msg.data)
+
+
+def _build(*protocols):
+    pkt = packet.Packet()
+    for proto in protocols:
+        pkt.add_protocol(proto)
+    pkt.add_protocol('x' * 64)
+    pkt.serialize()
+    return str(pkt.data)
+
+
+def _packets():
+    packets = [(name, _packet_in_data(ofp, name)) for ofp, name in PACKET_INS]
+    packets.append(('ipv4/tcp', _build(
+        ethernet.ethernet(ethertype=ether.ETH_TYPE_IP),
+        ipv4.ipv4(proto=inet.IPPROTO_TCP),
+        tcp.tcp())))
+    packets.append(('vlan/ipv4/udp', _build(
+        ethernet.ethernet(ethertype=ether.ETH_TYPE_8021Q),
+        vlan.vlan(ethertype=ether.ETH_TYPE_IP),
+        ipv4.ipv4(proto=inet.IPPROTO_UDP),
+        udp.udp())))
+    packets.append(('ipv6/tcp', _build(
+        ethernet.ethernet(ethertype=ether.ETH_TYPE_IPV6),
+        ipv6.ipv6(nxt=inet.IPPROTO_TCP),
+        tcp.tcp())))
+    return packets
+
+
+def _lazy_l2(data):
+    return packet.Packet(data, lazy=True).get_protocol(ethernet.ethernet)
+
+
+def run(parse, data, count):
+    start = time.time()
+    for _i in xrange(count):
+        parse(data)
+    return count / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for name, data in _packets():
+        for parser_name, parse in (('Packet', packet.Packet),
+                                   ('Packet lazy', _lazy_l2),
+                                   ('parse_fast', packet.parse_fast)):
+            print('%-32s %-11s: %.0f pkts/sec' %
+                  (name, parser_name, run(parse, data, count)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure frames/sec of building packets with packet.Packet and with
+packet_template.PacketTemplate.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_packet_template [count]
+
+The frames are ARP requests as rest_router sends, BFD control packets
+as bfdlib sends and LLDP frames as topology.switches sends.  Each
+frame gets a new target IP, IPv4 identification or port number.
+"""
+
+import struct
+import sys
+import time
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import bfd
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import lldp
+from ryu.lib.packet import packet
+from ryu.lib.packet import packet_template
+from ryu.lib.packet import udp
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+
+SRC_MAC = '00:00:00:00:00:01'
+SRC_IP = '10.0.0.1'
+
+
+def _arp(i):
+    return [ethernet.ethernet('ff:ff:ff:ff:ff:ff', SRC_MAC,
+                              ether.ETH_TYPE_ARP),
+            arp.arp_ip(arp.ARP_REQUEST, SRC_MAC, SRC_IP,
+                       '00:00:00:00:00:00', '10.0.%d.%d' % (i >> 8 & 0xff,
+                                                            i & 0xff))]
+
+
+def _arp_template():
+    tmpl = packet_template.PacketTemplate(_arp(0),
+                                          dst_ip=(arp.arp, 'dst_ip'))
+    return lambda i: tmpl.build(dst_ip='10.0.%d.%d' % (i >> 8 & 0xff,
+                                                       i & 0xff))
+
+
+def _bfd(i):
+    return [ethernet.ethernet(SRC_MAC, '00:00:00:00:00:02'),
+            ipv4.ipv4(proto=inet.IPPROTO_UDP, src=SRC_IP, dst='10.0.0.2',
+                      tos=192, identification=i & 0xffff, ttl=255),
+            udp.udp(src_port=49152, dst_port=3784),
+            bfd.bfd(ver=1, state=bfd.BFD_STATE_UP, detect_mult=3,
+                    my_discr=1, your_discr=2,
+                    desired_min_tx_interval=100000,
+                    required_min_rx_interval=100000)]
+
+
+def _bfd_template():
+    tmpl = packet_template.PacketTemplate(
+        _bfd(0), identification=(ipv4.ipv4, 'identification'))
+    return lambda i: tmpl.build(identification=i & 0xffff)
+
+
+def _lldp(i):
+    return [ethernet.ethernet(lldp.LLDP_MAC_NEAREST_BRIDGE, SRC_MAC,
+                              ether.ETH_TYPE_LLDP),
+            lldp.lldp((lldp.ChassisID(
+                subtype=lldp.ChassisID.SUB_LOCALLY_ASSIGNED,
+                chassis_id='dpid:0000000000000001'),
+                lldp.PortID(subtype=lldp.PortID.SUB_PORT_COMPONENT,
+                            port_id=struct.pack('!I', i)),
+                lldp.TTL(ttl=120),
+                lldp.End()))]
+
+
+def _lldp_template():
+    tmpl = packet_template.PacketTemplate(_lldp(0),
+                                          port_id=(lldp.lldp, 'port_id'))
+    return lambda i: tmpl.build(port_id=struct.pack('!I', i))
+
+
+PACKETS = [
+    ('arp request', _arp, _arp_template),
+    ('bfd', _bfd, _bfd_template),
+    ('lldp', _lldp, _lldp_template),
+]
+
+
+def _packet(make_protocols):
+    def build(i):
+        pkt = packet.Packet()
+        for p in make_protocols(i):
+            pkt.add_protocol(p)
+        pkt.serialize()
+        return pkt.data
+    return build
+
+
+def run(build, count):
+    start = time.time()
+    for i in xrange(count):
+        build(i)
+    return count / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for name, make_protocols, make_template in PACKETS:
+        build_packet = _packet(make_protocols)
+        build_template = make_template()
+        assert build_packet(123) == build_template(123)
+        for builder_name, build in (('Packet', build_packet),
+                                    ('template', build_template)):
+            print('%-12s %-8s: %.0f frames/sec' %
+                  (name, builder_name, run(build, count)))
+
+
+if __name__ == '__main__':
+    main()
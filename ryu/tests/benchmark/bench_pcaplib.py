@@ -0,0 +1,75 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure packets/sec of pcaplib.Reader and pcaplib.Writer.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_pcaplib [count]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from ryu.lib import pcaplib
+
+
+PKT = 'x' * 128
+
+
+def write(path, count):
+    start = time.time()
+    writer = pcaplib.Writer(open(path, 'wb'))
+    for i in xrange(count):
+        writer.write_pkt(PKT, i)
+    del writer
+    return count / (time.time() - start)
+
+
+def write_pkts(path, count):
+    start = time.time()
+    writer = pcaplib.Writer(open(path, 'wb'))
+    writer.write_pkts((i, PKT) for i in xrange(count))
+    del writer
+    return count / (time.time() - start)
+
+
+def read(path, count):
+    start = time.time()
+    n = 0
+    for _ts, _buf in pcaplib.Reader(open(path, 'rb')):
+        n += 1
+    assert n == count
+    return count / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    fd, path = tempfile.mkstemp(suffix='.pcap')
+    os.close(fd)
+    try:
+        print('write_pkt : %.0f pkts/sec' % write(path, count))
+        if hasattr(pcaplib.Writer, 'write_pkts'):
+            print('write_pkts: %.0f pkts/sec' % write_pkts(path, count))
+        print('Reader    : %.0f pkts/sec' % read(path, count))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure PacketIn events/sec which a filtered handler takes with
+RequiredTypeFilter and with MatchFilter.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_pktinfilter [count]
+
+The handler wants VLAN tagged TCP packets to port 80.  One in ten
+events passes the filter; the rest are untagged TCP packets which are
+discarded.
+"""
+
+import sys
+import time
+
+from ryu.controller import ofp_event
+from ryu.lib.ofp_pktinfilter import packet_in_filter
+from ryu.lib.ofp_pktinfilter import MatchFilter
+from ryu.lib.ofp_pktinfilter import RequiredTypeFilter
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import vlan
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.ofproto.ofproto_protocol import ProtocolDesc
+
+
+class _RequiredTypeApp(object):
+    @packet_in_filter(RequiredTypeFilter, {'types': [vlan.vlan, tcp.tcp]})
+    def packet_in_handler(self, ev):
+        pkt = ev.packet
+        return pkt.get_protocol(tcp.tcp).dst_port == 80
+
+
+class _MatchApp(object):
+    @packet_in_filter(MatchFilter, {'vlan_vid': 10, 'tcp_dst': 80})
+    def packet_in_handler(self, ev):
+        return True
+
+
+def _data(tagged):
+    pkt = packet.Packet()
+    if tagged:
+        pkt.add_protocol(ethernet.ethernet(ethertype=ether.ETH_TYPE_8021Q))
+        pkt.add_protocol(vlan.vlan(vid=10, ethertype=ether.ETH_TYPE_IP))
+    else:
+        pkt.add_protocol(ethernet.ethernet())
+    pkt.add_protocol(ipv4.ipv4(proto=inet.IPPROTO_TCP))
+    pkt.add_protocol(tcp.tcp(src_port=1024, dst_port=80))
+    pkt.serialize()
+    return str(pkt.data)
+
+
+def _events(count):
+    datapath = ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+    tagged = _data(True)
+    untagged = _data(False)
+    events = []
+    for i in xrange(count):
+        data = tagged if i % 10 == 0 else untagged
+        msg = ofproto_v1_3_parser.OFPPacketIn(datapath, data=data)
+        events.append(ofp_event.EventOFPPacketIn(msg))
+    return events
+
+
+def run(app, count):
+    events = _events(count)
+    start = time.time()
+    passed = 0
+    for ev in events:
+        if app.packet_in_handler(ev):
+            passed += 1
+    assert passed == (count + 9) // 10
+    return count / (time.time() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for name, app in (('RequiredTypeFilter', _RequiredTypeApp()),
+                      ('MatchFilter', _MatchApp())):
+        print('%-18s: %.0f events/sec' % (name, run(app, count)))
+
+
+if __name__ == '__main__':
+    main()
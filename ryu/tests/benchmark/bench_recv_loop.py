@@ -0,0 +1,104 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure messages/sec of Datapath._recv_loop for a single connection.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_recv_loop [count]
+
+A burst of PacketIn and EchoRequest messages taken from
+ryu/tests/packet_data/of13 is written to a loopback TCP connection
+and received by a Datapath.  The rate is reported both with the
+OpenFlow message parsers and with framing only (parsers stubbed out),
+the latter isolating the cost of the receive engine itself.
+"""
+
+import os
+import sys
+import time
+
+import mock
+
+from ryu.lib import hub
+hub.patch()
+
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.ofproto import ofproto_parser
+
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__),
+                               '../packet_data/of13')
+
+
+class _OFPBrick(object):
+    def send_event_to_observers(self, ev, state=None):
+        pass
+
+    def get_handlers(self, ev, state=None):
+        return []
+
+
+def _load_packet(name):
+    with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def _writer(sock, data):
+    sock.sendall(data)
+    sock.close()
+
+
+def run(count, parse=True):
+    msgs = [_load_packet('4-4-ofp_packet_in.packet'),
+            _load_packet('4-13-ofp_echo_request.packet')]
+    data = ''.join(msgs) * (count // len(msgs))
+
+    server = hub.listen(('127.0.0.1', 0))
+    client = hub.connect(server.getsockname())
+    sock, _addr = server.accept()
+    server.close()
+
+    with mock.patch.object(app_manager, 'lookup_service_brick',
+                           return_value=_OFPBrick()):
+        dp = controller.Datapath(sock, None)
+
+    msg_parser = ofproto_parser.msg
+    if not parse:
+        ofproto_parser.msg = lambda *args: None
+    try:
+        start = time.time()
+        thr = hub.spawn(_writer, client, data)
+        dp._recv_loop()
+        elapsed = time.time() - start
+    finally:
+        ofproto_parser.msg = msg_parser
+    hub.joinall([thr])
+    sock.close()
+    return count / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for parse in (True, False):
+        print('%d messages, %s: %.0f msgs/sec' %
+              (count, 'parse' if parse else 'framing only',
+               run(count, parse)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure BGP messages/sec decoded by bgp.StreamParser from a stream
+read in chunks.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_stream_parser [count] [chunk_size]
+
+The stream has count KEEPALIVE and NOTIFICATION messages.  "copy" is
+the former way which sliced the rest of the buffer for every message.
+"""
+
+import sys
+import time
+
+from ryu.lib.packet import bgp
+
+
+class _CopyingStreamParser(bgp.StreamParser):
+    def parse(self, data):
+        self._q += data
+        msgs = []
+        while True:
+            try:
+                msg, self._q = bgp.BGPMessage.parser(self._q)
+            except self.TooSmallException:
+                break
+            msgs.append(msg)
+        return msgs
+
+
+def _stream(count):
+    msgs = [bgp.BGPKeepAlive(),
+            bgp.BGPNotification(error_code=6, error_subcode=2, data='x' * 8)]
+    binmsgs = [str(msg.serialize()) for msg in msgs]
+    return ''.join(binmsgs[i % 2] for i in xrange(count))
+
+
+def run(sp, data, chunk_size):
+    start = time.time()
+    n = 0
+    for i in xrange(0, len(data), chunk_size):
+        n += len(sp.parse(data[i:i + chunk_size]))
+    elapsed = time.time() - start
+    return n / elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 65536
+    data = _stream(count)
+    for name, sp in (('copy', _CopyingStreamParser()),
+                     ('offset', bgp.StreamParser())):
+        print('%-6s chunk %d: %.0f msgs/sec' %
+              (name, chunk_size, run(sp, data, chunk_size)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure flows/sec of OFPFlowStatsReply.to_jsondict() and
+from_jsondict() as ofctl_rest does.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_stringify [count]
+
+The reply has count OpenFlow 1.3 flow entries, each of which has
+a match with 4 fields and an apply-actions instruction with 2 actions.
+"""
+
+import sys
+import time
+
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+
+
+def _reply(count):
+    dp = ofproto_protocol.ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+    body = []
+    for i in xrange(count):
+        match = parser.OFPMatch(in_port=i % 48 + 1, eth_type=0x0800,
+                                eth_dst='02:00:00:00:%02x:%02x' %
+                                (i >> 8 & 0xff, i & 0xff),
+                                ipv4_dst='10.0.%d.%d' % (i >> 8 & 0xff,
+                                                         i & 0xff))
+        actions = [parser.OFPActionSetField(vlan_vid=i % 4094 + 1),
+                   parser.OFPActionOutput(i % 48 + 1)]
+        inst = [parser.OFPInstructionActions(
+            ofproto_v1_3.OFPIT_APPLY_ACTIONS, actions)]
+        body.append(parser.OFPFlowStats(
+            table_id=0, duration_sec=i, duration_nsec=0, priority=100,
+            idle_timeout=0, hard_timeout=0, flags=0, cookie=i,
+            packet_count=i * 10, byte_count=i * 1000, match=match,
+            instructions=inst))
+    return dp, parser.OFPFlowStatsReply(dp, body=body, flags=0)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    dp, msg = _reply(count)
+
+    start = time.time()
+    jsondict = msg.to_jsondict()
+    print('to_jsondict  : %.0f flows/sec' % (count / (time.time() - start)))
+
+    start = time.time()
+    parser.OFPFlowStatsReply.from_jsondict(
+        jsondict['OFPFlowStatsReply'], datapath=dp)
+    print('from_jsondict: %.0f flows/sec' % (count / (time.time() - start)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure path queries/sec of ryu.topology.graph on a fat-tree.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_topology_graph [k] [count]
+
+A k-ary fat-tree has 5k^2/4 switches, i.e. 1125 for k=30.  The queries
+are between random edge switches.
+
+- rebuild: a graph is built from the list of links for every query,
+  as an application using get_all_link() does
+- cached: Graph.shortest_path() with a warm cache
+- flap: Graph.shortest_path() with a core link going down and up
+  every 100 queries
+- ecmp: Graph.next_hops() with a warm cache
+- k=4: Graph.k_shortest_paths() with k=4
+"""
+
+import random
+import sys
+import time
+
+from ryu.topology import graph
+
+
+def fat_tree(k):
+    # returns the edge switches and the links (src, dst) in both
+    # directions.  port numbers are not used.
+    half = k // 2
+    core = range(1, half * half + 1)
+    dpid = len(core) + 1
+    edges = []
+    links = []
+    for _pod in range(k):
+        aggs = range(dpid, dpid + half)
+        pod_edges = range(dpid + half, dpid + k)
+        dpid += k
+        edges.extend(pod_edges)
+        for i, agg in enumerate(aggs):
+            for edge in pod_edges:
+                links.append((agg, edge))
+            for c in core[i * half:(i + 1) * half]:
+                links.append((agg, c))
+    links.extend([(dst, src) for (src, dst) in links])
+    return edges, links
+
+
+def _bfs_path(links, src, dst):
+    adj = {}
+    for (u, v) in links:
+        adj.setdefault(u, []).append(v)
+    parents = {src: None}
+    frontier = [src]
+    while frontier and dst not in parents:
+        next_frontier = []
+        for u in frontier:
+            for v in adj[u]:
+                if v not in parents:
+                    parents[v] = u
+                    next_frontier.append(v)
+        frontier = next_frontier
+    path = [dst]
+    while parents[path[-1]] is not None:
+        path.append(parents[path[-1]])
+    return path[::-1]
+
+
+def _graph(links):
+    g = graph.Graph()
+    for (src, dst) in links:
+        g.add_link(src, 0, dst, 0)
+    return g
+
+
+def run(name, links, pairs):
+    g = _graph(links)
+    if name in ('cached', 'ecmp', 'k=4'):
+        # warm up
+        for src, dst in pairs:
+            g.shortest_path(src, dst)
+
+    flap = links[-1]
+    start = time.time()
+    for i, (src, dst) in enumerate(pairs):
+        if name == 'rebuild':
+            _bfs_path(links, src, dst)
+        elif name == 'ecmp':
+            g.next_hops(src, dst)
+        elif name == 'k=4':
+            g.k_shortest_paths(src, dst, 4)
+        else:
+            if name == 'flap' and i % 100 == 0:
+                g.remove_link(flap[0], 0, flap[1], 0)
+                g.add_link(flap[0], 0, flap[1], 0)
+            g.shortest_path(src, dst)
+    return len(pairs) / (time.time() - start)
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    edges, links = fat_tree(k)
+    rand = random.Random(0)
+    # queries between 100 sources like hosts talking to each other
+    sources = rand.sample(edges, 100)
+    pairs = [(rand.choice(sources), rand.choice(edges))
+             for _i in xrange(count)]
+    print('fat-tree k=%d: %d switches, %d links' %
+          (k, 5 * k * k // 4, len(links)))
+    for name in ('rebuild', 'cached', 'flap', 'ecmp', 'k=4'):
+        n = pairs if name != 'rebuild' else pairs[:count // 100 or 1]
+        print('%-7s: %.0f queries/sec' % (name, run(name, links, n)))
+
+
+if __name__ == '__main__':
+    main()
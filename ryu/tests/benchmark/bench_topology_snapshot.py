@@ -0,0 +1,164 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure GET /v1.0/topology/links requests/sec of rest_topology and
+WebSocket messages of ws_topology under a link flap storm.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_topology_snapshot [links] \\
+        [clients] [flaps]
+
+"rebuild" is serializing every link for each GET, as rest_topology did.
+"per-event" is a JSON-RPC call to each client for each link event, as
+ws_topology did.  The WebSocket clients reply immediately.
+"""
+
+import json
+import sys
+import time
+
+from webob import Request
+
+from ryu.app import rest_topology
+from ryu.app import ws_topology
+from ryu.app.wsgi import WebSocketRPCClient
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.topology import snapshot
+from ryu.topology import switches
+
+
+class _FakeWebSocket(object):
+    def __init__(self):
+        super(_FakeWebSocket, self).__init__()
+        self.client = None
+        self.messages = 0
+
+    def send(self, msg):
+        self.messages += 1
+        req = json.loads(msg)
+        if isinstance(req, list):
+            rep = [{'jsonrpc': '2.0', 'id': r['id'], 'result': ''}
+                   for r in req]
+        else:
+            rep = {'jsonrpc': '2.0', 'id': req['id'], 'result': ''}
+        self.client.queue.put(json.dumps(rep))
+
+
+class _FakeWSGI(object):
+    def register(self, controller, data=None):
+        pass
+
+
+class _FakeTopologyAPI(object):
+    def __init__(self, snapshot):
+        super(_FakeTopologyAPI, self).__init__()
+        self.snapshot = snapshot
+
+
+def _port(dpid, port_no):
+    ofpport = ofproto_v1_3_parser.OFPPort(
+        port_no, '02:00:00:00:00:01', 'eth%d' % port_no, 0, 0,
+        0, 0, 0, 0, 0, 0)
+    return switches.Port(dpid, ofproto_v1_3, ofpport)
+
+
+def _links(num_links):
+    links = []
+    for i in xrange(num_links):
+        dpid = i // 48 + 1
+        port_no = i % 48 + 1
+        links.append(switches.Link(_port(dpid, port_no),
+                                   _port(dpid + 1000, port_no)))
+    return links
+
+
+def run_rest(links, count):
+    app = snapshot.TopologySnapshot()
+    for link in links:
+        app.snapshot.link_add(link)
+    api = _FakeTopologyAPI(app.snapshot)
+
+    start = time.time()
+    for _i in xrange(count):
+        json.dumps([link.to_dict() for link in links])
+    rebuild = count / (time.time() - start)
+
+    start = time.time()
+    for _i in xrange(count):
+        req = Request.blank('/v1.0/topology/links')
+        controller = rest_topology.TopologyController(
+            req, None, {'topology_api_app': api})
+        controller.list_links(req)
+    cached = count / (time.time() - start)
+    return rebuild, cached
+
+
+def run_ws(links, num_clients, flaps):
+    snapshot_app = snapshot.TopologySnapshot()
+    for link in links:
+        snapshot_app.snapshot.link_add(link)
+    app = ws_topology.WebSocketTopology(wsgi=_FakeWSGI(),
+                                        topology_snapshot=snapshot_app)
+    sockets = []
+    for _i in xrange(num_clients):
+        ws = _FakeWebSocket()
+        ws.client = WebSocketRPCClient(ws)
+        app.rpc_clients.append(ws.client)
+        sockets.append(ws)
+
+    # per-event
+    start = time.time()
+    for link in links[:flaps]:
+        for name in ('event_link_delete', 'event_link_add'):
+            for client in app.rpc_clients:
+                getattr(client.get_proxy(), name)(link.to_dict())
+    per_event = time.time() - start
+    per_event_messages = sum(ws.messages for ws in sockets)
+
+    # the flaps within a PUSH_INTERVAL, and a link going down
+    for ws in sockets:
+        ws.messages = 0
+    start = time.time()
+    for link in links[:flaps]:
+        snapshot_app.snapshot.link_delete(link)
+        snapshot_app.snapshot.link_add(link)
+    snapshot_app.snapshot.link_delete(links[-1])
+    app.push_changes()
+    batched = time.time() - start
+    batched_messages = sum(ws.messages for ws in sockets)
+    return per_event, per_event_messages, batched, batched_messages
+
+
+def main():
+    num_links = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    num_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    flaps = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    links = _links(num_links)
+
+    rebuild, cached = run_rest(links, 200)
+    print('GET %d links: rebuild %.0f requests/sec, cached %.0f '
+          'requests/sec' % (num_links, rebuild, cached))
+
+    results = run_ws(links, num_clients, flaps)
+    print('%d flaps, %d clients: per-event %.3f sec %d messages, '
+          'batched %.3f sec %d messages' %
+          ((flaps, num_clients) + results))
+
+
+if __name__ == '__main__':
+    main()
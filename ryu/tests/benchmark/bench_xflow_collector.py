@@ -0,0 +1,164 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure datagrams/sec and flows/sec of xflow_collector by replaying
+sFlow and NetFlow datagrams.
+
+Usage::
+
+    python -m ryu.tests.benchmark.bench_xflow_collector [count] [pcap]
+
+The datagrams are read from the UDP packets to port 6343 (sFlow) and
+2055 (NetFlow) in the pcap file.  Without a pcap file, count datagrams
+of each kind are generated, with 30 flows in a NetFlow datagram and 8
+sampled headers in a sFlow one.
+
+"xflow" is decoding with the parsers in ryu.lib.xflow and packet.Packet
+and aggregating the flows in a dict, for comparison.
+"""
+
+import struct
+import sys
+import time
+
+from ryu.app import xflow_collector
+from ryu.lib import pcaplib
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.xflow import netflow
+from ryu.lib.xflow import sflow
+
+
+_SFLOW_PORT = 6343
+_NETFLOW_PORT = 2055
+
+
+def _netflow_datagram(i):
+    buf = struct.pack(netflow.NetFlowV5._PACK_STR, netflow.NETFLOW_V5, 30,
+                      0, 0, 0, i, 0, 0, 0)
+    for j in xrange(30):
+        buf += struct.pack(netflow.NetFlowV5Flow._PACK_STR,
+                           0x0a000000 | (i * 30 + j) % 1000, 0x0a010001,
+                           0, 1, 2, 10, 1000, 0, 0, 1024 + j, 80, 0, 6,
+                           0, 0, 0, 0, 0)
+    return buf
+
+
+def _sflow_datagram(i):
+    samples = []
+    for j in xrange(8):
+        pkt = packet.Packet()
+        pkt.add_protocol(ethernet.ethernet(ethertype=0x0800))
+        pkt.add_protocol(ipv4.ipv4(src='10.0.%d.%d' % (j, i % 250 + 1),
+                                   dst='10.1.0.1', proto=6))
+        pkt.add_protocol(tcp.tcp(src_port=1024 + j, dst_port=80))
+        pkt.serialize()
+        header = str(pkt.data)
+        record = struct.pack('!IIII', 1, 1500, 4, len(header)) + header
+        record = struct.pack('!II', 1, len(record)) + record
+        sample = struct.pack('!IIIIIIII', i, 1, 512, 0, 0, 1, 2, 1) + record
+        samples.append(struct.pack('!II', 1, len(sample)) + sample)
+    return struct.pack('!IIIIIII', sflow.SFLOW_V5, 1, 0xc0000201, 0, i, 0,
+                       len(samples)) + ''.join(samples)
+
+
+def _read_pcap(path):
+    datagrams = []
+    with open(path, 'rb') as f:
+        for _ts, buf in pcaplib.Reader(f):
+            pkt = packet.Packet(bytearray(buf))
+            u = pkt.get_protocol(udp.udp)
+            if u is None or u.dst_port not in (_SFLOW_PORT, _NETFLOW_PORT):
+                continue
+            datagrams.append((u.dst_port, bytearray(pkt.protocols[-1])))
+    return datagrams
+
+
+def _xflow_flows(port, buf):
+    # flows with ryu.lib.xflow
+    if port == _NETFLOW_PORT:
+        msg = netflow.NetFlow.parser(buf)
+        for f in msg.flows:
+            yield ((f.srcaddr, f.dstaddr, f.prot, f.srcport, f.dstport),
+                   f.dpkts, f.doctets)
+        return
+    msg = sflow.sFlow.parser(buf)
+    for sample in msg.samples:
+        if sample.sample_format != 1:
+            continue
+        rate = sample.sample.sampling_rate
+        for record in sample.sample.flow_records:
+            if record.flow_data_format != 1:
+                continue
+            pkt = packet.Packet(''.join(record.flow_data.header))
+            ip = pkt.get_protocol(ipv4.ipv4)
+            if ip is None:
+                continue
+            l4 = pkt.get_protocol(tcp.tcp) or pkt.get_protocol(udp.udp)
+            ports = (l4.src_port, l4.dst_port) if l4 else (0, 0)
+            yield ((ip.src, ip.dst, ip.proto) + ports, rate,
+                   record.flow_data.frame_length * rate)
+
+
+def run_xflow(datagrams):
+    flows = {}
+    n = 0
+    start = time.time()
+    for port, buf in datagrams:
+        for key, packets, octets in _xflow_flows(port, buf):
+            counters = flows.setdefault(key, [0, 0])
+            counters[0] += packets
+            counters[1] += octets
+            n += 1
+    return n, time.time() - start
+
+
+def run_collector(datagrams):
+    decoders = {_SFLOW_PORT: xflow_collector.SFlowV5Decoder(),
+                _NETFLOW_PORT: xflow_collector.NetFlowV5Decoder()}
+    table = xflow_collector.FlowTable()
+    n = 0
+    start = time.time()
+    for port, buf in datagrams:
+        decoder = decoders[port]
+        count = decoder.decode(buf)
+        table.add_records(decoder.records, count)
+        n += count
+    xflow_collector.FlowTable.top_talkers(table.rotate()[1], 10)
+    return n, time.time() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    if len(sys.argv) > 2:
+        datagrams = _read_pcap(sys.argv[2])
+    else:
+        datagrams = []
+        for i in xrange(count):
+            datagrams.append((_NETFLOW_PORT, bytearray(_netflow_datagram(i))))
+            datagrams.append((_SFLOW_PORT, bytearray(_sflow_datagram(i))))
+
+    for name, run in (('xflow', run_xflow), ('collector', run_collector)):
+        n, elapsed = run(datagrams)
+        print('%-9s: %.0f datagrams/sec %.0f flows/sec' %
+              (name, len(datagrams) / elapsed, n / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+
+import mock
+from nose.tools import eq_, ok_, raises
+
+from ryu import exception as ryu_exception
+from ryu.base import app_manager
+from ryu.app.ofctl import api
+from ryu.app.ofctl import exception
+from ryu.app.ofctl import service
+from ryu.controller import handler
+from ryu.controller import ofp_event
+from ryu.controller.handler import MAIN_DISPATCHER, DEAD_DISPATCHER
+from ryu.lib import hub
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_3
+
+
+class _Datapath(ofproto_protocol.ProtocolDesc):
+    def __init__(self, service, replies):
+        super(_Datapath, self).__init__(ofproto_v1_3.OFP_VERSION)
+        self.id = 1
+        self.xid = 0
+        self.service = service
+        self.replies = replies      # bodies of the replies to send
+        self.error = False
+        self.silent = False
+        self.sent = 0
+        self.switch = None
+
+    def set_xid(self, msg):
+        self.xid += 1
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def send_msg(self, msg):
+        if self.silent:
+            return
+        if isinstance(msg, self.ofproto_parser.OFPBarrierRequest):
+            self.switch = hub.spawn(self._reply, msg.xid - 1, msg.xid)
+
+    def _send_event(self, ev):
+        self.service._send_event(ev, MAIN_DISPATCHER)
+
+    def _reply(self, xid, barrier_xid):
+        parser = self.ofproto_parser
+        for body in self.replies:
+            msg = parser.OFPFlowStatsReply(self, body=body)
+            msg.xid = xid
+            self._send_event(ofp_event.EventOFPFlowStatsReply(msg))
+            self.sent += 1
+        if self.error:
+            msg = parser.OFPErrorMsg(self, type_=1, code=2)
+            msg.xid = xid
+            self._send_event(ofp_event.EventOFPErrorMsg(msg))
+        msg = parser.OFPBarrierReply(self)
+        msg.xid = barrier_xid
+        self._send_event(ofp_event.EventOFPBarrierReply(msg))
+
+
+class Test_iter_stats(unittest.TestCase):
+    """ Test case for ryu.app.ofctl.api.iter_stats
+    """
+
+    def setUp(self):
+        self.service = service.OfctlService()
+        handler.register_instance(self.service)
+        self.bricks = mock.patch.dict(app_manager.SERVICE_BRICKS,
+                                      {self.service.name: self.service})
+        self.bricks.start()
+        self.service.start()
+        self.client = app_manager.RyuApp()
+        self.dp = _Datapath(self.service, [[1, 2], [], [3], [4, 5]])
+        self.service._switches[self.dp.id] = service._SwitchInfo(self.dp)
+
+    def tearDown(self):
+        self.service.stop()
+        self.bricks.stop()
+
+    def _iter_stats(self, queue_size=api.DEFAULT_STREAM_QUEUE_SIZE):
+        parser = self.dp.ofproto_parser
+        return api.iter_stats(self.client,
+                              parser.OFPFlowStatsRequest(self.dp),
+                              reply_cls=parser.OFPFlowStatsReply,
+                              queue_size=queue_size)
+
+    def test_iter_stats(self):
+        eq_(list(self._iter_stats()), [1, 2, 3, 4, 5])
+        eq_(self.service._observing_events,
+            {ofp_event.EventOFPFlowStatsReply: 0})
+
+    def test_many_replies(self):
+        # more replies than queue_size to a caller which isn't behind
+        entries = range(api.DEFAULT_STREAM_QUEUE_SIZE * 10)
+        self.dp.replies = [[i] for i in entries]
+        eq_(list(self._iter_stats()), entries)
+        eq_(list(self._iter_stats(queue_size=1)), entries)
+
+    def test_overflow(self):
+        entries = range(1000)
+        self.dp.replies = [[i] for i in entries]
+        it = self._iter_stats(queue_size=2)
+        eq_(it.next(), 0)
+        hub.joinall([self.dp.switch])
+        hub.sleep(0.1)
+        # the service isn't blocked by the slow caller
+        eq_(self.dp.sent, len(entries))
+        eq_(self.service._switches[self.dp.id].xids, {})
+        eq_(api.get_datapath(self.client, self.dp.id), self.dp)
+        # the queued replies and then the overflow
+        got = []
+        try:
+            for stats in it:
+                got.append(stats)
+        except exception.StreamOverflow:
+            pass
+        else:
+            ok_(False, 'StreamOverflow is not raised')
+        eq_(got, entries[1:len(got) + 1])
+        ok_(len(got) <= 2)
+
+    def test_cancel(self):
+        it = self._iter_stats(queue_size=1)
+        eq_(it.next(), 1)
+        it.close()
+        hub.joinall([self.dp.switch])
+        hub.sleep(0.1)
+        eq_(self.dp.sent, len(self.dp.replies))
+        eq_(self.service._switches[self.dp.id].xids, {})
+
+    @raises(exception.OFError)
+    def test_error(self):
+        self.dp.error = True
+        list(self._iter_stats())
+
+    @raises(ryu_exception.OFPDatapathDisconnected)
+    def test_dead(self):
+        self.dp.silent = True
+        it = self._iter_stats()
+
+        def _dead():
+            ev = ofp_event.EventOFPStateChange(self.dp)
+            self.service._send_event(ev, DEAD_DISPATCHER)
+        hub.spawn_after(0.1, _dead)
+        list(it)
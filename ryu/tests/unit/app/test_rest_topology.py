@@ -0,0 +1,92 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import unittest
+from nose.tools import eq_
+from webob import Request
+
+import mock
+
+from ryu.app import rest_topology
+from ryu.topology import snapshot
+
+
+class Test_rest_topology(unittest.TestCase):
+    """ Test case for rest_topology.TopologyController
+    """
+
+    def setUp(self):
+        self.app = mock.Mock(snapshot=snapshot.Snapshot())
+        self.link = mock.Mock(src=mock.Mock(dpid=1, port_no=2),
+                              dst=mock.Mock(dpid=2, port_no=1),
+                              **{'to_dict.return_value': {'src': 1,
+                                                          'dst': 2}})
+        self.app.snapshot.link_add(self.link)
+
+    def tearDown(self):
+        pass
+
+    def _get(self, path, headers=None):
+        req = Request.blank(path, headers=headers or {})
+        controller = rest_topology.TopologyController(
+            req, None, {'topology_api_app': self.app})
+        if path.startswith('/v1.0/topology/links'):
+            return controller.list_links(req)
+        return controller.list_changes(req)
+
+    def test_etag(self):
+        res = self._get('/v1.0/topology/links')
+        eq_(res.status_int, 200)
+        eq_(json.loads(res.body), [{'src': 1, 'dst': 2}])
+        etag = res.etag
+        eq_(etag, self.app.snapshot.etag())
+
+        res = self._get('/v1.0/topology/links',
+                        {'If-None-Match': '"%s"' % etag})
+        eq_(res.status_int, 304)
+
+        self.app.snapshot.link_delete(self.link)
+        res = self._get('/v1.0/topology/links',
+                        {'If-None-Match': '"%s"' % etag})
+        eq_(res.status_int, 200)
+        eq_(res.body, '[]')
+
+    def _changes(self, version, headers=None):
+        return self._get('/v1.0/topology/changes?since=%x-%d' %
+                         (self.app.snapshot.epoch, version), headers)
+
+    def test_changes(self):
+        res = self._changes(0)
+        eq_(json.loads(res.body),
+            {'version': self.app.snapshot.etag(),
+             'changes': [{'event': 'link_add', 'data': {'src': 1, 'dst': 2}}]})
+        eq_(self._changes(2).status_int, 410)
+        eq_(self._get('/v1.0/topology/changes?since=x').status_int, 400)
+        eq_(self._get('/v1.0/topology/changes?since=1').status_int, 400)
+        eq_(self._get('/v1.0/topology/changes').status_int, 400)
+
+    def test_changes_restart(self):
+        res = self._get('/v1.0/topology/changes?since=%x-0' %
+                        (self.app.snapshot.epoch - 1))
+        eq_(res.status_int, 410)
+
+    def test_changes_etag(self):
+        # If-None-Match doesn't apply to changes
+        headers = {'If-None-Match': '"%s"' % self.app.snapshot.etag()}
+        res = self._changes(0, headers)
+        eq_(res.status_int, 200)
+        eq_(len(json.loads(res.body)['changes']), 1)
+        eq_(res.etag, None)
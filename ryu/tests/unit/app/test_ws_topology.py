@@ -15,21 +15,46 @@
 
 # vim: tabstop=4 shiftwidth=4 softtabstop=4
 
+import json
 import unittest
 from socket import error as SocketError
+from nose.tools import eq_
 
 import mock
 
 from ryu.app.ws_topology import WebSocketTopology
+from ryu.contrib.tinyrpc.protocols.jsonrpc import JSONRPCProtocol
+from ryu.topology import snapshot
+
+
+def _switch(dpid):
+    return mock.Mock(dp=mock.Mock(id=dpid),
+                     **{'to_dict.return_value': {'dpid': dpid}})
+
+
+def _link(src, dst):
+    return mock.Mock(src=mock.Mock(dpid=src, port_no=1),
+                     dst=mock.Mock(dpid=dst, port_no=1),
+                     **{'to_dict.return_value': {'src': src, 'dst': dst}})
 
 
 class Test_ws_topology(unittest.TestCase):
 
-    def test_when_sock_error(self):
+    def _app(self, max_changes=snapshot.DEFAULT_MAX_CHANGES):
+        topology_snapshot = snapshot.TopologySnapshot()
+        topology_snapshot.snapshot = snapshot.Snapshot(max_changes)
         args = {
             'wsgi': mock.Mock(),
+            'topology_snapshot': topology_snapshot,
         }
-        app = WebSocketTopology(**args)
+        return WebSocketTopology(**args)
+
+    def _pushed(self, rpc_client):
+        msg = rpc_client.transport.send_message.call_args[0][0]
+        return [(req['method'], req['params']) for req in json.loads(msg)]
+
+    def test_when_sock_error(self):
+        app = self._app()
 
         rpc_client_mock1 = mock.Mock()
         config = {
@@ -44,11 +69,66 @@ class Test_ws_topology(unittest.TestCase):
             rpc_client_mock2,
         ]
 
-        ev_mock = mock.Mock()
-        app._event_link_add_handler(ev_mock)
+        app.snapshot.link_add(_link(1, 2))
+        app.push_changes()
 
         rpc_client_mock1.get_proxy.assert_called_once_with()
         rpc_client_mock2.get_proxy.assert_called_once_with()
+        eq_(app.rpc_clients, [rpc_client_mock2])
+
+    def test_batch(self):
+        app = self._app()
+        rpc_client = mock.Mock()
+        rpc_client.protocol = JSONRPCProtocol()
+        app.rpc_clients = [rpc_client]
+
+        # a link flap is not notified
+        app.snapshot.link_add(_link(1, 2))
+        app.snapshot.link_add(_link(2, 1))
+        app.snapshot.link_delete(_link(1, 2))
+        app.snapshot.link_add(_link(1, 2))
+        app.snapshot.link_delete(_link(2, 1))
+        app.snapshot.link_add(_link(2, 3))
+        app.push_changes()
+
+        eq_(self._pushed(rpc_client),
+            [('event_link_add', [{'src': 1, 'dst': 2}]),
+             ('event_link_add', [{'src': 2, 'dst': 3}])])
+        eq_(app.version, app.snapshot.version)
+
+        rpc_client.reset_mock()
+        app.push_changes()
+        eq_(rpc_client.transport.send_message.call_count, 0)
+
+    def test_resync(self):
+        app = self._app(max_changes=2)
+        rpc_client = mock.Mock()
+        rpc_client.protocol = JSONRPCProtocol()
+        app.rpc_clients = [rpc_client]
+
+        for dpid in (1, 2, 3):
+            app.snapshot.switch_enter(_switch(dpid))
+        app.snapshot.link_add(_link(1, 2))
+        app.push_changes()
+        eq_(self._pushed(rpc_client),
+            [('event_switch_enter', [{'dpid': 1}]),
+             ('event_switch_enter', [{'dpid': 2}]),
+             ('event_switch_enter', [{'dpid': 3}]),
+             ('event_link_add', [{'src': 1, 'dst': 2}])])
+
+        # more changes than kept
+        app.snapshot.link_delete(_link(1, 2))
+        app.snapshot.switch_leave(_switch(1))
+        app.snapshot.link_add(_link(2, 3))
+        app.snapshot.switch_enter(_switch(4))
+        eq_(app.snapshot.changes(app.version), None)
+        app.push_changes()
+        eq_(self._pushed(rpc_client),
+            [('event_link_delete', [{'src': 1, 'dst': 2}]),
+             ('event_switch_leave', [{'dpid': 1}]),
+             ('event_switch_enter', [{'dpid': 4}]),
+             ('event_link_add', [{'src': 2, 'dst': 3}])])
+        eq_(app.version, app.snapshot.version)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,263 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+import unittest
+from nose.tools import eq_, ok_
+
+import mock
+
+from ryu.app import xflow_collector
+from ryu.lib import addrconv
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+from ryu.lib.xflow import netflow
+from ryu.lib.xflow import sflow
+
+
+# NetFlowV5Flow._PACK_STR with packed addresses
+_NETFLOW_V5_FLOW_PACK_STR = '!4s4sIHHIIIIHHxBBBHHBB2x'
+
+
+def netflow_v5_datagram(flows, sampling_interval=0):
+    buf = struct.pack(netflow.NetFlowV5._PACK_STR, netflow.NETFLOW_V5,
+                      len(flows), 0, 0, 0, 0, 0, 0, sampling_interval)
+    for (src, dst, proto, src_port, dst_port, dpkts, doctets) in flows:
+        buf += struct.pack(_NETFLOW_V5_FLOW_PACK_STR,
+                           addrconv.ipv4.text_to_bin(src),
+                           addrconv.ipv4.text_to_bin(dst),
+                           0, 1, 2, dpkts, doctets, 0, 0, src_port,
+                           dst_port, 0, proto, 0, 0, 0, 0, 0)
+    return buf
+
+
+def _sflow_raw_header(frame, sampling_rate, sample_format=1):
+    # frame_length includes FCS
+    header = frame + '\x00' * (-len(frame) % 4)
+    record = struct.pack('!IIII', 1, len(frame) + 4, 4, len(frame)) + header
+    record = struct.pack('!II', 1, len(record)) + record
+    if sample_format == 1:
+        sample = struct.pack('!IIIIIIII', 1, 1, sampling_rate, 0, 0, 1, 2, 1)
+    else:
+        sample = struct.pack('!IIIIIIIIIII', 1, 0, 1, sampling_rate, 0, 0,
+                             0, 1, 0, 2, 1)
+    sample += record
+    return struct.pack('!II', sample_format, len(sample)) + sample
+
+
+def sflow_v5_datagram(frames, sampling_rate=100):
+    samples = [_sflow_raw_header(frame, sampling_rate) for frame in frames]
+    # a counter sample which is skipped
+    counters = struct.pack('!III', 1, 1, 0)
+    samples.append(struct.pack('!II', 2, len(counters)) + counters)
+    return struct.pack('!II4sIIII', sflow.SFLOW_V5,
+                       sflow.sFlowV5._AGENT_IPTYPE_V4,
+                       addrconv.ipv4.text_to_bin('192.0.2.1'),
+                       0, 1, 0, len(samples)) + ''.join(samples)
+
+
+def frame(*protocols):
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    return str(pkt.data)
+
+
+class Test_NetFlowV5Decoder(unittest.TestCase):
+    """ Test case for xflow_collector.NetFlowV5Decoder
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_decode(self):
+        decoder = xflow_collector.NetFlowV5Decoder()
+        buf = netflow_v5_datagram([
+            ('10.0.0.1', '10.0.0.2', 6, 1024, 80, 10, 1000),
+            ('10.0.0.3', '10.0.0.4', 17, 53, 53, 1, 100),
+        ])
+        eq_(decoder.decode(buf), 2)
+        r = decoder.records[0]
+        eq_(r.src, addrconv.ipv4.text_to_bin('10.0.0.1'))
+        eq_(r.dst, addrconv.ipv4.text_to_bin('10.0.0.2'))
+        eq_((r.proto, r.src_port, r.dst_port, r.packets, r.octets),
+            (6, 1024, 80, 10, 1000))
+        r = decoder.records[1]
+        eq_((r.proto, r.src_port, r.dst_port, r.packets, r.octets),
+            (17, 53, 53, 1, 100))
+
+        # the records are reused
+        records = list(decoder.records)
+        eq_(decoder.decode(buf[:-netflow.NetFlowV5Flow._MIN_LEN]), 1)
+        ok_(decoder.records[0] is records[0])
+
+    def test_decode_sampled(self):
+        decoder = xflow_collector.NetFlowV5Decoder()
+        buf = netflow_v5_datagram(
+            [('10.0.0.1', '10.0.0.2', 6, 1024, 80, 10, 1000)],
+            sampling_interval=1 << 14 | 100)
+        eq_(decoder.decode(buf), 1)
+        eq_(decoder.records[0].packets, 1000)
+        eq_(decoder.records[0].octets, 100000)
+
+    def test_decode_other_version(self):
+        decoder = xflow_collector.NetFlowV5Decoder()
+        buf = struct.pack('!HH', netflow.NETFLOW_V9, 0) + '\x00' * 20
+        eq_(decoder.decode(buf), 0)
+
+
+class Test_SFlowV5Decoder(unittest.TestCase):
+    """ Test case for xflow_collector.SFlowV5Decoder
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_decode(self):
+        decoder = xflow_collector.SFlowV5Decoder()
+        buf = sflow_v5_datagram([
+            frame(ethernet.ethernet(ethertype=0x0800),
+                  ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2', proto=6),
+                  tcp.tcp(src_port=1024, dst_port=80)),
+            frame(ethernet.ethernet(ethertype=0x8100),
+                  vlan.vlan(vid=10, ethertype=0x86dd),
+                  ipv6.ipv6(src='2001:db8::1', dst='2001:db8::2', nxt=17),
+                  udp.udp(src_port=53, dst_port=5353)),
+            # not IP
+            frame(ethernet.ethernet(ethertype=0x0806)) + '\x00' * 28,
+        ], sampling_rate=100)
+        eq_(decoder.decode(buf), 2)
+        r = decoder.records[0]
+        eq_(r.src, addrconv.ipv4.text_to_bin('10.0.0.1'))
+        eq_(r.dst, addrconv.ipv4.text_to_bin('10.0.0.2'))
+        eq_((r.proto, r.src_port, r.dst_port, r.packets),
+            (6, 1024, 80, 100))
+        eq_(r.octets, (14 + 20 + 20 + 4) * 100)
+        r = decoder.records[1]
+        eq_(r.src, addrconv.ipv6.text_to_bin('2001:db8::1'))
+        eq_(r.dst, addrconv.ipv6.text_to_bin('2001:db8::2'))
+        eq_((r.proto, r.src_port, r.dst_port, r.packets),
+            (17, 53, 5353, 100))
+
+    def test_decode_expanded(self):
+        decoder = xflow_collector.SFlowV5Decoder()
+        sample = _sflow_raw_header(
+            frame(ethernet.ethernet(ethertype=0x0800),
+                  ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2', proto=1)),
+            10, sample_format=3)
+        buf = struct.pack('!II16sIIII', sflow.SFLOW_V5,
+                          sflow.sFlowV5._AGENT_IPTYPE_V6,
+                          addrconv.ipv6.text_to_bin('2001:db8::1'),
+                          0, 1, 0, 1) + sample
+        eq_(decoder.decode(buf), 1)
+        r = decoder.records[0]
+        eq_((r.proto, r.src_port, r.dst_port, r.packets, r.octets),
+            (1, 0, 0, 10, 380))
+
+    def test_decode_ipv4_fragment(self):
+        decoder = xflow_collector.SFlowV5Decoder()
+        buf = sflow_v5_datagram([
+            frame(ethernet.ethernet(ethertype=0x0800),
+                  ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2', proto=17,
+                            offset=185),
+                  udp.udp(src_port=53, dst_port=53))])
+        eq_(decoder.decode(buf), 1)
+        eq_((decoder.records[0].src_port, decoder.records[0].dst_port),
+            (0, 0))
+
+    def test_decode_truncated_header(self):
+        # the sampled header ends in the middle of the IPv4 header
+        decoder = xflow_collector.SFlowV5Decoder()
+        buf = sflow_v5_datagram([
+            frame(ethernet.ethernet(ethertype=0x0800),
+                  ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2'))[:24]])
+        eq_(decoder.decode(buf), 0)
+
+
+class Test_FlowTable(unittest.TestCase):
+    """ Test case for xflow_collector.FlowTable
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_top_talkers(self):
+        decoder = xflow_collector.NetFlowV5Decoder()
+        table = xflow_collector.FlowTable(now=100)
+        buf = netflow_v5_datagram([
+            ('10.0.0.1', '10.0.0.2', 6, 1024, 80, 10, 1000),
+            ('10.0.0.3', '10.0.0.4', 17, 53, 53, 1, 100),
+            ('10.0.0.5', '10.0.0.6', 6, 1025, 80, 10, 700),
+        ])
+        table.add_records(decoder.records, decoder.decode(buf))
+        buf = netflow_v5_datagram([
+            ('10.0.0.5', '10.0.0.6', 6, 1025, 80, 5, 500),
+        ])
+        table.add_records(decoder.records, decoder.decode(buf))
+        eq_(len(table.flows), 3)
+
+        start, flows = table.rotate(now=110)
+        eq_(start, 100)
+        eq_(table.start, 110)
+        eq_(table.flows, {})
+        talkers = xflow_collector.FlowTable.top_talkers(flows, 2)
+        eq_([(t.src, t.dst, t.proto, t.src_port, t.dst_port, t.packets,
+              t.octets) for t in talkers],
+            [('10.0.0.5', '10.0.0.6', 6, 1025, 80, 15, 1200),
+             ('10.0.0.1', '10.0.0.2', 6, 1024, 80, 10, 1000)])
+
+
+class Test_XFlowCollector(unittest.TestCase):
+    """ Test case for xflow_collector.XFlowCollector
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_collect(self):
+        app = xflow_collector.XFlowCollector()
+        app.send_event_to_observers = mock.Mock()
+        decoder = xflow_collector.NetFlowV5Decoder()
+        buf = netflow_v5_datagram([
+            ('10.0.0.1', '10.0.0.2', 6, 1024, 80, 10, 1000),
+        ])
+        app.collect(decoder, buf)
+        app.collect(decoder, memoryview(buf)[:10])
+        eq_(app.failed_count, 1)
+
+        app.end_window()
+        ev = app.send_event_to_observers.call_args[0][0]
+        ok_(isinstance(ev, xflow_collector.EventTopTalkers))
+        eq_(ev.end, app.table.start)
+        eq_(len(ev.talkers), 1)
+        eq_(ev.talkers[0].octets, 1000)
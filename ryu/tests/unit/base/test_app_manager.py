@@ -0,0 +1,120 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+
+import mock
+from nose.tools import eq_, ok_
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller import handler
+from ryu.controller.handler import set_ev_cls
+from ryu.controller.handler import MAIN_DISPATCHER, CONFIG_DISPATCHER
+
+
+class _EventTest(event.EventBase):
+    pass
+
+
+class _EventOther(event.EventBase):
+    pass
+
+
+class _TestApp(app_manager.RyuApp):
+    @set_ev_cls(_EventTest, MAIN_DISPATCHER)
+    def main_handler(self, ev):
+        pass
+
+    @set_ev_cls(_EventTest, [MAIN_DISPATCHER, CONFIG_DISPATCHER])
+    def config_handler(self, ev):
+        pass
+
+    @set_ev_cls(_EventTest)
+    def any_handler(self, ev):
+        pass
+
+
+class Test_RyuApp(unittest.TestCase):
+    """ Test case for ryu.base.app_manager.RyuApp
+    """
+
+    def setUp(self):
+        self.app = _TestApp()
+        handler.register_instance(self.app)
+        self.ev = _EventTest()
+
+    def tearDown(self):
+        pass
+
+    def test_get_handlers(self):
+        app = self.app
+        eq_(set(app.get_handlers(self.ev)),
+            set([app.main_handler, app.config_handler, app.any_handler]))
+        eq_(set(app.get_handlers(self.ev, MAIN_DISPATCHER)),
+            set([app.main_handler, app.config_handler, app.any_handler]))
+        eq_(set(app.get_handlers(self.ev, CONFIG_DISPATCHER)),
+            set([app.config_handler, app.any_handler]))
+        eq_(app.get_handlers(_EventOther(), MAIN_DISPATCHER), ())
+
+    def test_get_handlers_cached(self):
+        handlers = self.app.get_handlers(self.ev, MAIN_DISPATCHER)
+        ok_(self.app.get_handlers(self.ev, MAIN_DISPATCHER) is handlers)
+
+    def test_get_handlers_invalidated(self):
+        app = self.app
+        dynamic_handler = lambda ev: None
+        eq_(len(app.get_handlers(self.ev, CONFIG_DISPATCHER)), 2)
+
+        app.register_handler(_EventTest, dynamic_handler)
+        eq_(set(app.get_handlers(self.ev, CONFIG_DISPATCHER)),
+            set([app.config_handler, app.any_handler, dynamic_handler]))
+
+        app.unregister_handler(_EventTest, app.any_handler)
+        eq_(set(app.get_handlers(self.ev, CONFIG_DISPATCHER)),
+            set([app.config_handler, dynamic_handler]))
+
+    def test_get_observers(self):
+        app = self.app
+        app.register_observer(_EventTest, 'a', [MAIN_DISPATCHER])
+        app.register_observer(_EventTest, 'b')
+        eq_(set(app.get_observers(self.ev, MAIN_DISPATCHER)),
+            set(['a', 'b']))
+        eq_(set(app.get_observers(self.ev, CONFIG_DISPATCHER)),
+            set(['b']))
+
+        app.register_observer(_EventTest, 'a', [CONFIG_DISPATCHER])
+        eq_(set(app.get_observers(self.ev, CONFIG_DISPATCHER)),
+            set(['a', 'b']))
+
+        app.unregister_observer(_EventTest, 'b')
+        eq_(app.get_observers(self.ev, CONFIG_DISPATCHER), ('a',))
+
+        app.unregister_observer_all_event('a')
+        eq_(app.get_observers(self.ev, CONFIG_DISPATCHER), ())
+
+    def test_send_event_to_observers(self):
+        observer = _TestApp()
+        observer.name = 'observer'
+        self.app.register_observer(_EventTest, observer.name,
+                                   [MAIN_DISPATCHER])
+        with mock.patch.dict(app_manager.SERVICE_BRICKS,
+                             {observer.name: observer}):
+            self.app.send_event_to_observers(self.ev, MAIN_DISPATCHER)
+            self.app.send_event_to_observers(self.ev, CONFIG_DISPATCHER)
+        eq_(observer.events.qsize(), 1)
+        eq_(observer.events.get(), (self.ev, MAIN_DISPATCHER))
@@ -48,12 +48,15 @@ class Test_Manager(unittest.TestCase):
     @staticmethod
     def _reset_globals():
         # hack to reset globals like SERVICE_BRICKS.
-        # assumption: this is the only test which actually starts RyuApp.
-        import ryu.base.app_manager
-        import ryu.ofproto.ofproto_protocol
+        # the modules are not reloaded, as other tests create RyuApps
+        # of the classes defined with the current RyuApp.
+        from ryu.base import app_manager
+        from ryu.ofproto import ofproto_protocol
 
-        reload(ryu.base.app_manager)
-        reload(ryu.ofproto.ofproto_protocol)
+        app_manager.SERVICE_BRICKS.clear()
+        app_manager.AppManager._instance = None
+        ofproto_protocol._supported_versions = set(
+            ofproto_protocol._versions.keys())
 
     @mock.patch('sys.argv', new=['ryu-manager', '--verbose',
                                  'ryu.tests.unit.cmd.dummy_app'])
@@ -0,0 +1,173 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import os
+import unittest
+
+import mock
+from nose.tools import eq_, ok_
+
+from ryu.base import app_manager
+from ryu.lib import hub
+from ryu.controller import controller
+from ryu.controller import ofp_event
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__),
+                               '../../packet_data/of13')
+
+
+def _load_packet(name):
+    with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+class _Socket(object):
+    """A socket which returns the given data in chunks of chunk_size."""
+
+    def __init__(self, data, chunk_size):
+        self.data = data
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.sent = []
+
+    def setsockopt(self, *_args):
+        pass
+
+    def recv_into(self, buf):
+        n = min(len(buf), self.chunk_size, len(self.data) - self.offset)
+        buf[:n] = self.data[self.offset:self.offset + n]
+        self.offset += n
+        return n
+
+    def sendall(self, buf):
+        self.sent.append(str(buf))
+
+
+class _OFPBrick(object):
+    def __init__(self):
+        self.events = []
+
+    def send_event_to_observers(self, ev, state=None):
+        self.events.append(ev)
+
+    def get_handlers(self, ev, state=None):
+        return []
+
+
+class Test_Datapath(unittest.TestCase):
+    """ Test case for ryu.controller.controller.Datapath
+    """
+
+    def setUp(self):
+        self.brick = _OFPBrick()
+        self.packet_in = _load_packet('4-4-ofp_packet_in.packet')
+        self.echo = _load_packet('4-13-ofp_echo_request.packet')
+
+    def tearDown(self):
+        pass
+
+    def _datapath(self, sock):
+        with mock.patch.object(app_manager, 'lookup_service_brick',
+                               return_value=self.brick):
+            return controller.Datapath(sock, None)
+
+    def _recv(self, data, chunk_size, recv_buf_size=None):
+        dp = self._datapath(_Socket(data, chunk_size))
+        if recv_buf_size is not None:
+            dp.recv_buf_size = recv_buf_size
+        del self.brick.events[:]
+        dp._recv_loop()
+        ok_(not dp.is_active)
+        return [ev.msg for ev in self.brick.events]
+
+    def _check_msgs(self, msgs, n):
+        eq_(len(msgs), n * 2)
+        for i, msg in enumerate(msgs):
+            if i % 2:
+                ok_(isinstance(msg, ofproto_v1_3_parser.OFPEchoRequest))
+                eq_(str(msg.buf), self.echo)
+            else:
+                ok_(isinstance(msg, ofproto_v1_3_parser.OFPPacketIn))
+                eq_(str(msg.buf), self.packet_in)
+
+    def test_recv_loop(self):
+        n = 100
+        data = (self.packet_in + self.echo) * n
+        msgs = self._recv(data, len(data))
+        self._check_msgs(msgs, n)
+
+    def test_recv_loop_fragmented(self):
+        n = 100
+        data = (self.packet_in + self.echo) * n
+        for chunk_size in (1, 3, 7, 64, 1000):
+            msgs = self._recv(data, chunk_size, recv_buf_size=256)
+            self._check_msgs(msgs, n)
+
+    def test_recv_loop_grow_buffer(self):
+        n = 10
+        data = (self.packet_in + self.echo) * n
+        ok_(len(self.packet_in) > 16)
+        msgs = self._recv(data, 5, recv_buf_size=16)
+        self._check_msgs(msgs, n)
+
+    def test_recv_loop_event_class(self):
+        self._recv(self.packet_in, len(self.packet_in))
+        eq_(len(self.brick.events), 1)
+        ok_(isinstance(self.brick.events[0], ofp_event.EventOFPPacketIn))
+
+    def test_send_loop_coalesce(self):
+        sock = _Socket('', 0)
+        dp = self._datapath(sock)
+        for i in range(5):
+            dp.send(bytearray('msg%d' % i))
+        eq_(dp.send_q_high_water, 5)
+
+        thr = hub.spawn(dp._send_loop)
+        hub.sleep(0)
+        eq_(sock.sent, ['msg0msg1msg2msg3msg4'])
+
+        dp.send(bytearray('msg5'))
+        hub.sleep(0)
+        eq_(sock.sent, ['msg0msg1msg2msg3msg4', 'msg5'])
+
+        hub.kill(thr)
+        hub.joinall([thr])
+        eq_(dp.send_q, None)
+
+    def test_send_blocked_time(self):
+        sock = _Socket('', 0)
+        dp = self._datapath(sock)
+        dp.send_q.resize(2)
+        for i in range(2):
+            dp.send(bytearray('msg%d' % i))
+        eq_(dp.send_blocked_time, 0.0)
+
+        producer = hub.spawn(dp.send, bytearray('msg2'))
+        hub.sleep(0.1)
+        eq_(sock.sent, [])
+
+        thr = hub.spawn(dp._send_loop)
+        hub.joinall([producer])
+        hub.sleep(0)
+        eq_(''.join(sock.sent), 'msg0msg1msg2')
+        ok_(dp.send_blocked_time >= 0.05)
+        eq_(dp.send_q_high_water, 2)
+
+        hub.kill(thr)
+        hub.joinall([thr])
@@ -0,0 +1,115 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+
+from nose.tools import eq_, ok_
+
+from ryu.controller import ofp_event
+from ryu.lib import hub
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_0_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+
+def _data():
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet(src='00:00:00:00:00:01'))
+    pkt.add_protocol(ipv4.ipv4())
+    pkt.serialize()
+    return str(pkt.data)
+
+
+class Test_EventOFPPacketIn(unittest.TestCase):
+
+    """ Test case for the packet property of EventOFPPacketIn
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _event(self):
+        datapath = ofproto_protocol.ProtocolDesc(
+            version=ofproto_v1_3.OFP_VERSION)
+        msg = ofproto_v1_3_parser.OFPPacketIn(datapath, data=_data())
+        return ofp_event.ofp_msg_to_ev(msg)
+
+    def test_packet(self):
+        ev = self._event()
+        ok_(isinstance(ev, ofp_event.EventOFPPacketInBase))
+        eth = ev.packet.get_protocol(ethernet.ethernet)
+        eq_(eth.src, '00:00:00:00:00:01')
+        ok_(ev.packet.get_protocol(ipv4.ipv4))
+
+    def test_decoded_once(self):
+        ev = self._event()
+        pkt = ev.packet
+        ok_(ev.packet is pkt)
+        ok_(ev.packet is pkt)
+
+    def test_observers(self):
+        ev = self._event()
+        got = {}
+
+        def _modify():
+            # e.g. to send the packet back in a PacketOut
+            pkt = ev.packet
+            pkt.get_protocol(ethernet.ethernet).src = '00:00:00:00:00:02'
+            pkt.get_protocol(ipv4.ipv4).ttl = 1
+            pkt.serialize()
+            got['modify'] = pkt
+
+        def _read():
+            got['read'] = ev.packet
+
+        hub.joinall([hub.spawn(_modify), hub.spawn(_read)])
+        ok_(got['modify'] is not got['read'])
+        pkt = got['read']
+        eq_(pkt.get_protocol(ethernet.ethernet).src, '00:00:00:00:00:01')
+        eq_(pkt.get_protocol(ipv4.ipv4).ttl, 255)
+        eq_(pkt.data, _data())
+        eq_(str(ev.packet), str(packet.Packet(_data())))
+        # decoded once
+        eq_(len(ev._packet.protocols), 2)
+
+    def test_per_event(self):
+        ev1 = self._event()
+        ev2 = self._event()
+        ok_(ev1.packet is not ev2.packet)
+
+    def test_of10(self):
+        datapath = ofproto_protocol.ProtocolDesc(
+            version=ofproto_v1_0.OFP_VERSION)
+        msg = ofproto_v1_0_parser.OFPPacketIn(datapath)
+        msg.data = _data()
+        ev = ofp_event.ofp_msg_to_ev(msg)
+        ok_(ev.packet.get_protocol(ipv4.ipv4))
+
+    def test_other_events(self):
+        datapath = ofproto_protocol.ProtocolDesc(
+            version=ofproto_v1_3.OFP_VERSION)
+        msg = ofproto_v1_3_parser.OFPEchoRequest(datapath)
+        ev = ofp_event.ofp_msg_to_ev(msg)
+        ok_(not hasattr(ev, 'packet'))
@@ -0,0 +1,239 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+
+import mock
+from nose.tools import eq_, ok_, raises
+
+from ryu import exception
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.controller import xid_table
+from ryu.ofproto import ofproto_protocol
+from ryu.ofproto import ofproto_v1_0
+from ryu.ofproto import ofproto_v1_3
+
+
+class _Socket(object):
+    def __init__(self):
+        self.sent = []
+
+    def setsockopt(self, *_args):
+        pass
+
+    def sendall(self, buf):
+        self.sent.append(str(buf))
+
+
+class _OFPBrick(object):
+    def send_event_to_observers(self, ev, state=None):
+        pass
+
+
+class Test_XidTable(unittest.TestCase):
+    """ Test case for ryu.controller.xid_table.XidTable
+    """
+
+    def setUp(self):
+        self.dp = ofproto_protocol.ProtocolDesc(ofproto_v1_3.OFP_VERSION)
+        self.dp.id = 1
+        self.table = xid_table.XidTable(self.dp)
+
+    def tearDown(self):
+        pass
+
+    def _flow_stats_reply(self, xid, more=False):
+        msg = self.dp.ofproto_parser.OFPFlowStatsReply(self.dp)
+        msg.xid = xid
+        msg.flags = self.dp.ofproto.OFPMPF_REPLY_MORE if more else 0
+        return msg
+
+    def test_multipart(self):
+        future = self.table.register(1)
+        msgs = [self._flow_stats_reply(1, more=True),
+                self._flow_stats_reply(1)]
+        self.table.dispatch(msgs[0])
+        ok_(not future.done())
+        ok_(1 in self.table)
+        self.table.dispatch(self._flow_stats_reply(2))
+        self.table.dispatch(msgs[1])
+        ok_(future.done())
+        eq_(future.result(), msgs)
+        eq_(len(self.table), 0)
+
+    def test_single_reply(self):
+        future = self.table.register(1)
+        msg = self.dp.ofproto_parser.OFPBarrierReply(self.dp)
+        msg.xid = 1
+        self.table.dispatch(msg)
+        eq_(future.result(), [msg])
+
+    def test_stats_reply_v1_0(self):
+        dp = ofproto_protocol.ProtocolDesc(ofproto_v1_0.OFP_VERSION)
+        table = xid_table.XidTable(dp)
+        future = table.register(1)
+        msg = dp.ofproto_parser.OFPFlowStatsReply(dp)
+        msg.xid = 1
+        msg.flags = dp.ofproto.OFPSF_REPLY_MORE
+        table.dispatch(msg)
+        ok_(not future.done())
+
+    @raises(exception.OFPRequestError)
+    def test_error(self):
+        future = self.table.register(1)
+        msg = self.dp.ofproto_parser.OFPErrorMsg(self.dp, type_=1, code=2)
+        msg.xid = 1
+        self.table.dispatch(msg)
+        eq_(len(self.table), 0)
+        future.result()
+
+    def test_timeout(self):
+        future = self.table.register(1, timeout=0.1)
+        try:
+            future.result(timeout=5)
+        except exception.OFPRequestTimeout:
+            pass
+        else:
+            ok_(False)
+        eq_(len(self.table), 0)
+        eq_(len(xid_table._wheel), 0)
+
+    def test_result_timeout(self):
+        future = self.table.register(1, timeout=10)
+        try:
+            future.result(timeout=0.01)
+        except exception.OFPRequestTimeout:
+            pass
+        else:
+            ok_(False)
+        eq_(len(self.table), 0)
+        eq_(len(xid_table._wheel), 0)
+        # a late reply is ignored
+        self.table.dispatch(self._flow_stats_reply(1))
+        eq_(future.msgs, [])
+
+    def test_timer_cancelled(self):
+        future = self.table.register(1, timeout=10)
+        eq_(len(xid_table._wheel), 1)
+        self.table.dispatch(self._flow_stats_reply(1))
+        ok_(future.done())
+        eq_(len(xid_table._wheel), 0)
+
+    def _error(self, xid):
+        msg = self.dp.ofproto_parser.OFPErrorMsg(self.dp, type_=1, code=2)
+        msg.xid = xid
+        return msg
+
+    def _barrier_reply(self, xid):
+        msg = self.dp.ofproto_parser.OFPBarrierReply(self.dp)
+        msg.xid = xid
+        return msg
+
+    def _batch(self, xids):
+        batch = []
+        for xid in xids:
+            msg = self.dp.ofproto_parser.OFPFlowMod(self.dp)
+            msg.xid = xid
+            batch.append(msg)
+        return batch
+
+    def test_batch(self):
+        batch = self._batch([1, 2, 3])
+        future = self.table.register_batch(4, batch)
+        reply = self._barrier_reply(4)
+        self.table.dispatch(reply)
+        eq_(future.result(), [reply])
+        eq_(len(self.table), 0)
+        eq_(self.table._batch_xids, {})
+
+    def test_batch_error(self):
+        batch = self._batch([1, 2, 3])
+        future = self.table.register_batch(4, batch)
+        errors = [self._error(3), self._error(1)]
+        for error in errors:
+            self.table.dispatch(error)
+        ok_(not future.done())
+        self.table.dispatch(self._barrier_reply(4))
+        try:
+            future.result()
+        except exception.OFPBatchError as e:
+            eq_(e.errors, [(batch[2], errors[0]), (batch[0], errors[1])])
+        else:
+            ok_(False)
+        eq_(self.table._batch_xids, {})
+
+    @raises(exception.OFPDatapathDisconnected)
+    def test_cancel_all(self):
+        future = self.table.register(1, timeout=10)
+        self.table.cancel_all()
+        eq_(len(self.table), 0)
+        eq_(len(xid_table._wheel), 0)
+        future.result()
+
+
+class Test_Datapath_requests(unittest.TestCase):
+    """ Test case for the request methods of Datapath
+    """
+
+    def setUp(self):
+        with mock.patch.object(app_manager, 'lookup_service_brick',
+                               return_value=_OFPBrick()):
+            self.dp = controller.Datapath(_Socket(), None)
+        self.dp.set_version(ofproto_v1_3.OFP_VERSION)
+
+    def tearDown(self):
+        pass
+
+    def test_send_request(self):
+        req = self.dp.ofproto_parser.OFPFlowStatsRequest(self.dp)
+        future = self.dp.send_request(req)
+        ok_(req.xid in self.dp.xid_table)
+        eq_(self.dp.send_q.get(block=False), req.buf)
+        ok_(not future.done())
+
+    def test_send_msgs(self):
+        parser = self.dp.ofproto_parser
+        batch = [parser.OFPFlowMod(self.dp) for _i in range(3)]
+        future = self.dp.send_msgs(batch)
+        buf = self.dp.send_q.get(block=False)
+        ok_(self.dp.send_q.empty())
+        eq_(buf, ''.join(str(msg.buf) for msg in batch) + self._barrier(
+            future.xid))
+        eq_(sorted(future.batch.keys()), [msg.xid for msg in batch])
+        ok_(future.xid in self.dp.xid_table)
+
+    def test_send_msgs_no_barrier(self):
+        parser = self.dp.ofproto_parser
+        batch = [parser.OFPFlowMod(self.dp) for _i in range(3)]
+        eq_(self.dp.send_msgs(batch, barrier=False), None)
+        eq_(self.dp.send_q.get(block=False),
+            ''.join(str(msg.buf) for msg in batch))
+        eq_(len(self.dp.xid_table), 0)
+
+    def _barrier(self, xid):
+        msg = self.dp.ofproto_parser.OFPBarrierRequest(self.dp)
+        msg.xid = xid
+        msg.serialize()
+        return str(msg.buf)
+
+    @raises(exception.OFPDatapathDisconnected)
+    def test_close(self):
+        req = self.dp.ofproto_parser.OFPFlowStatsRequest(self.dp)
+        future = self.dp.send_request(req)
+        self.dp.close()
+        future.result()
@@ -14,8 +14,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import struct
 import unittest
-from nose.tools import eq_
+from nose.tools import eq_, ok_, raises
+
+import netaddr
 
 from ryu.lib import addrconv
 
@@ -54,3 +57,50 @@ class Test_addrconv(unittest.TestCase):
     def test_mac(self):
         self._test_conv(addrconv.mac, 'f2:0b:a4:01:0a:23',
                         '\xf2\x0b\xa4\x01\x0a\x23')
+        self._test_conv(addrconv.mac, '00:00:00:00:00:00',
+                        '\x00\x00\x00\x00\x00\x00')
+
+    def test_ipv4_netaddr_forms(self):
+        # the forms which are converted by netaddr
+        eq_(addrconv.ipv4.text_to_bin('10.1'), '\x0a\x00\x00\x01')
+        eq_(addrconv.ipv4.text_to_bin(0x0a000001), '\x0a\x00\x00\x01')
+        eq_(addrconv.ipv4.bin_to_text(bytearray('\x7f\x00\x00\x01')),
+            '127.0.0.1')
+
+    def test_ipv6_format(self):
+        eq_(addrconv.ipv6.text_to_bin('FE80::1'),
+            addrconv.ipv6.text_to_bin('fe80::1'))
+        self._test_conv(addrconv.ipv6, '::ffff:10.0.0.1',
+                        ('\x00\x00\x00\x00\x00\x00\x00\x00'
+                         '\x00\x00\xff\xff\x0a\x00\x00\x01'))
+        self._test_conv(addrconv.ipv6, '1:0:0:1::1',
+                        ('\x00\x01\x00\x00\x00\x00\x00\x01'
+                         '\x00\x00\x00\x00\x00\x00\x00\x01'))
+
+    def test_mac_netaddr_forms(self):
+        bin_value = '\xf2\x0b\xa4\x01\x0a\x23'
+        eq_(addrconv.mac.text_to_bin('F2:0B:A4:01:0A:23'), bin_value)
+        eq_(addrconv.mac.text_to_bin('f2-0b-a4-01-0a-23'), bin_value)
+        eq_(addrconv.mac.text_to_bin('f20b.a401.0a23'), bin_value)
+        eq_(addrconv.mac.bin_to_text(bytearray(bin_value)),
+            'f2:0b:a4:01:0a:23')
+
+    def test_mac_cache(self):
+        cache = addrconv.mac._text_cache
+        for i in range(addrconv.mac._CACHE_SIZE + 1):
+            addrconv.mac.bin_to_text('\x00\x00' + struct.pack('!I', i))
+        ok_(len(cache) <= addrconv.mac._CACHE_SIZE)
+        eq_(addrconv.mac.bin_to_text('\x00\x00\x00\x00\x00\x01'),
+            '00:00:00:00:00:01')
+
+    @raises(netaddr.AddrFormatError)
+    def test_ipv4_invalid(self):
+        addrconv.ipv4.text_to_bin('10.0.0.256')
+
+    @raises(netaddr.AddrFormatError)
+    def test_ipv6_invalid(self):
+        addrconv.ipv6.text_to_bin('1::2::3')
+
+    @raises(netaddr.AddrFormatError)
+    def test_mac_invalid(self):
+        addrconv.mac.text_to_bin('f2:0b:a4:01:0a:2g')
@@ -0,0 +1,179 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+from nose.tools import eq_, ok_, raises
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.lib import event_queue
+from ryu.lib import hub
+
+
+class _Event(event.EventBase):
+    def __init__(self, value):
+        super(_Event, self).__init__()
+        self.value = value
+
+
+class _EventOther(_Event):
+    pass
+
+
+class _EventUnrelated(event.EventBase):
+    def __init__(self, value):
+        super(_EventUnrelated, self).__init__()
+        self.value = value
+
+
+class Test_EventQueue(unittest.TestCase):
+    """ Test case for ryu.lib.event_queue.EventQueue
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _values(self, q):
+        values = []
+        while not q.empty():
+            ev, state = q.get()
+            values.append((ev.__class__, ev.value, state))
+        return values
+
+    def test_block(self):
+        q = event_queue.EventQueue(2)
+        got = []
+
+        def consume():
+            for _i in range(3):
+                got.append(q.get()[0].value)
+
+        for i in range(2):
+            q.put((_Event(i), None))
+        ok_(q.full())
+        thread = hub.spawn(consume)
+        q.put((_Event(2), None))
+        hub.joinall([thread])
+        eq_(got, [0, 1, 2])
+        ok_(q.empty())
+
+    def test_drop_newest(self):
+        q = event_queue.EventQueue(2, {_Event: event_queue.DROP_NEWEST})
+        for i in range(3):
+            q.put((_Event(i), 'a'))
+        eq_(self._values(q), [(_Event, 0, 'a'), (_Event, 1, 'a')])
+        eq_(q.dropped, {_Event: 1})
+
+    def test_drop_oldest(self):
+        q = event_queue.EventQueue(3, {_Event: event_queue.DROP_OLDEST,
+                                       _EventOther: event_queue.DROP_OLDEST})
+        q.put((_EventOther(0), None))
+        for i in range(4):
+            q.put((_Event(i), None))
+        eq_(q.qsize(), 3)
+        eq_(self._values(q), [(_EventOther, 0, None), (_Event, 2, None),
+                              (_Event, 3, None)])
+        eq_(q.dropped, {_Event: 2})
+
+        # an event of the same class is dropped
+        for i in range(3):
+            q.put((_Event(i), None))
+        q.put((_EventOther(1), None))
+        eq_(self._values(q), [(_Event, 0, None), (_Event, 1, None),
+                              (_Event, 2, None)])
+        eq_(q.dropped, {_Event: 2, _EventOther: 1})
+
+    def test_coalesce(self):
+        policy = event_queue.Coalesce(lambda ev: ev.value % 2)
+        q = event_queue.EventQueue(3, {_Event: policy})
+        for i in range(5):
+            q.put((_Event(i), i))
+        q.put((_EventUnrelated(5), None))
+        eq_(q.coalesced, {_Event: 3})
+        ok_(q.full())
+        eq_(q.get()[1], 4)
+        q.put((_Event(6), 6))
+        q.put((_Event(7), 7))
+        eq_(self._values(q), [(_Event, 7, 7),
+                              (_EventUnrelated, 5, None), (_Event, 6, 6)])
+        eq_(q.coalesced, {_Event: 4})
+        eq_(q.dropped, {})
+
+    def test_priority(self):
+        q = event_queue.EventQueue(1, {_EventOther: event_queue.PRIORITY},
+                                   default=event_queue.DROP_NEWEST)
+        q.put((_Event(0), None))
+        q.put((_Event(1), None))
+        q.put((_EventOther(2), None))
+        q.put((_EventOther(3), None))
+        eq_(self._values(q), [(_EventOther, 2, None), (_EventOther, 3, None),
+                              (_Event, 0, None)])
+
+    def test_subclass(self):
+        class _EventSub(_EventOther):
+            pass
+
+        q = event_queue.EventQueue(2, {_Event: event_queue.DROP_NEWEST,
+                                       _EventOther: event_queue.DROP_OLDEST})
+        eq_(q.policies, {_Event: event_queue.DROP_NEWEST,
+                         _EventOther: event_queue.DROP_OLDEST})
+        # the policy of the nearest base class
+        q.put((_EventOther(0), None))
+        q.put((_EventSub(1), None))
+        q.put((_EventSub(2), None))
+        eq_(self._values(q), [(_EventSub, 1, None), (_EventSub, 2, None)])
+        eq_(q.dropped, {_EventOther: 1})
+
+        q.set_policy(_EventSub, event_queue.DROP_NEWEST)
+        for i in range(3):
+            q.put((_EventSub(i), None))
+        eq_(q.dropped, {_EventOther: 1, _EventSub: 1})
+
+    def test_invalid_policy(self):
+        for policies in ({_Event: 'drop'}, {_Event: None},
+                         {'_Event': event_queue.BLOCK}):
+            try:
+                event_queue.EventQueue(1, policies)
+            except ValueError:
+                pass
+            else:
+                ok_(False, policies)
+
+    @raises(ValueError)
+    def test_invalid_app_policy(self):
+        class _App(app_manager.RyuApp):
+            EVENT_QUEUE_POLICIES = {_Event: 'drop_all'}
+
+        _App()
+
+    def test_app(self):
+        class _App(app_manager.RyuApp):
+            EVENT_QUEUE_POLICIES = {_Event: event_queue.DROP_NEWEST}
+
+        app = _App()
+        for i in range(200):
+            app._send_event(_Event(i), None)
+        eq_(app.events.qsize(), 128)
+        eq_(app.events.dropped, {_Event: 72})
+        # the stop event isn't blocked and the events are handled
+        app.start()
+        app.stop()
+        ok_(app.events.empty())
+        eq_(_App.EVENT_QUEUE_POLICIES, {_Event: event_queue.DROP_NEWEST})
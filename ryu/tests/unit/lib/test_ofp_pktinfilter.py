@@ -25,10 +25,11 @@ from ryu.controller.handler import (
     set_ev_cls,
     MAIN_DISPATCHER,
 )
-from ryu.lib.packet import vlan, ethernet, ipv4
+from ryu.lib.packet import packet, vlan, ethernet, ipv4, ipv6, tcp, udp
 from ryu.lib.ofp_pktinfilter import packet_in_filter, RequiredTypeFilter
+from ryu.lib.ofp_pktinfilter import MatchFilter
 from ryu.lib import mac
-from ryu.ofproto import ether, ofproto_v1_3, ofproto_v1_3_parser
+from ryu.ofproto import ether, inet, ofproto_v1_3, ofproto_v1_3_parser
 from ryu.ofproto.ofproto_protocol import ProtocolDesc
 
 
@@ -41,7 +42,7 @@ class _PacketInFilterApp(object):
         vlan.vlan,
     ]})
     def packet_in_handler(self, ev):
-        return True
+        return ev.packet
 
 
 class Test_packet_in_filter(unittest.TestCase):
@@ -67,7 +68,10 @@ class Test_packet_in_filter(unittest.TestCase):
         pkt_in = ofproto_v1_3_parser.OFPPacketIn(datapath,
                                                  data=buffer(pkt.data))
         ev = ofp_event.EventOFPPacketIn(pkt_in)
-        ok_(self.app.packet_in_handler(ev))
+        # the packet decoded by the filter is passed to the handler
+        pkt = self.app.packet_in_handler(ev)
+        ok_(pkt.get_protocol(vlan.vlan))
+        ok_(ev.packet is pkt)
 
     def test_pkt_in_filter_discard(self):
         datapath = ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
@@ -89,3 +93,120 @@ class Test_packet_in_filter(unittest.TestCase):
                                                  data=truncated_data)
         ev = ofp_event.EventOFPPacketIn(pkt_in)
         ok_(not self.app.packet_in_handler(ev))
+
+
+def _packet_in(*protocols):
+    datapath = ProtocolDesc(version=ofproto_v1_3.OFP_VERSION)
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    pkt_in = ofproto_v1_3_parser.OFPPacketIn(datapath, data=str(pkt.data))
+    return ofp_event.EventOFPPacketIn(pkt_in)
+
+
+class Test_MatchFilter(unittest.TestCase):
+
+    """ Test case for MatchFilter
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _filter(self, args, ev):
+        return MatchFilter(args).filter_data(ev.msg.data)
+
+    def _tcp(self, src_mac='00:00:00:00:00:01', vid=None, ip_src='10.0.0.1',
+             dst_port=80):
+        protocols = [ethernet.ethernet(src=src_mac)]
+        if vid is not None:
+            protocols[0].ethertype = ether.ETH_TYPE_8021Q
+            protocols.append(vlan.vlan(vid=vid, ethertype=ether.ETH_TYPE_IP))
+        protocols.append(ipv4.ipv4(proto=inet.IPPROTO_TCP, src=ip_src))
+        protocols.append(tcp.tcp(src_port=1, dst_port=dst_port))
+        return _packet_in(*protocols)
+
+    def test_empty(self):
+        ok_(self._filter({}, self._tcp()))
+
+    def test_eth(self):
+        ev = self._tcp(src_mac='00:11:22:33:44:55')
+        ok_(self._filter({'eth_src': '00:11:22:33:44:55'}, ev))
+        ok_(self._filter({'eth_src': ('00:11:22:00:00:00',
+                                      'ff:ff:ff:00:00:00')}, ev))
+        ok_(not self._filter({'eth_src': ('00:11:23:00:00:00',
+                                          'ff:ff:ff:00:00:00')}, ev))
+        ok_(self._filter({'eth_dst': 'ff:ff:ff:ff:ff:ff',
+                          'eth_type': ether.ETH_TYPE_IP}, ev))
+        ok_(not self._filter({'eth_type': ether.ETH_TYPE_ARP}, ev))
+
+    def test_vlan(self):
+        ev = self._tcp(vid=10)
+        ok_(self._filter({'vlan_vid': 10}, ev))
+        ok_(not self._filter({'vlan_vid': 11}, ev))
+        ok_(not self._filter({'vlan_vid': 10}, self._tcp()))
+        # eth_type and the rest are looked up after the tag
+        ok_(self._filter({'eth_type': ether.ETH_TYPE_IP, 'tcp_dst': 80}, ev))
+
+    def test_ipv4(self):
+        ev = self._tcp(ip_src='192.168.1.2')
+        ok_(self._filter({'ipv4_src': '192.168.1.2'}, ev))
+        ok_(self._filter({'ipv4_src': ('192.168.0.0', '255.255.0.0')}, ev))
+        ok_(not self._filter({'ipv4_src': ('192.169.0.0', '255.255.0.0')},
+                             ev))
+        ok_(not self._filter({'ipv4_dst': '192.168.1.2'}, ev))
+
+    def test_l4(self):
+        ev = self._tcp(dst_port=443)
+        ok_(self._filter({'ip_proto': inet.IPPROTO_TCP}, ev))
+        ok_(self._filter({'tcp_dst': 443}, ev))
+        ok_(not self._filter({'tcp_dst': 80}, ev))
+        ok_(not self._filter({'udp_dst': 443}, ev))
+
+    def test_ipv6_udp(self):
+        ev = _packet_in(ethernet.ethernet(ethertype=ether.ETH_TYPE_IPV6),
+                        ipv6.ipv6(nxt=inet.IPPROTO_UDP),
+                        udp.udp(src_port=546, dst_port=547))
+        ok_(self._filter({'udp_dst': 547}, ev))
+        ok_(not self._filter({'tcp_dst': 547}, ev))
+        ok_(not self._filter({'ipv4_src': '10.0.0.1'}, ev))
+
+    def test_fragment(self):
+        ev = _packet_in(ethernet.ethernet(),
+                        ipv4.ipv4(proto=inet.IPPROTO_UDP, offset=100),
+                        '\x00\x35\x00\x35')
+        ok_(self._filter({'ip_proto': inet.IPPROTO_UDP}, ev))
+        ok_(not self._filter({'udp_src': 53}, ev))
+
+    def test_truncated(self):
+        ev = self._tcp()
+        ev.msg.data = ev.msg.data[:30]
+        ok_(not self._filter({'tcp_dst': 80}, ev))
+        ok_(self._filter({'eth_type': ether.ETH_TYPE_IP}, ev))
+
+    def test_no_args(self):
+        ok_(self._filter(None, self._tcp()))
+        ok_(self._filter({}, self._tcp()))
+
+    @raises(ValueError)
+    def test_unknown_field(self):
+        MatchFilter({'arp_op': 1})
+
+    @raises(ValueError)
+    def test_conflict(self):
+        MatchFilter({'tcp_dst': 80, 'ip_proto': inet.IPPROTO_UDP})
+
+    def test_not_decoded(self):
+        class _App(object):
+            @packet_in_filter(MatchFilter, {'tcp_dst': 80})
+            def packet_in_handler(self, ev):
+                return True
+
+        ev = self._tcp()
+        ok_(_App().packet_in_handler(ev))
+        # the packet is not decoded
+        ok_(ev._packet is None)
+        ok_(not _App().packet_in_handler(self._tcp(dst_port=81)))
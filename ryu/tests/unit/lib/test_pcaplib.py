@@ -0,0 +1,209 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import os
+import StringIO
+import struct
+import tempfile
+import unittest
+
+from nose.tools import eq_, ok_
+
+from ryu.lib import pcaplib
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import packet
+
+
+PKTS = [(1.5, 'a' * 60), (2.25, 'b' * 1500), (3.0, 'c' * 14)]
+
+
+class _File(StringIO.StringIO):
+    # keep the contents after close()
+    def close(self):
+        pass
+
+
+def _records(reader):
+    return list(reader)
+
+
+class Test_pcaplib(unittest.TestCase):
+    """ Test case for ryu.lib.pcaplib
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _write(self, pkts):
+        f = _File()
+        writer = pcaplib.Writer(f)
+        for ts, buf in pkts:
+            writer.write_pkt(buf, ts)
+        return f.getvalue()
+
+    def test_read(self):
+        data = self._write(PKTS)
+        eq_(_records(pcaplib.Reader(StringIO.StringIO(data))), PKTS)
+
+    def test_read_small_chunks(self):
+        data = self._write(PKTS)
+        reader = pcaplib.Reader(StringIO.StringIO(data), chunk_size=7)
+        eq_(_records(reader), PKTS)
+
+    def test_str(self):
+        data = self._write(PKTS)
+        records = list(pcaplib.Reader(StringIO.StringIO(data), chunk_size=7))
+        # the records stay valid after the buffer is refilled
+        eq_(records, PKTS)
+        ok_(isinstance(records[0][1], str))
+
+    def test_packet(self):
+        e = ethernet.ethernet()
+        pkt = packet.Packet()
+        pkt.add_protocol(e)
+        pkt.serialize()
+        data = self._write([(0, pkt.data)])
+        ((_ts, buf),) = pcaplib.Reader(StringIO.StringIO(data))
+        eq_(str(packet.Packet(buf).get_protocol(ethernet.ethernet)), str(e))
+
+    def test_packet_serialize(self):
+        # read -> Packet -> serialize -> write round trip
+        pkt = packet.Packet()
+        pkt.add_protocol(ethernet.ethernet())
+        pkt.add_protocol('payload')
+        pkt.serialize()
+        data = self._write([(0, pkt.data)])
+        f = _File()
+        writer = pcaplib.Writer(f)
+        for ts, buf in pcaplib.Reader(StringIO.StringIO(data)):
+            pkt = packet.Packet(buf)
+            pkt.serialize()
+            writer.write_pkt(pkt.data, ts)
+        eq_(f.getvalue(), data)
+
+    def test_file(self):
+        data = self._write(PKTS)
+        fd, path = tempfile.mkstemp()
+        try:
+            os.write(fd, data)
+            os.close(fd)
+            # memory-mapped
+            with pcaplib.Reader(open(path, 'rb')) as reader:
+                eq_(reader.next(), PKTS[0])
+            ok_(reader._fp.closed)
+            eq_(list(reader), [])
+
+            reader = pcaplib.Reader(open(path, 'rb'))
+            eq_(list(reader), PKTS)
+            ok_(reader._fp.closed)
+        finally:
+            os.remove(path)
+
+    def test_truncated(self):
+        data = self._write(PKTS)
+        reader = pcaplib.Reader(StringIO.StringIO(data[:-1]))
+        eq_(_records(reader), PKTS[:2])
+
+    def test_nsec(self):
+        data = struct.pack('<IHHIIII', 0xa1b23c4d, 2, 4, 0, 0, 65535, 1)
+        data += struct.pack('<IIII', 1, 500000000, 3, 3) + 'abc'
+        eq_(_records(pcaplib.Reader(StringIO.StringIO(data))),
+            [(1.5, 'abc')])
+
+    def test_big_endian(self):
+        data = struct.pack('>IHHIIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1)
+        data += struct.pack('>IIII', 1, 500000, 3, 3) + 'abc'
+        eq_(_records(pcaplib.Reader(StringIO.StringIO(data))),
+            [(1.5, 'abc')])
+
+    def test_write_pkts(self):
+        f = _File()
+        pcaplib.Writer(f).write_pkts(PKTS)
+        eq_(f.getvalue(), self._write(PKTS))
+
+    def test_copy(self):
+        # write the records read by Reader as they are
+        data = self._write(PKTS)
+        f = _File()
+        pcaplib.Writer(f).write_pkts(pcaplib.Reader(StringIO.StringIO(data)))
+        eq_(f.getvalue(), data)
+
+
+def _block(byteorder, block_type, body):
+    body += '\x00' * (-len(body) % 4)
+    block_len = len(body) + 12
+    return (struct.pack(byteorder + 'II', block_type, block_len) + body +
+            struct.pack(byteorder + 'I', block_len))
+
+
+def _pcapng(byteorder, tsresol=None):
+    shb = _block(byteorder, 0x0a0d0d0a,
+                 struct.pack(byteorder + 'IHHq', 0x1a2b3c4d, 1, 0, -1))
+    options = ''
+    if tsresol is not None:
+        options = struct.pack(byteorder + 'HHB3x', 9, 1, tsresol)
+        options += struct.pack(byteorder + 'HH', 0, 0)
+    idb = _block(byteorder, 1,
+                 struct.pack(byteorder + 'HHI', 1, 0, 65535) + options)
+    return shb + idb
+
+
+def _epb(byteorder, ts, data):
+    return _block(byteorder, 6,
+                  struct.pack(byteorder + 'IIIII', 0, ts >> 32,
+                              ts & 0xffffffff, len(data), len(data)) + data)
+
+
+class Test_pcaplib_pcapng(unittest.TestCase):
+    """ Test case for reading pcapng files by ryu.lib.pcaplib.Reader
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _read(self, data):
+        return _records(pcaplib.Reader(StringIO.StringIO(data),
+                                       chunk_size=16))
+
+    def test_epb(self):
+        for byteorder in ('<', '>'):
+            data = (_pcapng(byteorder) +
+                    _epb(byteorder, 1500000, 'abcde') +
+                    _block(byteorder, 5, 'statistics') +
+                    _epb(byteorder, 2000000, 'fg'))
+            eq_(self._read(data), [(1.5, 'abcde'), (2.0, 'fg')])
+
+    def test_tsresol(self):
+        data = _pcapng('<', tsresol=9) + _epb('<', 1500000000, 'abc')
+        eq_(self._read(data), [(1.5, 'abc')])
+        data = _pcapng('<', tsresol=0x80 | 10) + _epb('<', 1536, 'abc')
+        eq_(self._read(data), [(1.5, 'abc')])
+
+    def test_spb(self):
+        data = _pcapng('<') + _block('<', 3, struct.pack('<I', 3) + 'abc')
+        eq_(self._read(data), [(None, 'abc')])
+
+    def test_sections(self):
+        data = (_pcapng('<') + _epb('<', 1000000, 'abc') +
+                _pcapng('>', tsresol=3) + _epb('>', 2000, 'de'))
+        eq_(self._read(data), [(1.0, 'abc'), (2.0, 'de')])
@@ -18,7 +18,7 @@
 
 import base64
 import unittest
-from nose.tools import eq_
+from nose.tools import eq_, ok_
 
 from ryu.lib import stringify
 
@@ -31,6 +31,22 @@ class C1(stringify.StringifyMixin):
         self.c = c
 
 
+class C2(stringify.StringifyMixin):
+    _TYPE = {
+        'ascii': [
+            'name',
+        ]
+    }
+    _class_prefixes = ['C1']
+    cls_attr = 1
+
+    def __init__(self, name, type_, value=None, func=None):
+        self.name = name
+        self.type_ = type_
+        self.value = value
+        self.func = func
+
+
 class Test_stringify(unittest.TestCase):
     """ Test case for ryu.lib.stringify
     """
@@ -68,3 +84,52 @@ class Test_stringify(unittest.TestCase):
         eq_(c.__class__, c2.__class__)
         eq_(c.__dict__, c2.__dict__)
         eq_(j, c.to_jsondict(encode_string=my_encode))
+
+    def test_attrs(self):
+        c = C2(name='foo', type_=1, func=len)
+        eq_(list(stringify.obj_attrs(c)),
+            [('name', 'foo'), ('type', 1), ('value', None)])
+        # an attribute added to an instance
+        c.extra = 2
+        eq_(list(stringify.obj_attrs(c)),
+            [('extra', 2), ('name', 'foo'), ('type', 1), ('value', None)])
+        eq_(list(stringify.obj_attrs(C2(name='bar', type_=2))),
+            [('func', None), ('name', 'bar'), ('type', 2), ('value', None)])
+        eq_(list(stringify.obj_python_attrs(c)),
+            list(stringify._obj_python_attrs_slow(c)))
+
+    def test_jsondict_types(self):
+        c = C2(name='foo', type_=1, value=[C1(a='A', c='C'), 2.5],
+               func=len)
+        j = {'C2': {'name': u'foo', 'type': 1,
+                    'value': [{'C1': {'a': 'QQ==', 'c': 'Qw=='}}, 2.5]}}
+        eq_(j, c.to_jsondict())
+        # encode_string does not change the _TYPE attributes
+        j2 = c.to_jsondict(encode_string=lambda v: v)
+        eq_(j2['C2']['name'], u'foo')
+        eq_(j2['C2']['value'], [{'C1': {'a': 'QQ==', 'c': 'Qw=='}}, 2.5])
+
+        c2 = C2.from_jsondict({'name': u'foo', 'type': 1, 'value': 'Zm9v'})
+        eq_(c2.name, 'foo')
+        ok_(isinstance(c2.name, str))
+        eq_(c2.type_, 1)
+        eq_(c2.value, 'foo')
+
+    def test_many_encode_strings(self):
+        c = C1(a='AAA', c='CCC')
+        for i in range(stringify._DEFAULT_CODERS_MAX + 1):
+            eq_(c.to_jsondict(encode_string=lambda v: v + str(i)),
+                {'C1': {'a': 'AAA' + str(i), 'c': 'CCC' + str(i)}})
+        ok_(len(stringify._default_encoders) <=
+            stringify._DEFAULT_CODERS_MAX)
+
+    def test_same_string_coder(self):
+        # the same function to encode and decode strings
+        def identity(v):
+            return v
+        c = C2(name='foo', type_=1, value=[C1(a='AAA', c='CCC')])
+        j = c.to_jsondict(encode_string=identity)
+        c2 = C2.from_jsondict(j['C2'], decode_string=identity)
+        (c1, ) = c2.value
+        eq_(c1.__class__, C1)
+        eq_(c1.__dict__, c.value[0].__dict__)
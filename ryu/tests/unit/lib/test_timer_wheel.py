@@ -0,0 +1,103 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+
+import mock
+from nose.tools import eq_
+
+from ryu.lib import hub
+from ryu.lib import timer_wheel
+
+
+class Test_TimerWheel(unittest.TestCase):
+    """ Test case for ryu.lib.timer_wheel.TimerWheel
+    """
+
+    def setUp(self):
+        self.wheel = timer_wheel.TimerWheel(tick=1, num_slots=4)
+        self.fired = []
+        # advance the wheel by hand
+        self.spawn = mock.patch.object(timer_wheel.hub, 'spawn')
+        self.spawn.start()
+        # the wheel is running and the timers are added in the middle of
+        # a tick
+        self.wheel._thread = mock.sentinel.thread
+
+    def tearDown(self):
+        self.spawn.stop()
+
+    def _advance(self, ticks):
+        for _i in range(ticks):
+            self.wheel.advance()
+
+    def test_expire(self):
+        for timeout in (1, 2.5, 4, 5, 9):
+            self.wheel.add(timeout, self.fired.append, timeout)
+        eq_(len(self.wheel), 5)
+        # never early
+        self._advance(1)
+        eq_(self.fired, [])
+        self._advance(1)
+        eq_(self.fired, [1])
+        self._advance(2)
+        eq_(self.fired, [1, 2.5])
+        self._advance(1)
+        eq_(self.fired, [1, 2.5, 4])
+        self._advance(1)
+        eq_(self.fired, [1, 2.5, 4, 5])
+        self._advance(3)
+        eq_(self.fired, [1, 2.5, 4, 5])
+        self._advance(1)
+        eq_(self.fired, [1, 2.5, 4, 5, 9])
+        eq_(len(self.wheel), 0)
+
+    def test_cancel(self):
+        timer = self.wheel.add(2, self.fired.append, 2)
+        self.wheel.add(2, self.fired.append, 3)
+        timer.cancel()
+        self._advance(3)
+        eq_(self.fired, [3])
+        # no-op
+        timer.cancel()
+
+    def test_callback_error(self):
+        self.wheel.add(1, lambda: 1 / 0)
+        self.wheel.add(1, self.fired.append, 1)
+        self._advance(2)
+        eq_(self.fired, [1])
+
+    def test_start(self):
+        # the first tick of a stopped wheel starts now
+        self.wheel._thread = None
+        self.wheel.add(1, self.fired.append, 1)
+        self._advance(1)
+        eq_(self.fired, [1])
+
+
+class Test_TimerWheel_thread(unittest.TestCase):
+    """ Test case for the thread of ryu.lib.timer_wheel.TimerWheel
+    """
+
+    def test_run(self):
+        wheel = timer_wheel.TimerWheel(tick=0.01)
+        ev = hub.Event()
+        wheel.add(0.05, ev.set)
+        eq_(ev.wait(timeout=5), True)
+        hub.sleep(0.05)
+        # the thread exits when there are no timers
+        eq_(wheel._thread, None)
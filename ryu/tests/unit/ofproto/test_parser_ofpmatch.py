@@ -23,6 +23,7 @@ from ryu.ofproto import ofproto_v1_2
 from ryu.ofproto import ofproto_v1_3
 from ryu.ofproto import ofproto_v1_2_parser
 from ryu.ofproto import ofproto_v1_3_parser
+from ryu.ofproto import ofproto_v1_4_parser
 
 
 class Test_Parser_OFPMatch(unittest.TestCase):
@@ -239,3 +240,51 @@ def _add_tests():
                         setattr(cls, method_name, im)
 
 _add_tests()
+
+
+class Test_Parser_OFPMatch_lazy(unittest.TestCase):
+    """ Test case for the lazy decoding of OFPMatch.parser
+    """
+
+    def _parse(self, ofpp):
+        match = ofpp.OFPMatch(in_port=1, eth_type=0x800,
+                              ipv4_src=('10.0.0.0', '255.0.0.0'))
+        b = bytearray()
+        match.serialize(b, 0)
+        return match.parser(buffer(b), 0)
+
+    def _test_lazy(self, ofpp):
+        match = self._parse(ofpp)
+        ok_('_fields2' not in match.__dict__)
+        ok_('fields' not in match.__dict__)
+
+        eq_(match['in_port'], 1)
+        eq_(match['ipv4_src'], ('10.0.0.0', '255.0.0.0'))
+        ok_('_fields2' in match.__dict__)
+        ok_('fields' not in match.__dict__)
+
+        # to_jsondict doesn't need the old api view
+        match.to_jsondict()
+        ok_('fields' not in match.__dict__)
+
+    def _test_old_api(self, ofpp, ofp):
+        match = self._parse(ofpp)
+        eq_([f.header for f in match.fields],
+            [ofp.OXM_OF_IN_PORT, ofp.OXM_OF_ETH_TYPE, ofp.OXM_OF_IPV4_SRC_W])
+        ok_('_fields2' not in match.__dict__)
+        eq_(match.get('eth_type'), 0x800)
+
+    def test_lazy_v12(self):
+        self._test_lazy(ofproto_v1_2_parser)
+
+    def test_lazy_v13(self):
+        self._test_lazy(ofproto_v1_3_parser)
+
+    def test_lazy_v14(self):
+        self._test_lazy(ofproto_v1_4_parser)
+
+    def test_old_api_v12(self):
+        self._test_old_api(ofproto_v1_2_parser, ofproto_v1_2)
+
+    def test_old_api_v13(self):
+        self._test_old_api(ofproto_v1_3_parser, ofproto_v1_3)
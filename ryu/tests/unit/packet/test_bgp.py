@@ -188,6 +188,22 @@ class Test_bgp(unittest.TestCase):
                 results.append(m)
         eq_(str(results), str(msgs))
 
+    def test_stream_parser_chunks(self):
+        msgs = [
+            bgp.BGPNotification(error_code=1, error_subcode=2, data="foo"),
+            bgp.BGPKeepAlive(),
+            bgp.BGPRouteRefresh(afi=afi.IP, safi=safi.MPLS_VPN),
+        ] * 10
+        binmsgs = ''.join([bytes(msg.serialize()) for msg in msgs])
+        for chunk_size in (5, 19, 64, len(binmsgs)):
+            sp = bgp.StreamParser()
+            results = []
+            for i in range(0, len(binmsgs), chunk_size):
+                results.extend(sp.parse(binmsgs[i:i + chunk_size]))
+            eq_(str(results), str(msgs))
+            # the data of a message is a copy
+            eq_(type(results[0].data), str)
+
     def test_parser(self):
         files = [
             'bgp4-open',
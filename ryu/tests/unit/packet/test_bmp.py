@@ -129,3 +129,19 @@ class Test_bmp(unittest.TestCase):
         msg2, rest = bmp.BMPMessage.parser(binmsg)
         eq_(msg.to_jsondict(lambda v: v), msg2.to_jsondict(lambda v: v))
         eq_(rest, '')
+
+    def test_stream_parser(self):
+        msgs = [
+            bmp.BMPInitiation(info=[{'type': bmp.BMP_INIT_TYPE_STRING,
+                                     'value': u'foo'}]),
+            bmp.BMPTermination(info=[{'type': bmp.BMP_TERM_TYPE_REASON,
+                                      'value': bmp.BMP_TERM_REASON_ADMIN}]),
+        ]
+        binmsgs = ''.join([bytes(msg.serialize()) for msg in msgs]) * 3
+        for chunk_size in (1, 7, len(binmsgs)):
+            sp = bmp.StreamParser()
+            results = []
+            for i in range(0, len(binmsgs), chunk_size):
+                results.extend(sp.parse(binmsgs[i:i + chunk_size]))
+            eq_([m.to_jsondict(lambda v: v) for m in results],
+                [m.to_jsondict(lambda v: v) for m in msgs * 3])
@@ -1526,3 +1526,68 @@ class TestPacket(unittest.TestCase):
         ok_(isinstance(pkt.protocols[0], ethernet.ethernet))
         ok_(isinstance(pkt.protocols[1], ipv4.ipv4))
         ok_(isinstance(pkt.protocols[2], udp.udp))
+
+
+class TestPacketLazy(unittest.TestCase):
+    """ Test case for packet with lazy decoding
+    """
+
+    payload = 'payload'
+
+    def setUp(self):
+        p = packet.Packet()
+        p.add_protocol(ethernet.ethernet(ethertype=ether.ETH_TYPE_IP))
+        p.add_protocol(ipv4.ipv4(proto=inet.IPPROTO_TCP))
+        p.add_protocol(tcp.tcp(src_port=1, dst_port=2))
+        p.add_protocol(self.payload)
+        p.serialize()
+        self.data = p.data
+
+    def tearDown(self):
+        pass
+
+    def test_get_protocol(self):
+        p = packet.Packet(self.data, lazy=True)
+        eq_(p._protocols, [])
+        eth = p.get_protocol(ethernet.ethernet)
+        eq_(eth.ethertype, ether.ETH_TYPE_IP)
+        eq_(p._protocols, [eth])
+        t = p.get_protocol(tcp.tcp)
+        eq_(t.dst_port, 2)
+        eq_(len(p._protocols), 4)
+        eq_(p.get_protocol(udp.udp), None)
+
+    def test_iter(self):
+        p = packet.Packet(self.data, lazy=True)
+        it = iter(p)
+        ok_(isinstance(next(it), ethernet.ethernet))
+        eq_(len(p._protocols), 1)
+        eq_([type(proto) for proto in it],
+            [ipv4.ipv4, tcp.tcp, bytearray])
+
+    def test_getitem(self):
+        p = packet.Packet(self.data, lazy=True)
+        ok_(isinstance(p[1], ipv4.ipv4))
+        eq_(len(p._protocols), 2)
+        eq_(p[-1], self.payload)
+        eq_(len(p._protocols), 4)
+
+    def test_same_as_eager(self):
+        lazy = packet.Packet(self.data, lazy=True)
+        eager = packet.Packet(self.data)
+        eq_(str(lazy), str(eager))
+        eq_(len(lazy), len(eager))
+        ok_(tcp.tcp in lazy)
+
+    def test_truncated(self):
+        data = self.data[:20]
+        lazy = packet.Packet(data, lazy=True)
+        eq_(lazy.get_protocol(ipv4.ipv4), None)
+        eq_(str(lazy), str(packet.Packet(data)))
+
+    def test_set_protocols(self):
+        p = packet.Packet(self.data, lazy=True)
+        p.get_protocol(ethernet.ethernet)
+        p.protocols = []
+        p.add_protocol(ethernet.ethernet())
+        eq_(len(p), 1)
@@ -0,0 +1,185 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import struct
+import unittest
+
+from nose.tools import eq_, raises
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import bfd
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import icmp
+from ryu.lib.packet import icmpv6
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import lldp
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+from ryu.lib.packet.packet_template import PacketTemplate
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+
+def _serialize(protocols):
+    pkt = packet.Packet()
+    for p in protocols:
+        pkt.add_protocol(p)
+    pkt.serialize()
+    return pkt.data
+
+
+class Test_PacketTemplate(unittest.TestCase):
+    """ Test case for ryu.lib.packet.packet_template
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _arp(self, src_mac='00:00:00:00:00:01', dst_ip='10.0.0.2'):
+        return [ethernet.ethernet('ff:ff:ff:ff:ff:ff', src_mac,
+                                  ether.ETH_TYPE_8021Q),
+                vlan.vlan(vid=10, ethertype=ether.ETH_TYPE_ARP),
+                arp.arp_ip(arp.ARP_REQUEST, src_mac, '10.0.0.1',
+                           '00:00:00:00:00:00', dst_ip)]
+
+    def test_arp(self):
+        tmpl = PacketTemplate(
+            self._arp(),
+            src_mac=[(ethernet.ethernet, 'src'), (arp.arp, 'src_mac')],
+            dst_ip=(arp.arp, 'dst_ip'))
+        eq_(tmpl.data, _serialize(self._arp()))
+        eq_(tmpl.build(), tmpl.data)
+        eq_(tmpl.build(dst_ip='192.168.0.1'),
+            _serialize(self._arp(dst_ip='192.168.0.1')))
+        eq_(tmpl.build(src_mac='aa:bb:cc:dd:ee:ff', dst_ip='192.168.0.1'),
+            _serialize(self._arp('aa:bb:cc:dd:ee:ff', '192.168.0.1')))
+
+    def _bfd(self, src='10.0.0.1', ident=0, ttl=255, my_discr=1):
+        return [ethernet.ethernet(),
+                ipv4.ipv4(proto=inet.IPPROTO_UDP, src=src, tos=192,
+                          identification=ident, ttl=ttl),
+                udp.udp(src_port=49152, dst_port=3784),
+                bfd.bfd(ver=1, state=bfd.BFD_STATE_UP, detect_mult=3,
+                        my_discr=my_discr, your_discr=2)]
+
+    def test_ipv4_udp(self):
+        # the IPv4 header and UDP checksums are updated
+        tmpl = PacketTemplate(self._bfd(), src=(ipv4.ipv4, 'src'),
+                              ident=(ipv4.ipv4, 'identification'),
+                              ttl=(ipv4.ipv4, 'ttl'),
+                              my_discr=(bfd.bfd, 'my_discr'))
+        for values in ({'src': '172.16.255.254'},
+                       {'ident': 0xffff, 'ttl': 1},
+                       {'my_discr': 0xdeadbeef},
+                       {'src': '192.0.2.1', 'ident': 7, 'ttl': 64,
+                        'my_discr': 3}):
+            eq_(tmpl.build(**values), _serialize(self._bfd(**values)))
+
+    def _tcp(self, dst='10.0.0.2', seq=0):
+        return [ethernet.ethernet(),
+                ipv4.ipv4(proto=inet.IPPROTO_TCP, dst=dst),
+                tcp.tcp(src_port=1, dst_port=2, seq=seq),
+                'payload']
+
+    def test_ipv4_tcp(self):
+        tmpl = PacketTemplate(self._tcp(), dst=(ipv4.ipv4, 'dst'),
+                              seq=(tcp.tcp, 'seq'))
+        eq_(tmpl.build(dst='10.1.2.3', seq=0x12345678),
+            _serialize(self._tcp('10.1.2.3', 0x12345678)))
+
+    def _icmp(self, id_=0, seq=0):
+        return [ethernet.ethernet(),
+                ipv4.ipv4(proto=inet.IPPROTO_ICMP),
+                icmp.icmp(data=icmp.echo(id_, seq, 'x' * 7))]
+
+    def test_icmp(self):
+        tmpl = PacketTemplate(self._icmp(), id=(icmp.icmp, 'id'),
+                              seq=(icmp.icmp, 'seq'))
+        eq_(tmpl.build(id=3, seq=0xfffe), _serialize(self._icmp(3, 0xfffe)))
+
+    def _ipv6(self, src='2001:db8::1'):
+        return [ethernet.ethernet(ethertype=ether.ETH_TYPE_IPV6),
+                ipv6.ipv6(nxt=inet.IPPROTO_ICMPV6, src=src),
+                icmpv6.icmpv6(icmpv6.ICMPV6_ECHO_REQUEST,
+                              data=icmpv6.echo(1, 1, 'abc'))]
+
+    def test_ipv6(self):
+        tmpl = PacketTemplate(self._ipv6(), src=(ipv6.ipv6, 'src'))
+        eq_(tmpl.build(src='fe80::1234:5678'),
+            _serialize(self._ipv6('fe80::1234:5678')))
+
+    def _lldp(self, chassis_id='dpid:0000000000000001', port_no=1, ttl=120):
+        return [ethernet.ethernet(lldp.LLDP_MAC_NEAREST_BRIDGE,
+                                  '00:00:00:00:00:01', ether.ETH_TYPE_LLDP),
+                lldp.lldp((lldp.ChassisID(
+                    subtype=lldp.ChassisID.SUB_LOCALLY_ASSIGNED,
+                    chassis_id=chassis_id),
+                    lldp.PortID(subtype=lldp.PortID.SUB_PORT_COMPONENT,
+                                port_id=struct.pack('!I', port_no)),
+                    lldp.TTL(ttl=ttl),
+                    lldp.End()))]
+
+    def test_lldp(self):
+        tmpl = PacketTemplate(self._lldp(),
+                              chassis_id=(lldp.lldp, 'chassis_id'),
+                              port_id=(lldp.lldp, 'port_id'),
+                              ttl=(lldp.lldp, 'ttl'))
+        eq_(tmpl.build(chassis_id='dpid:00000000000000ff',
+                       port_id=struct.pack('!I', 0xfffffff0), ttl=0),
+            _serialize(self._lldp('dpid:00000000000000ff', 0xfffffff0, 0)))
+
+    def test_instance(self):
+        # the second one of the same class, IP in IP
+        inner = ipv4.ipv4(proto=inet.IPPROTO_UDP)
+        tmpl = PacketTemplate(
+            [ethernet.ethernet(), ipv4.ipv4(proto=4), inner,
+             udp.udp(src_port=1, dst_port=2)],
+            dst=(inner, 'dst'))
+        expected = _serialize(
+            [ethernet.ethernet(), ipv4.ipv4(proto=4),
+             ipv4.ipv4(proto=inet.IPPROTO_UDP, dst='10.9.9.9'),
+             udp.udp(src_port=1, dst_port=2)])
+        eq_(tmpl.build(dst='10.9.9.9'), expected)
+
+    def test_packet(self):
+        pkt = packet.Packet()
+        for p in self._arp():
+            pkt.add_protocol(p)
+        eq_(PacketTemplate(pkt).data, _serialize(self._arp()))
+
+    @raises(ValueError)
+    def test_unknown_attr(self):
+        PacketTemplate(self._arp(), vid=(vlan.vlan, 'vid'))
+
+    @raises(ValueError)
+    def test_not_in_template(self):
+        PacketTemplate(self._arp(), src=(ipv4.ipv4, 'src'))
+
+    @raises(ValueError)
+    def test_unknown_field(self):
+        PacketTemplate(self._arp()).build(dst_ip='10.0.0.1')
+
+    @raises(ValueError)
+    def test_length(self):
+        PacketTemplate(self._lldp(), port_id=(lldp.lldp, 'port_id')).build(
+            port_id='\x00')
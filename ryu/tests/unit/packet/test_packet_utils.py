@@ -0,0 +1,152 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import random
+import struct
+import unittest
+
+import mock
+from nose.tools import eq_
+from nose.plugins.skip import SkipTest
+
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet_utils
+
+
+def _reference_checksum(data):
+    # straightforward RFC 1071
+    data = bytearray(data)
+    if len(data) % 2:
+        data.append(0)
+    s = 0
+    for i in range(0, len(data), 2):
+        s += data[i] << 8 | data[i + 1]
+    while s >> 16:
+        s = (s & 0xffff) + (s >> 16)
+    return ~s & 0xffff
+
+
+class _FakeNumpy(object):
+    # the part of numpy used by packet_utils, to run its numpy path
+    # where numpy is not installed
+    uint64 = 'uint64'
+
+    class _Array(list):
+        def sum(self, dtype=None):
+            return sum(self)
+
+    @classmethod
+    def frombuffer(cls, data, dtype, count):
+        eq_(dtype, '>u2')
+        return cls._Array(struct.unpack_from('!%dH' % count, data))
+
+
+class Test_checksum(unittest.TestCase):
+    """ Test case for packet_utils.checksum
+    """
+
+    def setUp(self):
+        self.numpy = packet_utils.numpy
+        self.rand = random.Random(0)
+
+    def tearDown(self):
+        packet_utils.numpy = self.numpy
+
+    def _data(self, length):
+        return ''.join(chr(self.rand.randint(0, 255)) for _ in range(length))
+
+    def _test_lengths(self):
+        for length in (0, 1, 2, 3, 20, 21, 64, 1023, 1024, 1500, 9001):
+            data = self._data(length)
+            expected = _reference_checksum(data)
+            eq_(packet_utils.checksum(data), expected)
+            eq_(packet_utils.checksum(bytearray(data)), expected)
+            eq_(packet_utils.checksum(memoryview(data)), expected)
+
+    def test_checksum(self):
+        packet_utils.numpy = None
+        self._test_lengths()
+
+    def test_checksum_numpy(self):
+        if packet_utils.numpy is None:
+            raise SkipTest('numpy is not available')
+        self._test_lengths()
+
+    def test_checksum_numpy_path(self):
+        # odd and even lengths of the numpy path against the reference
+        packet_utils.numpy = _FakeNumpy()
+        with mock.patch.object(packet_utils, '_checksum_numpy',
+                               wraps=packet_utils._checksum_numpy) as m:
+            self._test_lengths()
+        # 1024, 1500 and 9001 bytes, as str, bytearray and memoryview
+        eq_(m.call_count, 9)
+
+    def test_zero(self):
+        eq_(packet_utils.checksum('\x00' * 4), 0xffff)
+        eq_(packet_utils.checksum('\xff\xff'), 0)
+
+    def test_odd_bytearray_not_padded(self):
+        data = bytearray('abc')
+        packet_utils.checksum(data)
+        eq_(data, bytearray('abc'))
+
+
+class Test_checksum_update(unittest.TestCase):
+    """ Test case for packet_utils.checksum_update
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _hdr(self, ttl, src):
+        ip = ipv4.ipv4(ttl=ttl, proto=6, src=src, dst='192.0.2.2',
+                       total_length=40)
+        return str(ip.serialize('', None))
+
+    def test_ttl(self):
+        old = self._hdr(64, '192.0.2.1')
+        new = self._hdr(63, '192.0.2.1')
+        (csum, ) = struct.unpack_from('!H', old, 10)
+        (expected, ) = struct.unpack_from('!H', new, 10)
+        # TTL and protocol share a 16-bit word
+        eq_(packet_utils.checksum_update(csum, old[8:10], new[8:10]),
+            expected)
+
+    def test_address(self):
+        old = self._hdr(64, '192.0.2.1')
+        new = self._hdr(64, '10.255.255.255')
+        (csum, ) = struct.unpack_from('!H', old, 10)
+        (expected, ) = struct.unpack_from('!H', new, 10)
+        eq_(packet_utils.checksum_update(csum, old[12:16],
+                                         bytearray(new[12:16])),
+            expected)
+
+    def test_random(self):
+        rand = random.Random(0)
+        for _i in range(100):
+            data = bytearray(rand.randint(0, 255) for _ in range(40))
+            csum = _reference_checksum(data)
+            offset = rand.randrange(0, 40, 2)
+            old = data[offset:offset + 2]
+            data[offset:offset + 2] = struct.pack('!H',
+                                                  rand.randint(0, 0xffff))
+            new = data[offset:offset + 2]
+            eq_(packet_utils.checksum_update(csum, old, new),
+                _reference_checksum(data))
@@ -0,0 +1,159 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+import unittest
+
+from nose.tools import eq_
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+
+ETH_DST = '00:11:22:33:44:55'
+ETH_SRC = 'aa:bb:cc:dd:ee:ff'
+PAYLOAD = 'payload'
+
+
+class Test_parse_fast(unittest.TestCase):
+    """ Test case for ryu.lib.packet.packet.parse_fast
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _build(self, *protocols):
+        pkt = packet.Packet()
+        for proto in protocols:
+            pkt.add_protocol(proto)
+        pkt.add_protocol(PAYLOAD)
+        pkt.serialize()
+        return str(pkt.data)
+
+    def _ipv4_tcp(self):
+        return self._build(
+            ethernet.ethernet(ETH_DST, ETH_SRC, ether.ETH_TYPE_IP),
+            ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                      proto=inet.IPPROTO_TCP),
+            tcp.tcp(src_port=1234, dst_port=80))
+
+    def test_ipv4_tcp(self):
+        data = self._ipv4_tcp()
+        eq_(packet.parse_fast(data),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IP, None,
+             inet.IPPROTO_TCP, '10.0.0.1', '10.0.0.2', 1234, 80,
+             len(data) - len(PAYLOAD)))
+
+    def test_bytearray(self):
+        data = self._ipv4_tcp()
+        eq_(packet.parse_fast(bytearray(data)), packet.parse_fast(data))
+
+    def test_upto(self):
+        data = self._ipv4_tcp()
+        eq_(packet.parse_fast(data, upto=ethernet.ethernet),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IP, None,
+             None, None, None, None, None, 14))
+        eq_(packet.parse_fast(data, upto=ipv4.ipv4),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IP, None,
+             inet.IPPROTO_TCP, '10.0.0.1', '10.0.0.2', None, None, 34))
+
+    def _vlan_udp(self):
+        return self._build(
+            ethernet.ethernet(ETH_DST, ETH_SRC, ether.ETH_TYPE_8021AD),
+            vlan.svlan(vid=100, ethertype=ether.ETH_TYPE_8021Q),
+            vlan.vlan(vid=200, ethertype=ether.ETH_TYPE_IP),
+            ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                      proto=inet.IPPROTO_UDP),
+            udp.udp(src_port=68, dst_port=67))
+
+    def test_vlan_udp(self):
+        data = self._vlan_udp()
+        eq_(packet.parse_fast(data),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IP, 100,
+             inet.IPPROTO_UDP, '10.0.0.1', '10.0.0.2', 68, 67,
+             len(data) - len(PAYLOAD)))
+
+    def test_vlan_upto(self):
+        data = self._vlan_udp()
+        # the TPID of the outermost tag
+        eq_(packet.parse_fast(data, upto=ethernet.ethernet),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_8021AD, None,
+             None, None, None, None, None, 14))
+        eq_(packet.parse_fast(data, upto=vlan.vlan),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IP, 100,
+             None, None, None, None, None, 22))
+
+    def test_ipv6_tcp(self):
+        data = self._build(
+            ethernet.ethernet(ETH_DST, ETH_SRC, ether.ETH_TYPE_IPV6),
+            ipv6.ipv6(src='2001:db8::1', dst='fe80::1',
+                      nxt=inet.IPPROTO_TCP),
+            tcp.tcp(src_port=1234, dst_port=80))
+        eq_(packet.parse_fast(data),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IPV6, None,
+             inet.IPPROTO_TCP, '2001:db8::1', 'fe80::1', 1234, 80,
+             len(data) - len(PAYLOAD)))
+
+    def test_arp(self):
+        data = self._build(
+            ethernet.ethernet(ETH_DST, ETH_SRC, ether.ETH_TYPE_ARP),
+            arp.arp())
+        eq_(packet.parse_fast(data),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_ARP, None,
+             None, None, None, None, None, 14))
+
+    def test_fragment(self):
+        data = self._build(
+            ethernet.ethernet(ETH_DST, ETH_SRC, ether.ETH_TYPE_IP),
+            ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2', offset=100,
+                      proto=inet.IPPROTO_UDP))
+        eq_(packet.parse_fast(data),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IP, None,
+             inet.IPPROTO_UDP, '10.0.0.1', '10.0.0.2', None, None, 34))
+
+    def test_truncated(self):
+        data = self._ipv4_tcp()
+        eq_(packet.parse_fast(data[:40]),
+            (ETH_DST, ETH_SRC, ether.ETH_TYPE_IP, None,
+             inet.IPPROTO_TCP, '10.0.0.1', '10.0.0.2', None, None, 34))
+        eq_(packet.parse_fast(data[:10]),
+            (None, None, None, None, None, None, None, None, None, 0))
+
+    def test_same_as_packet(self):
+        data = self._ipv4_tcp()
+        headers = packet.parse_fast(data)
+        pkt = packet.Packet(data)
+        eth = pkt.get_protocol(ethernet.ethernet)
+        ip = pkt.get_protocol(ipv4.ipv4)
+        l4 = pkt.get_protocol(tcp.tcp)
+        eq_((headers.eth_dst, headers.eth_src, headers.eth_type),
+            (eth.dst, eth.src, eth.ethertype))
+        eq_((headers.ip_proto, headers.ip_src, headers.ip_dst),
+            (ip.proto, ip.src, ip.dst))
+        eq_((headers.src_port, headers.dst_port),
+            (l4.src_port, l4.dst_port))
+        eq_(data[headers.offset:], pkt.protocols[-1])
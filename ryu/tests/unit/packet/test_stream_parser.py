@@ -0,0 +1,75 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from nose.tools import eq_, ok_
+
+from ryu.lib.packet import stream_parser
+
+
+class _LineParser(stream_parser.StreamParser):
+    # a message is a line
+    def try_parse(self, data):
+        for i in range(len(data)):
+            if data[i] == '\n':
+                return data[:i].tobytes(), data[i + 1:]
+        raise self.TooSmallException()
+
+
+class _ViewParser(_LineParser):
+    # returns messages which refer to the buffer
+    def try_parse(self, data):
+        if len(data) < 2:
+            raise self.TooSmallException()
+        return data[:2], data[2:]
+
+
+class Test_StreamParser(unittest.TestCase):
+    """ Test case for ryu.lib.packet.stream_parser
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_parse(self):
+        sp = _LineParser()
+        eq_(sp.parse('foo\nba'), ['foo'])
+        eq_(sp.parse('r'), [])
+        eq_(sp.parse('\nbaz\n\n'), ['bar', 'baz', ''])
+        eq_(sp.parse(''), [])
+        eq_(sp.parse('qux'), [])
+        eq_(sp.parse('\n'), ['qux'])
+
+    def test_compact(self):
+        sp = _LineParser()
+        sp._COMPACT_SIZE = 16
+        data = ('x' * 9 + '\n') * 100
+        msgs = []
+        for i in range(0, len(data), 7):
+            msgs.extend(sp.parse(data[i:i + 7]))
+            # the consumed bytes do not pile up
+            ok_(len(sp._q) < 16 + 7 + 10)
+        eq_(msgs, ['x' * 9] * 100)
+
+    def test_buffer_referred(self):
+        sp = _ViewParser()
+        msgs = sp.parse('abc')
+        msgs += sp.parse('defg')
+        eq_([m.tobytes() for m in msgs], ['ab', 'cd', 'ef'])
+        msgs += sp.parse('h')
+        eq_([m.tobytes() for m in msgs], ['ab', 'cd', 'ef', 'gh'])
@@ -0,0 +1,192 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+from nose.tools import eq_, ok_
+
+import mock
+
+from ryu.topology import event
+from ryu.topology import graph
+
+
+def _add(g, u, v):
+    # a link in both directions with port numbers from the dpids
+    g.add_link(u, v, v, u)
+    g.add_link(v, u, u, v)
+
+
+def _remove(g, u, v):
+    g.remove_link(u, v, v, u)
+    g.remove_link(v, u, u, v)
+
+
+class Test_Graph(unittest.TestCase):
+    """ Test case for graph.Graph
+    """
+
+    def setUp(self):
+        # 1 - 2 - 4 - 5
+        #  \- 3 -/
+        self.g = graph.Graph()
+        for u, v in ((1, 2), (1, 3), (2, 4), (3, 4), (4, 5)):
+            _add(self.g, u, v)
+
+    def tearDown(self):
+        pass
+
+    def test_shortest_path(self):
+        eq_(self.g.shortest_path(1, 5), [1, 2, 4, 5])
+        eq_(self.g.shortest_path(1, 1), [1])
+        eq_(self.g.shortest_path_lengths(1), {1: 0, 2: 1, 3: 1, 4: 2, 5: 3})
+        self.g.add_node(6)
+        eq_(self.g.shortest_path(1, 6), None)
+        eq_(self.g.shortest_path(7, 1), None)
+
+    def test_ecmp(self):
+        eq_(self.g.ecmp_paths(1, 5), [[1, 2, 4, 5], [1, 3, 4, 5]])
+        eq_(self.g.ecmp_paths(1, 5, limit=1), [[1, 2, 4, 5]])
+        eq_(self.g.next_hops(1, 5), [2, 3])
+        eq_(self.g.next_hops(5, 1), [4])
+        eq_(self.g.next_hops(1, 1), [])
+
+    def test_k_shortest_paths(self):
+        _add(self.g, 3, 5)
+        eq_(self.g.k_shortest_paths(1, 5, 3),
+            [[1, 3, 5], [1, 2, 4, 5], [1, 3, 4, 5]])
+        eq_(len(self.g.k_shortest_paths(1, 5, 10)), 4)
+        eq_(self.g.k_shortest_paths(1, 6, 3), [])
+
+    def test_get_ports(self):
+        self.g.add_link(1, 10, 2, 20)
+        eq_(self.g.get_ports(1, 2), [(2, 1), (10, 20)])
+        self.g.remove_link(1, 2, 2, 1)
+        eq_(self.g.get_ports(1, 2), [(10, 20)])
+        # a parallel link is left
+        eq_(self.g.shortest_path(1, 4), [1, 2, 4])
+
+    def test_incremental(self):
+        eq_(self.g.shortest_path(1, 5), [1, 2, 4, 5])
+        tree = self.g._trees[1]
+
+        # another shortest path to 4 keeps the cache
+        _remove(self.g, 2, 4)
+        ok_(self.g._trees[1] is tree)
+        eq_(self.g.shortest_path(1, 5), [1, 3, 4, 5])
+        _add(self.g, 2, 4)
+        ok_(self.g._trees[1] is tree)
+        eq_(self.g.ecmp_paths(1, 5), [[1, 3, 4, 5], [1, 2, 4, 5]])
+
+        # a shortcut invalidates it
+        _add(self.g, 1, 5)
+        ok_(1 not in self.g._trees)
+        eq_(self.g.shortest_path(1, 5), [1, 5])
+
+        # so does the only shortest path going down
+        _remove(self.g, 1, 5)
+        eq_(len(self.g.shortest_path(1, 5)), 4)
+        _remove(self.g, 4, 5)
+        eq_(self.g.shortest_path(1, 5), None)
+
+    def test_k_shortest_paths_cache(self):
+        eq_(self.g.k_shortest_paths(1, 5, 2), [[1, 2, 4, 5], [1, 3, 4, 5]])
+        self.g.k_shortest_paths(2, 3, 1)
+        _remove(self.g, 3, 4)
+        ok_((1, 5, 2) not in self.g._k_paths)
+        ok_((2, 3, 1) in self.g._k_paths)
+        eq_(self.g.k_shortest_paths(1, 5, 2), [[1, 2, 4, 5]])
+
+    def test_remove_node(self):
+        self.g.shortest_path(1, 5)
+        self.g.shortest_path(4, 1)
+        self.g.remove_node(4)
+        ok_(4 not in self.g.adj)
+        eq_(self.g.shortest_path(1, 5), None)
+        eq_(self.g.shortest_path(4, 1), None)
+        eq_(self.g.shortest_path(2, 3), [2, 1, 3])
+
+    def test_random(self):
+        # the cached paths are the same as those of a new graph
+        self.g = graph.Graph()
+        rand = random.Random(0)
+        edges = set()
+        for i in range(300):
+            u, v = rand.sample(range(12), 2)
+            if (u, v) in edges:
+                self.g.remove_link(u, 0, v, 0)
+                edges.discard((u, v))
+            else:
+                self.g.add_link(u, 0, v, 0)
+                edges.add((u, v))
+            fresh = graph.Graph()
+            for a, b in self.g.adj.items():
+                fresh.add_node(a)
+                for c, ports in b.items():
+                    for p in ports:
+                        fresh.add_link(a, p[0], c, p[1])
+            src, dst = rand.sample(range(12), 2)
+            eq_(self.g.shortest_path_lengths(src),
+                fresh.shortest_path_lengths(src))
+            eq_(sorted(self.g.ecmp_paths(src, dst)),
+                sorted(fresh.ecmp_paths(src, dst)))
+            eq_(self.g.next_hops(src, dst), fresh.next_hops(src, dst))
+            # the order of paths of the same length may differ
+            paths = self.g.k_shortest_paths(src, dst, 3)
+            eq_([len(p) for p in paths],
+                [len(p) for p in fresh.k_shortest_paths(src, dst, 3)])
+            for path in paths:
+                for u, v in zip(path, path[1:]):
+                    ok_((u, v) in edges)
+
+
+class Test_TopologyGraph(unittest.TestCase):
+    """ Test case for graph.TopologyGraph
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def _link(self, src, dst):
+        return mock.Mock(src=mock.Mock(dpid=src, port_no=dst),
+                         dst=mock.Mock(dpid=dst, port_no=src))
+
+    def test_events(self):
+        app = graph.TopologyGraph()
+        for dpid in (1, 2, 3):
+            switch = mock.Mock()
+            switch.dp.id = dpid
+            app._switch_enter_handler(event.EventSwitchEnter(switch))
+        for src, dst in ((1, 2), (2, 3)):
+            app._link_add_handler(event.EventLinkAdd(self._link(src, dst)))
+        eq_(app.graph.shortest_path(1, 3), [1, 2, 3])
+
+        app.reply_to_request = mock.Mock()
+        req = event.EventPathRequest(1, 3, k=2)
+        req.src = 'requester'
+        app.path_request_handler(req)
+        rep = app.reply_to_request.call_args[0][1]
+        eq_(rep.dst, 'requester')
+        eq_(rep.paths, [[1, 2, 3]])
+
+        app._link_delete_handler(event.EventLinkDelete(self._link(2, 3)))
+        eq_(app.graph.shortest_path(1, 3), None)
+        switch = mock.Mock()
+        switch.dp.id = 2
+        app._switch_leave_handler(event.EventSwitchLeave(switch))
+        ok_(2 not in app.graph.adj)
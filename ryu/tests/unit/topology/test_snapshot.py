@@ -0,0 +1,145 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import unittest
+from nose.tools import eq_, ok_
+
+import mock
+
+from ryu.topology import snapshot
+
+
+def _switch(dpid, ports=()):
+    switch = mock.Mock()
+    switch.dp.id = dpid
+    switch.to_dict.return_value = {
+        'dpid': dpid, 'ports': [{'port_no': p} for p in ports]}
+    return switch
+
+
+def _port(dpid, port_no, name='eth'):
+    return mock.Mock(dpid=dpid, **{'to_dict.return_value': {
+        'port_no': port_no, 'name': name}})
+
+
+def _link(src, dst):
+    return mock.Mock(src=mock.Mock(dpid=src, port_no=dst),
+                     dst=mock.Mock(dpid=dst, port_no=src),
+                     **{'to_dict.return_value': {'src': src, 'dst': dst}})
+
+
+class Test_Snapshot(unittest.TestCase):
+    """ Test case for snapshot.Snapshot
+    """
+
+    def setUp(self):
+        self.s = snapshot.Snapshot(max_changes=8)
+        self.s.switch_enter(_switch(1, [1]))
+        self.s.switch_enter(_switch(2))
+        self.s.link_add(_link(1, 2))
+
+    def tearDown(self):
+        pass
+
+    def test_json(self):
+        eq_(self.s.version, 3)
+        eq_(json.loads(self.s.switches_json()),
+            [{'dpid': 1, 'ports': [{'port_no': 1}]},
+             {'dpid': 2, 'ports': []}])
+        eq_(json.loads(self.s.switches_json(2)), [{'dpid': 2, 'ports': []}])
+        eq_(json.loads(self.s.links_json(2)), [])
+
+        body = self.s.links_json()
+        eq_(json.loads(body), [{'src': 1, 'dst': 2}])
+        ok_(self.s.links_json() is body)
+        etag = self.s.etag()
+
+        # no change
+        self.s.link_add(_link(1, 2))
+        self.s.link_delete(_link(2, 1))
+        ok_(self.s.links_json() is body)
+        eq_(self.s.etag(), etag)
+
+        self.s.link_delete(_link(1, 2))
+        eq_(self.s.links_json(), '[]')
+        ok_(self.s.etag() != etag)
+
+    def test_ports(self):
+        self.s.port_add(_port(1, 2))
+        self.s.port_modify(_port(1, 1, name='up'))
+        self.s.port_delete(_port(1, 2))
+        self.s.port_add(_port(3, 1))
+        eq_(self.s.switches[1]['ports'], [{'port_no': 1, 'name': 'up'}])
+        eq_(self.s.changes(3),
+            [('switch_modify', {'dpid': 1,
+                                'ports': [{'port_no': 1, 'name': 'up'}]})])
+
+    def test_changes(self):
+        eq_(self.s.changes(3), [])
+        eq_(self.s.changes(0),
+            [('switch_enter', {'dpid': 1, 'ports': [{'port_no': 1}]}),
+             ('switch_enter', {'dpid': 2, 'ports': []}),
+             ('link_add', {'src': 1, 'dst': 2})])
+
+        # a link flap
+        for _i in range(2):
+            self.s.link_delete(_link(1, 2))
+            self.s.link_add(_link(1, 2))
+        self.s.link_add(_link(2, 1))
+        self.s.switch_leave(_switch(1))
+        eq_(self.s.changes(3),
+            [('link_add', {'src': 2, 'dst': 1}),
+             ('switch_leave', {'dpid': 1, 'ports': [{'port_no': 1}]})])
+        eq_(self.s.changes(8),
+            [('switch_leave', {'dpid': 1, 'ports': [{'port_no': 1}]})])
+
+        # not kept anymore
+        eq_(self.s.version, 9)
+        eq_(self.s.changes(0), None)
+        eq_(self.s.changes(10), None)
+        ok_(self.s.changes(1) is not None)
+
+    def test_changes_json(self):
+        body = self.s.changes_json(2)
+        eq_(json.loads(body),
+            {'version': self.s.etag(),
+             'changes': [{'event': 'link_add',
+                          'data': {'src': 1, 'dst': 2}}]})
+        ok_(self.s.changes_json(2) is body)
+        eq_(self.s.changes_json(4), None)
+
+    def test_version_of(self):
+        eq_(self.s.version_of(self.s.etag()), 3)
+        eq_(self.s.version_of('"%x-1"' % self.s.epoch), 1)
+        # before a restart
+        eq_(self.s.version_of('%x-1' % (self.s.epoch - 1)), None)
+        for etag in ('1', 'x-1', '%x-x' % self.s.epoch, '1-2-3'):
+            try:
+                self.s.version_of(etag)
+            except ValueError:
+                pass
+            else:
+                ok_(False, etag)
+
+    def test_listener(self):
+        func = mock.Mock()
+        self.s.register_listener(func)
+        self.s.link_add(_link(2, 1))
+        self.s.link_add(_link(2, 1))
+        eq_(func.call_count, 1)
+        self.s.unregister_listener(func)
+        self.s.link_delete(_link(2, 1))
+        eq_(func.call_count, 1)
@@ -0,0 +1,198 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from nose.tools import eq_, ok_
+
+import mock
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.topology import switches
+
+
+def _port(dpid, port_no, state=0):
+    ofpport = ofproto_v1_3_parser.OFPPort(
+        port_no, '02:00:00:00:00:01', 'eth%d' % port_no, 0, state,
+        0, 0, 0, 0, 0, 0)
+    return switches.Port(dpid, ofproto_v1_3, ofpport)
+
+
+class Test_PortDataState(unittest.TestCase):
+    """ Test case for switches.PortDataState
+    """
+
+    def setUp(self):
+        self.ports = switches.PortDataState(1.0)
+        self.p1 = _port(1, 1)
+        self.p2 = _port(1, 2)
+        self.p3 = _port(2, 1)
+        for p in (self.p1, self.p2, self.p3):
+            self.ports.add_port(p, 'lldp')
+
+    def tearDown(self):
+        pass
+
+    def test_pop_expired(self):
+        # new ports are due at once, in the order of addition
+        eq_(self.ports.next_deadline(), 0)
+        eq_(self.ports.pop_expired(100, 2), [self.p1, self.p2])
+        eq_(self.ports.pop_expired(100, 2), [self.p3])
+        eq_(self.ports.pop_expired(100, 2), [])
+        eq_(self.ports.next_deadline(), None)
+
+    @mock.patch('time.time')
+    def test_lldp_sent(self, time_):
+        self.ports.pop_expired(100, 10)
+        for i, p in enumerate((self.p3, self.p1, self.p2)):
+            time_.return_value = 100 + i
+            self.ports.lldp_sent(p)
+        eq_(self.ports.get_port(self.p3).timestamp, 100)
+        eq_(self.ports.next_deadline(), 101)
+        eq_(self.ports.pop_expired(101.5, 10), [self.p3])
+        eq_(self.ports.pop_expired(103, 10), [self.p1, self.p2])
+
+    @mock.patch('time.time')
+    def test_move_front(self, time_):
+        time_.return_value = 100
+        for p in self.ports.pop_expired(100, 10):
+            self.ports.lldp_sent(p)
+        self.ports.move_front(self.p2)
+        eq_(self.ports.get_port(self.p2).timestamp, None)
+        eq_(self.ports.next_deadline(), 0)
+        eq_(self.ports.pop_expired(100, 10), [self.p2])
+        eq_(self.ports.next_deadline(), 101)
+
+    def test_del_port(self):
+        self.ports.del_port(self.p1)
+        ok_(self.p1 not in self.ports)
+        eq_(self.ports.pop_expired(100, 10), [self.p2, self.p3])
+
+    def test_set_down(self):
+        self.ports.pop_expired(100, 10)
+        ok_(self.ports.set_down(_port(1, 1, ofproto_v1_3.OFPPS_LINK_DOWN)))
+        eq_(self.ports.next_deadline(), None)
+        ok_(not self.ports.set_down(self.p1))
+        eq_(self.ports.pop_expired(100, 10), [self.p1])
+
+    def test_compact(self):
+        for i in range(1000):
+            self.ports.move_front(self.p1)
+        ok_(len(self.ports._heap) <= 2 * 3 + 64 + 1)
+        eq_(self.ports.pop_expired(100, 10), [self.p2, self.p3, self.p1])
+
+
+class Test_LinkState(unittest.TestCase):
+    """ Test case for switches.LinkState
+    """
+
+    def setUp(self):
+        self.links = switches.LinkState()
+        self.p1 = _port(1, 1)
+        self.p2 = _port(2, 1)
+        self.p3 = _port(3, 1)
+
+    def tearDown(self):
+        pass
+
+    @mock.patch('time.time')
+    def test_update_link(self, time_):
+        time_.return_value = 100
+        ok_(not self.links.update_link(self.p1, self.p2))
+        ok_(self.links.update_link(self.p2, self.p1))
+        eq_(self.links.get_peer(self.p1), self.p2)
+        eq_(self.links[switches.Link(self.p1, self.p2)], 100)
+
+        # the peer has changed
+        time_.return_value = 101
+        ok_(not self.links.update_link(self.p1, self.p3))
+        ok_(switches.Link(self.p1, self.p2) not in self.links)
+        eq_(self.links.get_peer(self.p1), self.p3)
+        eq_(len(self.links), 2)
+
+    @mock.patch('time.time')
+    def test_expired(self, time_):
+        link12 = switches.Link(self.p1, self.p2)
+        link21 = switches.Link(self.p2, self.p1)
+        time_.return_value = 100
+        self.links.update_link(self.p1, self.p2)
+        self.links.update_link(self.p2, self.p1)
+        time_.return_value = 105
+        self.links.update_link(self.p1, self.p2)
+
+        eq_(self.links.expired(100), [])
+        eq_(self.links.expired(101), [link21])
+        # still there until link_down()
+        eq_(self.links.expired(101), [link21])
+        eq_(set(self.links.expired(106)), set([link12, link21]))
+
+        self.links.link_down(link21)
+        eq_(self.links.expired(106), [link12])
+        eq_(self.links.get_peer(self.p2), None)
+
+        # a timestamp set back is expired early
+        self.links.update_link(self.p2, self.p1)
+        eq_(self.links.expired(101), [])
+        self.links.rev_link_set_timestamp(link21, 90)
+        eq_(self.links.expired(101), [link21])
+
+    def test_port_deleted(self):
+        self.links.update_link(self.p1, self.p2)
+        self.links.update_link(self.p2, self.p1)
+        self.links.update_link(self.p3, self.p2)
+        eq_(set(self.links.port_deleted(self.p2)),
+            set([switches.Link(self.p2, self.p1),
+                 switches.Link(self.p1, self.p2),
+                 switches.Link(self.p3, self.p2)]))
+        eq_(len(self.links), 0)
+        eq_(self.links.get_peer(self.p1), None)
+        eq_(self.links.port_deleted(self.p2), [])
+        eq_(self.links.expired(float('inf')), [])
+
+
+class Test_Switches(unittest.TestCase):
+    """ Test case for switches.Switches
+    """
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_send_lldp_packets(self):
+        app = switches.Switches()
+        dps = {}
+        for dpid in (1, 2):
+            dps[dpid] = mock.Mock(id=dpid, ofproto=ofproto_v1_3,
+                                  ofproto_parser=ofproto_v1_3_parser)
+            app.dps[dpid] = dps[dpid]
+        ports = [_port(1, 1), _port(1, 2), _port(2, 1),
+                 _port(2, 2, ofproto_v1_3.OFPPS_LINK_DOWN), _port(3, 1)]
+        for port in ports:
+            app._port_added(port)
+        unknown = _port(1, 3)
+
+        eq_(app.send_lldp_packets(ports + [unknown]), 3)
+
+        # a write per datapath
+        eq_(dps[1].send_msgs.call_count, 1)
+        outs = dps[1].send_msgs.call_args[0][0]
+        eq_([out.actions[0].port for out in outs], [1, 2])
+        eq_(outs[0].data, app.ports.get_port(ports[0]).lldp_data)
+        eq_(dps[2].send_msgs.call_count, 1)
+        eq_(len(dps[2].send_msgs.call_args[0][0]), 1)
+        for port in ports:
+            eq_(app.ports.get_port(port).sent, 1)
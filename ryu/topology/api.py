@@ -35,4 +35,23 @@ def get_all_link(app):
     return get_link(app)
 
 
+def get_paths(app, src_dpid, dst_dpid, k=1):
+    """
+    Returns up to k shortest paths from src_dpid to dst_dpid.
+    A path is a list of dpids.
+    """
+    rep = app.send_request(event.EventPathRequest(src_dpid, dst_dpid, k=k))
+    return rep.paths
+
+
+def get_ecmp_paths(app, src_dpid, dst_dpid):
+    """
+    Returns all the shortest paths from src_dpid to dst_dpid.
+    """
+    rep = app.send_request(event.EventPathRequest(src_dpid, dst_dpid,
+                                                  ecmp=True))
+    return rep.paths
+
+
 app_manager.require_app('ryu.topology.switches', api_style=True)
+app_manager.require_app('ryu.topology.graph', api_style=True)
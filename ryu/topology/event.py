@@ -126,3 +126,29 @@ class EventLinkReply(event.EventReplyBase):
     def __str__(self):
         return 'EventLinkReply<dst=%s, dpid=%s, links=%s>' % \
             (self.dst, self.dpid, len(self.links))
+
+
+class EventPathRequest(event.EventRequestBase):
+    # If ecmp is True, reply all the shortest paths instead of
+    # the k shortest paths
+    def __init__(self, src_dpid, dst_dpid, k=1, ecmp=False):
+        super(EventPathRequest, self).__init__()
+        self.dst = 'topology_graph'
+        self.src_dpid = src_dpid
+        self.dst_dpid = dst_dpid
+        self.k = k
+        self.ecmp = ecmp
+
+    def __str__(self):
+        return 'EventPathRequest<src=%s, %s to %s, k=%s, ecmp=%s>' % \
+            (self.src, self.src_dpid, self.dst_dpid, self.k, self.ecmp)
+
+
+class EventPathReply(event.EventReplyBase):
+    def __init__(self, dst, paths):
+        super(EventPathReply, self).__init__(dst)
+        self.paths = paths
+
+    def __str__(self):
+        return 'EventPathReply<dst=%s, %s paths>' % \
+            (self.dst, len(self.paths))
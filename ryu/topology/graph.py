@@ -0,0 +1,328 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Topology graph with cached shortest paths.
+
+TopologyGraph keeps a Graph of the switches and links discovered by
+ryu.topology.switches and answers EventPathRequest.  Applications in
+the same process can also query the graph directly::
+
+    graph = app_manager.lookup_service_brick('topology_graph').graph
+    path = graph.shortest_path(src_dpid, dst_dpid)
+
+Paths are lists of dpids and their length is the number of hops.
+The shortest paths from a source are computed once and kept until a
+link change affects them.
+"""
+
+import heapq
+import logging
+
+from ryu.base import app_manager
+from ryu.controller.handler import set_ev_cls
+from ryu.topology import event
+
+
+LOG = logging.getLogger(__name__)
+
+
+class _ShortestPathTree(object):
+    # the shortest paths from a source, i.e. a DAG of all of them.
+    def __init__(self, dist, parents):
+        super(_ShortestPathTree, self).__init__()
+        self.dist = dist          # dpid -> hops from the source
+        self.parents = parents    # dpid -> list of the previous dpids
+
+
+class Graph(object):
+    """
+    Directed graph of datapaths connected by links.
+
+    Parallel links between two datapaths are a single edge.
+    """
+
+    def __init__(self):
+        super(Graph, self).__init__()
+        # dpid -> dpid -> set of (src_port_no, dst_port_no)
+        self.adj = {}
+        self._trees = {}            # src dpid -> _ShortestPathTree
+        self._k_paths = {}          # (src, dst, k) -> list of paths
+        self._k_paths_edges = {}    # (dpid, dpid) -> set of _k_paths keys
+
+    def add_node(self, dpid):
+        self.adj.setdefault(dpid, {})
+
+    def remove_node(self, dpid):
+        nbrs = self.adj.get(dpid)
+        if nbrs is None:
+            return
+        for nbr in list(nbrs):
+            self._remove_edge(dpid, nbr)
+        for src, src_nbrs in self.adj.items():
+            if dpid in src_nbrs:
+                self._remove_edge(src, dpid)
+        del self.adj[dpid]
+        self._trees.pop(dpid, None)
+
+    def add_link(self, src, src_port_no, dst, dst_port_no):
+        self.add_node(src)
+        self.add_node(dst)
+        ports = self.adj[src].get(dst)
+        if ports is None:
+            self.adj[src][dst] = set([(src_port_no, dst_port_no)])
+            self._edge_added(src, dst)
+        else:
+            ports.add((src_port_no, dst_port_no))
+
+    def remove_link(self, src, src_port_no, dst, dst_port_no):
+        ports = self.adj.get(src, {}).get(dst)
+        if ports is None:
+            return
+        ports.discard((src_port_no, dst_port_no))
+        if not ports:
+            self._remove_edge(src, dst)
+
+    def get_ports(self, src, dst):
+        """
+        Returns (src_port_no, dst_port_no) of the links from src to dst.
+        """
+        return sorted(self.adj.get(src, {}).get(dst, ()))
+
+    def _edge_added(self, u, v):
+        for src, tree in self._trees.items():
+            du = tree.dist.get(u)
+            if du is None:
+                continue
+            dv = tree.dist.get(v)
+            if dv is None or du + 1 < dv:
+                del self._trees[src]
+            elif du + 1 == dv:
+                # another shortest path.  the distances don't change.
+                tree.parents[v].append(u)
+        # a new edge can make a shorter path anywhere
+        self._k_paths.clear()
+        self._k_paths_edges.clear()
+
+    def _remove_edge(self, u, v):
+        del self.adj[u][v]
+        for src, tree in self._trees.items():
+            parents = tree.parents.get(v)
+            if not parents or u not in parents:
+                continue
+            if len(parents) > 1:
+                # v is still as near via the others
+                parents.remove(u)
+            else:
+                del self._trees[src]
+        for key in self._k_paths_edges.pop((u, v), ()):
+            self._k_paths.pop(key, None)
+
+    def _bfs(self, src):
+        dist = {src: 0}
+        parents = {src: []}
+        adj = self.adj
+        frontier = [src]
+        d = 0
+        while frontier:
+            d += 1
+            next_frontier = []
+            for u in frontier:
+                for v in adj[u]:
+                    dv = dist.get(v)
+                    if dv is None:
+                        dist[v] = d
+                        parents[v] = [u]
+                        next_frontier.append(v)
+                    elif dv == d:
+                        parents[v].append(u)
+            frontier = next_frontier
+        return _ShortestPathTree(dist, parents)
+
+    def _tree(self, src):
+        tree = self._trees.get(src)
+        if tree is None:
+            tree = self._trees[src] = self._bfs(src)
+        return tree
+
+    def shortest_path_lengths(self, src):
+        """
+        Returns a dict of dpid -> hops from src for all reachable dpids.
+        """
+        if src not in self.adj:
+            return {}
+        return dict(self._tree(src).dist)
+
+    def shortest_path(self, src, dst):
+        """
+        Returns a shortest path from src to dst, or None.
+        """
+        if src not in self.adj:
+            return None
+        parents = self._tree(src).parents
+        if dst not in parents:
+            return None
+        path = [dst]
+        while path[-1] != src:
+            path.append(parents[path[-1]][0])
+        path.reverse()
+        return path
+
+    def ecmp_paths(self, src, dst, limit=None):
+        """
+        Returns all shortest paths from src to dst, up to limit paths.
+        """
+        if src not in self.adj:
+            return []
+        parents = self._tree(src).parents
+        if dst not in parents:
+            return []
+        paths = []
+        # depth first from dst towards src
+        stack = [[dst]]
+        while stack and (limit is None or len(paths) < limit):
+            rpath = stack.pop()
+            u = rpath[-1]
+            if u == src:
+                paths.append(rpath[::-1])
+                continue
+            for p in reversed(parents[u]):
+                stack.append(rpath + [p])
+        return paths
+
+    def next_hops(self, src, dst):
+        """
+        Returns the dpids next to src on the shortest paths to dst.
+        """
+        if src == dst or src not in self.adj:
+            return []
+        tree = self._tree(src)
+        if dst not in tree.parents:
+            return []
+        # walk the shortest paths back from dst
+        hops = set()
+        seen = set([dst])
+        stack = [dst]
+        while stack:
+            u = stack.pop()
+            if tree.dist[u] == 1:
+                hops.add(u)
+                continue
+            for p in tree.parents[u]:
+                if p not in seen:
+                    seen.add(p)
+                    stack.append(p)
+        return sorted(hops)
+
+    def _bfs_path(self, src, dst, removed_nodes, removed_edges):
+        # a shortest path avoiding the given nodes and edges
+        parents = {src: None}
+        adj = self.adj
+        frontier = [src]
+        while frontier:
+            next_frontier = []
+            for u in frontier:
+                for v in adj[u]:
+                    if (v in parents or v in removed_nodes or
+                            (u, v) in removed_edges):
+                        continue
+                    parents[v] = u
+                    if v == dst:
+                        path = [v]
+                        while parents[path[-1]] is not None:
+                            path.append(parents[path[-1]])
+                        path.reverse()
+                        return path
+                    next_frontier.append(v)
+            frontier = next_frontier
+        return None
+
+    def k_shortest_paths(self, src, dst, k):
+        """
+        Returns up to k loopless paths from src to dst, shortest first.
+        """
+        key = (src, dst, k)
+        paths = self._k_paths.get(key)
+        if paths is None:
+            paths = self._yen(src, dst, k)
+            self._k_paths[key] = paths
+            for path in paths:
+                for edge in zip(path, path[1:]):
+                    self._k_paths_edges.setdefault(edge, set()).add(key)
+        return [list(path) for path in paths]
+
+    def _yen(self, src, dst, k):
+        # Yen's algorithm with BFS as every edge costs the same
+        path = self.shortest_path(src, dst)
+        if path is None or k < 1:
+            return []
+        paths = [tuple(path)]
+        candidates = []
+        seen = set(paths)
+        while len(paths) < k:
+            prev = paths[-1]
+            for i in range(len(prev) - 1):
+                root = prev[:i + 1]
+                removed_edges = set((p[i], p[i + 1]) for p in paths
+                                    if p[:i + 1] == root)
+                spur = self._bfs_path(prev[i], dst, set(root[:-1]),
+                                      removed_edges)
+                if spur is None:
+                    continue
+                path = root[:-1] + tuple(spur)
+                if path not in seen:
+                    seen.add(path)
+                    heapq.heappush(candidates, (len(path), path))
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates)[1])
+        return paths
+
+
+class TopologyGraph(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(TopologyGraph, self).__init__(*args, **kwargs)
+        self.name = 'topology_graph'
+        self.graph = Graph()
+
+    @set_ev_cls(event.EventSwitchEnter)
+    def _switch_enter_handler(self, ev):
+        self.graph.add_node(ev.switch.dp.id)
+
+    @set_ev_cls(event.EventSwitchLeave)
+    def _switch_leave_handler(self, ev):
+        self.graph.remove_node(ev.switch.dp.id)
+
+    @set_ev_cls(event.EventLinkAdd)
+    def _link_add_handler(self, ev):
+        link = ev.link
+        self.graph.add_link(link.src.dpid, link.src.port_no,
+                            link.dst.dpid, link.dst.port_no)
+
+    @set_ev_cls(event.EventLinkDelete)
+    def _link_delete_handler(self, ev):
+        link = ev.link
+        self.graph.remove_link(link.src.dpid, link.src.port_no,
+                               link.dst.dpid, link.dst.port_no)
+
+    @set_ev_cls(event.EventPathRequest)
+    def path_request_handler(self, req):
+        if req.ecmp:
+            paths = self.graph.ecmp_paths(req.src_dpid, req.dst_dpid)
+        else:
+            paths = self.graph.k_shortest_paths(req.src_dpid, req.dst_dpid,
+                                                req.k)
+        rep = event.EventPathReply(req.src, paths)
+        self.reply_to_request(req, rep)
@@ -0,0 +1,256 @@
+# Copyright (C) 2014 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Versioned snapshot of the topology.
+
+TopologySnapshot keeps the switches and links discovered by
+ryu.topology.switches as dicts ready to be serialized.  Every change
+increments the version, so that the JSON of a version is built only
+once and the changes since a version can be sent instead of the whole
+topology.
+"""
+
+import collections
+import itertools
+import json
+import logging
+import time
+
+from ryu.base import app_manager
+from ryu.controller.handler import set_ev_cls
+from ryu.topology import event
+
+
+LOG = logging.getLogger(__name__)
+
+# the number of changes kept for Snapshot.changes()
+DEFAULT_MAX_CHANGES = 4096
+
+
+def _link_key(link):
+    return (link.src.dpid, link.src.port_no, link.dst.dpid, link.dst.port_no)
+
+
+class Snapshot(object):
+    """
+    Switches and links of a version of the topology.
+
+    switches and links are dicts of switch dpid and
+    (src dpid, src port_no, dst dpid, dst port_no) to the dicts of
+    to_dict() and must not be modified.
+    """
+
+    def __init__(self, max_changes=DEFAULT_MAX_CHANGES):
+        super(Snapshot, self).__init__()
+        self.version = 0
+        # distinguishes the versions of this snapshot from those before
+        # a restart
+        self.epoch = int(time.time())
+        self.switches = {}
+        self.links = {}
+        # (version, kind, key, before, after) of each change
+        self._log = collections.deque(maxlen=max_changes)
+        self._json = {}
+        self._listeners = []
+
+    def register_listener(self, func):
+        """
+        Calls func without arguments after every change.
+        """
+        self._listeners.append(func)
+
+    def unregister_listener(self, func):
+        self._listeners.remove(func)
+
+    def _change(self, kind, key, after):
+        items = self.switches if kind == 'switch' else self.links
+        before = items.get(key)
+        if before == after:
+            return
+        if after is None:
+            del items[key]
+        else:
+            items[key] = after
+        self.version += 1
+        self._log.append((self.version, kind, key, before, after))
+        self._json.clear()
+        for func in self._listeners:
+            func()
+
+    def switch_enter(self, switch):
+        self._change('switch', switch.dp.id, switch.to_dict())
+
+    def switch_leave(self, switch):
+        self._change('switch', switch.dp.id, None)
+
+    def _update_port(self, port, port_dict):
+        # port_dict is None if the port is deleted
+        switch = self.switches.get(port.dpid)
+        if switch is None:
+            return
+        port_no = port.to_dict()['port_no']
+        after = dict(switch)
+        after['ports'] = [p for p in switch['ports']
+                          if p['port_no'] != port_no]
+        if port_dict is not None:
+            after['ports'].append(port_dict)
+        self._change('switch', port.dpid, after)
+
+    def port_add(self, port):
+        self._update_port(port, port.to_dict())
+
+    def port_delete(self, port):
+        self._update_port(port, None)
+
+    def port_modify(self, port):
+        self._update_port(port, port.to_dict())
+
+    def link_add(self, link):
+        self._change('link', _link_key(link), link.to_dict())
+
+    def link_delete(self, link):
+        self._change('link', _link_key(link), None)
+
+    def etag(self):
+        return '%x-%d' % (self.epoch, self.version)
+
+    def version_of(self, etag):
+        """
+        Returns the version of an etag() of this snapshot, or None if
+        it is of another epoch, e.g. from before a restart.
+
+        Raises ValueError if etag is malformed.
+        """
+        epoch, version = etag.strip('"').split('-')
+        version = int(version)
+        if int(epoch, 16) != self.epoch:
+            return None
+        return version
+
+    def _cached_json(self, key, build):
+        body = self._json.get(key)
+        if body is None:
+            body = self._json[key] = json.dumps(build())
+        return body
+
+    def switches_json(self, dpid=None):
+        """
+        Returns the JSON list of the switches, or of the switch of dpid.
+        """
+        def build():
+            return [self.switches[k] for k in sorted(self.switches)
+                    if dpid is None or k == dpid]
+        return self._cached_json(('switches', dpid), build)
+
+    def links_json(self, dpid=None):
+        """
+        Returns the JSON list of the links, or of the links from dpid.
+        """
+        def build():
+            return [self.links[k] for k in sorted(self.links)
+                    if dpid is None or k[0] == dpid]
+        return self._cached_json(('links', dpid), build)
+
+    def changes(self, since):
+        """
+        Returns a list of (name, dict) of the changes after the version
+        since, or None if they are not kept anymore.
+
+        name is one of 'switch_enter', 'switch_leave', 'switch_modify',
+        'link_add' and 'link_delete'.  Changes which cancel each other,
+        e.g. a link going down and up, are left out.
+        """
+        base = self._log[0][0] - 1 if self._log else self.version
+        if since < base or since > self.version:
+            return None
+
+        # the state before since and the latest one of each item
+        net = collections.OrderedDict()
+        for (_version, kind, key, before, after) in itertools.islice(
+                self._log, since - base, None):
+            prev = net.pop((kind, key), None)
+            if prev is not None:
+                before = prev[0]
+            net[(kind, key)] = (before, after)
+
+        changes = []
+        for (kind, _key), (before, after) in net.items():
+            if before == after:
+                continue
+            if kind == 'switch':
+                if before is None:
+                    changes.append(('switch_enter', after))
+                elif after is None:
+                    changes.append(('switch_leave', before))
+                else:
+                    changes.append(('switch_modify', after))
+            elif before is None:
+                changes.append(('link_add', after))
+            elif after is None:
+                changes.append(('link_delete', before))
+        return changes
+
+    def changes_json(self, since):
+        """
+        Returns the JSON object of the etag() and changes(since), or
+        None.
+        """
+        key = ('changes', since)
+        body = self._json.get(key)
+        if body is None:
+            changes = self.changes(since)
+            if changes is None:
+                return None
+            body = self._json[key] = json.dumps(
+                {'version': self.etag(),
+                 'changes': [{'event': name, 'data': data}
+                             for name, data in changes]})
+        return body
+
+
+class TopologySnapshot(app_manager.RyuApp):
+    def __init__(self, *args, **kwargs):
+        super(TopologySnapshot, self).__init__(*args, **kwargs)
+        self.name = 'topology_snapshot'
+        self.snapshot = Snapshot()
+
+    @set_ev_cls(event.EventSwitchEnter)
+    def _switch_enter_handler(self, ev):
+        self.snapshot.switch_enter(ev.switch)
+
+    @set_ev_cls(event.EventSwitchLeave)
+    def _switch_leave_handler(self, ev):
+        self.snapshot.switch_leave(ev.switch)
+
+    @set_ev_cls(event.EventPortAdd)
+    def _port_add_handler(self, ev):
+        self.snapshot.port_add(ev.port)
+
+    @set_ev_cls(event.EventPortDelete)
+    def _port_delete_handler(self, ev):
+        self.snapshot.port_delete(ev.port)
+
+    @set_ev_cls(event.EventPortModify)
+    def _port_modify_handler(self, ev):
+        self.snapshot.port_modify(ev.port)
+
+    @set_ev_cls(event.EventLinkAdd)
+    def _link_add_handler(self, ev):
+        self.snapshot.link_add(ev.link)
+
+    @set_ev_cls(event.EventLinkDelete)
+    def _link_delete_handler(self, ev):
+        self.snapshot.link_delete(ev.link)
@@ -13,6 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import heapq
+import itertools
 import logging
 import struct
 import time
@@ -29,7 +31,7 @@ from ryu.lib import addrconv, hub
 from ryu.lib.mac import DONTCARE_STR
 from ryu.lib.dpid import dpid_to_str, str_to_dpid
 from ryu.lib.port_no import port_no_to_str
-from ryu.lib.packet import packet, ethernet, lldp
+from ryu.lib.packet import packet, ethernet, lldp, packet_template
 from ryu.ofproto.ether import ETH_TYPE_LLDP
 from ryu.ofproto import ofproto_v1_0
 from ryu.ofproto import nx_match
@@ -205,54 +207,45 @@ class PortData(object):
 
 class PortDataState(dict):
     # dict: Port class -> PortData class
-    # slimed down version of OrderedDict as python 2.6 doesn't support it.
-    _PREV = 0
-    _NEXT = 1
-    _KEY = 2
+    # ports are scheduled in a heap of [deadline, seq, port] entries.
+    # an entry is invalidated, not removed, when its port is rescheduled
+    # or deleted, and skipped when it is popped.
+    _DEADLINE = 0
+    _PORT = 2
 
-    def __init__(self):
+    def __init__(self, period):
         super(PortDataState, self).__init__()
-        self._root = root = []          # sentinel node
-        root[:] = [root, root, None]    # [_PREV, _NEXT, _KEY]
-                                        # doubly linked list
-        self._map = {}
-
-    def _remove_key(self, key):
-        link_prev, link_next, key = self._map.pop(key)
-        link_prev[self._NEXT] = link_next
-        link_next[self._PREV] = link_prev
-
-    def _append_key(self, key):
-        root = self._root
-        last = root[self._PREV]
-        last[self._NEXT] = root[self._PREV] = self._map[key] = [last, root,
-                                                                key]
-
-    def _prepend_key(self, key):
-        root = self._root
-        first = root[self._NEXT]
-        first[self._PREV] = root[self._NEXT] = self._map[key] = [root, first,
-                                                                 key]
-
-    def _move_last_key(self, key):
-        self._remove_key(key)
-        self._append_key(key)
-
-    def _move_front_key(self, key):
-        self._remove_key(key)
-        self._prepend_key(key)
+        self.period = period
+        self._heap = []
+        self._entries = {}      # Port class -> heap entry
+        self._seq = itertools.count()
+
+    def _schedule(self, port, deadline):
+        self._cancel(port)
+        entry = [deadline, next(self._seq), port]
+        self._entries[port] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            # too many invalidated entries
+            self._heap = [e for e in self._heap if e[self._PORT] is not None]
+            heapq.heapify(self._heap)
+
+    def _cancel(self, port):
+        entry = self._entries.pop(port, None)
+        if entry is not None:
+            entry[self._PORT] = None
 
     def add_port(self, port, lldp_data):
         if port not in self:
-            self._prepend_key(port)
             self[port] = PortData(port.is_down(), lldp_data)
+            self._schedule(port, 0)
         else:
             self[port].is_down = port.is_down()
 
     def lldp_sent(self, port):
         port_data = self[port]
         port_data.lldp_sent()
-        self._move_last_key(port)
+        self._schedule(port, port_data.timestamp + self.period)
         return port_data
 
     def lldp_received(self, port):
@@ -262,7 +255,7 @@ class PortDataState(dict):
         port_data = self.get(port, None)
         if port_data is not None:
             port_data.clear_timestamp()
-            self._move_front_key(port)
+            self._schedule(port, 0)
 
     def set_down(self, port):
         is_down = port.is_down()
@@ -270,7 +263,7 @@ class PortDataState(dict):
         port_data.set_down(is_down)
         port_data.clear_timestamp()
         if not is_down:
-            self._move_front_key(port)
+            self._schedule(port, 0)
         return is_down
 
     def get_port(self, port):
@@ -278,38 +271,85 @@ class PortDataState(dict):
 
     def del_port(self, port):
         del self[port]
-        self._remove_key(port)
-
-    def __iter__(self):
-        root = self._root
-        curr = root[self._NEXT]
-        while curr is not root:
-            yield curr[self._KEY]
-            curr = curr[self._NEXT]
+        self._cancel(port)
+
+    def next_deadline(self):
+        """
+        Returns the time when the next LLDP packet is due, or None.
+        """
+        heap = self._heap
+        while heap and heap[0][self._PORT] is None:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0][self._DEADLINE]
+        return None
+
+    def pop_expired(self, now, limit):
+        """
+        Returns up to limit ports whose LLDP packets are due at now,
+        earliest first.  They remain due until lldp_sent() is called.
+        """
+        heap = self._heap
+        ports = []
+        while heap and len(ports) < limit:
+            entry = heap[0]
+            port = entry[self._PORT]
+            if port is None:
+                heapq.heappop(heap)
+                continue
+            if entry[self._DEADLINE] > now:
+                break
+            heapq.heappop(heap)
+            del self._entries[port]
+            ports.append(port)
+        return ports
 
     def clear(self):
-        for node in self._map.itervalues():
-            del node[:]
-        root = self._root
-        root[:] = [root, root, None]
-        self._map.clear()
+        self._heap = []
+        self._entries.clear()
         dict.clear(self)
 
-    def items(self):
-        'od.items() -> list of (key, value) pairs in od'
-        return [(key, self[key]) for key in self]
-
-    def iteritems(self):
-        'od.iteritems -> an iterator over the (key, value) pairs in od'
-        for k in self:
-            yield (k, self[k])
-
 
 class LinkState(dict):
     # dict: Link class -> timestamp
+    # _expiry is a heap of [timestamp, seq, link] entries, one per link.
+    # update_link() doesn't touch the heap, so the timestamp of an entry
+    # can be older than the link's.  such an entry is pushed again with
+    # the link's timestamp when it reaches the top.
+    _TIMESTAMP = 0
+    _LINK = 2
+
     def __init__(self):
         super(LinkState, self).__init__()
-        self._map = {}
+        self._map = {}          # src Port -> dst Port
+        self._rev_map = {}      # dst Port -> set of src Ports
+        self._expiry = []
+        self._entries = {}      # Link class -> heap entry
+        self._seq = itertools.count()
+
+    def _add_link(self, link, timestamp):
+        self[link] = timestamp
+        self._map[link.src] = link.dst
+        self._rev_map.setdefault(link.dst, set()).add(link.src)
+        self._push(link, timestamp)
+
+    def _push(self, link, timestamp):
+        entry = self._entries.get(link)
+        if entry is not None:
+            entry[self._LINK] = None
+        entry = [timestamp, next(self._seq), link]
+        self._entries[link] = entry
+        heapq.heappush(self._expiry, entry)
+
+    def _del_link(self, link):
+        del self[link]
+        if self._map.get(link.src) == link.dst:
+            del self._map[link.src]
+        srcs = self._rev_map[link.dst]
+        srcs.discard(link.src)
+        if not srcs:
+            del self._rev_map[link.dst]
+        self._entries.pop(link)[self._LINK] = None
 
     def get_peer(self, src):
         return self._map.get(src, None)
@@ -317,36 +357,70 @@ class LinkState(dict):
     def update_link(self, src, dst):
         link = Link(src, dst)
 
-        self[link] = time.time()
-        self._map[src] = dst
+        old_dst = self._map.get(src)
+        if old_dst is not None and old_dst != dst:
+            self._del_link(Link(src, old_dst))
+        if link in self:
+            self[link] = time.time()
+        else:
+            self._add_link(link, time.time())
 
         # return if the reverse link is also up or not
         rev_link = Link(dst, src)
         return rev_link in self
 
     def link_down(self, link):
-        del self[link]
-        del self._map[link.src]
+        self._del_link(link)
 
     def rev_link_set_timestamp(self, rev_link, timestamp):
         # rev_link may or may not in LinkSet
         if rev_link in self:
             self[rev_link] = timestamp
-
-    def port_deleted(self, src):
-        dst = self.get_peer(src)
-        if dst is None:
-            raise KeyError()
-
-        link = Link(src, dst)
-        rev_link = Link(dst, src)
-        del self[link]
-        del self._map[src]
-        # reverse link might not exist
-        self.pop(rev_link, None)
-        rev_link_dst = self._map.pop(dst, None)
-
-        return dst, rev_link_dst
+            if timestamp < self._entries[rev_link][self._TIMESTAMP]:
+                self._push(rev_link, timestamp)
+
+    def port_deleted(self, port):
+        """
+        Delete the links from and to port.
+
+        Returns the deleted links.
+        """
+        links = []
+        dst = self._map.get(port)
+        if dst is not None:
+            links.append(Link(port, dst))
+        for src in self._rev_map.get(port, ()):
+            links.append(Link(src, port))
+        for link in links:
+            self._del_link(link)
+        return links
+
+    def expired(self, timestamp):
+        """
+        Returns the links which have not been updated since timestamp.
+
+        The cost is proportional to the number of such links, not to
+        the number of all links.
+        """
+        heap = self._expiry
+        links = []
+        stale = []
+        while heap and heap[0][self._TIMESTAMP] < timestamp:
+            entry = heapq.heappop(heap)
+            link = entry[self._LINK]
+            if link is None:
+                # deleted or pushed again
+                continue
+            entry[self._TIMESTAMP] = self[link]
+            if entry[self._TIMESTAMP] < timestamp:
+                links.append(link)
+                stale.append(entry)
+            else:
+                heapq.heappush(heap, entry)
+        # they are still alive until link_down()
+        for entry in stale:
+            heapq.heappush(heap, entry)
+        return links
 
 
 class LLDPPacket(object):
@@ -362,15 +436,14 @@ class LLDPPacket(object):
     class LLDPUnknownFormat(RyuException):
         message = '%(msg)s'
 
-    @staticmethod
-    def lldp_packet(dpid, port_no, dl_addr, ttl):
-        pkt = packet.Packet()
+    _TEMPLATE = None
 
+    @staticmethod
+    def _lldp_protocols(dpid, port_no, dl_addr, ttl):
         dst = lldp.LLDP_MAC_NEAREST_BRIDGE
         src = dl_addr
         ethertype = ETH_TYPE_LLDP
         eth_pkt = ethernet.ethernet(dst, src, ethertype)
-        pkt.add_protocol(eth_pkt)
 
         tlv_chassis_id = lldp.ChassisID(
             subtype=lldp.ChassisID.SUB_LOCALLY_ASSIGNED,
@@ -387,14 +460,33 @@ class LLDPPacket(object):
 
         tlvs = (tlv_chassis_id, tlv_port_id, tlv_ttl, tlv_end)
         lldp_pkt = lldp.lldp(tlvs)
-        pkt.add_protocol(lldp_pkt)
+        return [eth_pkt, lldp_pkt]
 
-        pkt.serialize()
-        return pkt.data
+    @staticmethod
+    def lldp_packet(dpid, port_no, dl_addr, ttl):
+        # the frames differ only in the fixed-size fields below,
+        # so patch a template instead of serializing a new packet.
+        if LLDPPacket._TEMPLATE is None:
+            LLDPPacket._TEMPLATE = packet_template.PacketTemplate(
+                LLDPPacket._lldp_protocols(0, 0, DONTCARE_STR, 0),
+                src=(ethernet.ethernet, 'src'),
+                chassis_id=(lldp.lldp, 'chassis_id'),
+                port_id=(lldp.lldp, 'port_id'),
+                ttl=(lldp.lldp, 'ttl'))
+
+        return LLDPPacket._TEMPLATE.build(
+            src=dl_addr,
+            chassis_id=LLDPPacket.CHASSIS_ID_FMT % dpid_to_str(dpid),
+            port_id=struct.pack(LLDPPacket.PORT_ID_STR, port_no),
+            ttl=ttl)
 
     @staticmethod
     def lldp_parse(data):
-        pkt = packet.Packet(data)
+        # data is the raw frame or a decoded Packet
+        if isinstance(data, packet.Packet):
+            pkt = data
+        else:
+            pkt = packet.Packet(data)
         i = iter(pkt)
         eth_pkt = i.next()
         assert type(eth_pkt) == ethernet.ethernet
@@ -437,8 +529,10 @@ class Switches(app_manager.RyuApp):
     DEFAULT_TTL = 120  # unused. ignored.
     LLDP_PACKET_LEN = len(LLDPPacket.lldp_packet(0, 0, DONTCARE_STR, 0))
 
-    LLDP_SEND_GUARD = .05
+    LLDP_SEND_GUARD = .05   # unused. ignored.
     LLDP_SEND_PERIOD_PER_PORT = .9
+    LLDP_SEND_PPS = 1000    # LLDP packets per second for all ports
+    LLDP_SEND_BURST = 100   # max LLDP packets sent at once
     TIMEOUT_CHECK_PERIOD = 5.
     LINK_TIMEOUT = TIMEOUT_CHECK_PERIOD * 2
     LINK_LLDP_DROP = 5
@@ -449,7 +543,8 @@ class Switches(app_manager.RyuApp):
         self.name = 'switches'
         self.dps = {}                 # datapath_id => Datapath class
         self.port_state = {}          # datapath_id => ports
-        self.ports = PortDataState()  # Port class -> PortData class
+        # Port class -> PortData class
+        self.ports = PortDataState(self.LLDP_SEND_PERIOD_PER_PORT)
         self.links = LinkState()      # Link class -> timestamp
         self.is_active = True
 
@@ -505,18 +600,10 @@ class Switches(app_manager.RyuApp):
         #           port.dpid, port.port_no, port.is_live())
 
     def _link_down(self, port):
-        try:
-            dst, rev_link_dst = self.links.port_deleted(port)
-        except KeyError:
-            # LOG.debug('key error. src=%s, dst=%s',
-            #           port, self.links.get_peer(port))
-            return
-        link = Link(port, dst)
-        self.send_event_to_observers(event.EventLinkDelete(link))
-        if rev_link_dst:
-            rev_link = Link(dst, rev_link_dst)
-            self.send_event_to_observers(event.EventLinkDelete(rev_link))
-        self.ports.move_front(dst)
+        for link in self.links.port_deleted(port):
+            self.send_event_to_observers(event.EventLinkDelete(link))
+            peer = link.dst if link.src == port else link.src
+            self.ports.move_front(peer)
 
     @set_ev_cls(ofp_event.EventOFPStateChange,
                 [MAIN_DISPATCHER, DEAD_DISPATCHER])
@@ -686,7 +773,7 @@ class Switches(app_manager.RyuApp):
 
         msg = ev.msg
         try:
-            src_dpid, src_port_no = LLDPPacket.lldp_parse(msg.data)
+            src_dpid, src_port_no = LLDPPacket.lldp_parse(ev.packet)
         except LLDPPacket.LLDPUnknownFormat as e:
             # This handler can receive all the packtes which can be
             # not-LLDP packet. Ignore it silently
@@ -738,66 +825,89 @@ class Switches(app_manager.RyuApp):
         if self.explicit_drop:
             self._drop_packet(msg)
 
-    def send_lldp_packet(self, port):
-        try:
-            port_data = self.ports.lldp_sent(port)
-        except KeyError as e:
-            # ports can be modified during our sleep in self.lldp_loop()
-            # LOG.debug('send_lldp: KeyError %s', e)
-            return
-        if port_data.is_down:
-            return
-
-        dp = self.dps.get(port.dpid, None)
-        if dp is None:
-            # datapath was already deleted
-            return
-
-        # LOG.debug('lldp sent dpid=%s, port_no=%d', dp.id, port.port_no)
+    @staticmethod
+    def _lldp_packet_out(dp, port_no, data):
         # TODO:XXX
         if dp.ofproto.OFP_VERSION == ofproto_v1_0.OFP_VERSION:
-            actions = [dp.ofproto_parser.OFPActionOutput(port.port_no)]
-            dp.send_packet_out(actions=actions, data=port_data.lldp_data)
+            actions = [dp.ofproto_parser.OFPActionOutput(port_no)]
+            return dp.ofproto_parser.OFPPacketOut(
+                datapath=dp, buffer_id=0xffffffff,
+                in_port=dp.ofproto.OFPP_NONE, actions=actions, data=data)
         elif dp.ofproto.OFP_VERSION >= ofproto_v1_2.OFP_VERSION:
-            actions = [dp.ofproto_parser.OFPActionOutput(port.port_no)]
-            out = dp.ofproto_parser.OFPPacketOut(
+            actions = [dp.ofproto_parser.OFPActionOutput(port_no)]
+            return dp.ofproto_parser.OFPPacketOut(
                 datapath=dp, in_port=dp.ofproto.OFPP_CONTROLLER,
                 buffer_id=dp.ofproto.OFP_NO_BUFFER, actions=actions,
-                data=port_data.lldp_data)
-            dp.send_msg(out)
+                data=data)
         else:
             LOG.error('cannot send lldp packet. unsupported version. %x',
                       dp.ofproto.OFP_VERSION)
 
+    def send_lldp_packet(self, port):
+        self.send_lldp_packets([port])
+
+    def send_lldp_packets(self, ports):
+        """
+        Send LLDP packets to ports.
+
+        The PacketOuts to the ports of a datapath are sent in a single
+        write.  Returns the number of LLDP packets sent.
+        """
+        msgs = {}   # dpid -> PacketOuts
+        for port in ports:
+            try:
+                port_data = self.ports.lldp_sent(port)
+            except KeyError as e:
+                # ports can be modified while sending to other datapaths
+                # LOG.debug('send_lldp: KeyError %s', e)
+                continue
+            if port_data.is_down:
+                continue
+
+            dp = self.dps.get(port.dpid, None)
+            if dp is None:
+                # datapath was already deleted
+                continue
+
+            # LOG.debug('lldp sent dpid=%s, port_no=%d', dp.id, port.port_no)
+            out = self._lldp_packet_out(dp, port.port_no, port_data.lldp_data)
+            if out is not None:
+                msgs.setdefault(dp.id, []).append(out)
+
+        sent = 0
+        for dpid, outs in msgs.iteritems():
+            dp = self.dps.get(dpid, None)
+            if dp is None:
+                continue
+            dp.send_msgs(outs, barrier=False)
+            sent += len(outs)
+        return sent
+
     def lldp_loop(self):
+        # the LLDP packets due are sent in bursts at LLDP_SEND_PPS on
+        # average, instead of one per LLDP_SEND_GUARD.
+        tokens = self.LLDP_SEND_BURST
+        last = time.time()
         while self.is_active:
             self.lldp_event.clear()
 
             now = time.time()
-            timeout = None
-            ports_now = []
-            ports = []
-            for (key, data) in self.ports.items():
-                if data.timestamp is None:
-                    ports_now.append(key)
-                    continue
-
-                expire = data.timestamp + self.LLDP_SEND_PERIOD_PER_PORT
-                if expire <= now:
-                    ports.append(key)
-                    continue
-
-                timeout = expire - now
-                break
-
-            for port in ports_now:
-                self.send_lldp_packet(port)
-            for port in ports:
-                self.send_lldp_packet(port)
-                hub.sleep(self.LLDP_SEND_GUARD)      # don't burst
-
-            if timeout is not None and ports:
-                timeout = 0     # We have already slept
+            tokens = min(self.LLDP_SEND_BURST,
+                         tokens + (now - last) * self.LLDP_SEND_PPS)
+            last = now
+            ports = self.ports.pop_expired(now, int(tokens))
+            if ports:
+                tokens -= len(ports)
+                self.send_lldp_packets(ports)
+
+            deadline = self.ports.next_deadline()
+            if deadline is None:
+                timeout = None
+            elif deadline <= now:
+                # more ports are due.  wait for the next burst.
+                timeout = (self.LLDP_SEND_BURST - tokens) / self.LLDP_SEND_PPS
+            else:
+                timeout = deadline - now
             # LOG.debug('lldp sleep %s', timeout)
             self.lldp_event.wait(timeout=timeout)
 
@@ -807,15 +917,15 @@ class Switches(app_manager.RyuApp):
 
             now = time.time()
             deleted = []
-            for (link, timestamp) in self.links.items():
-                # LOG.debug('%s timestamp %d (now %d)', link, timestamp, now)
-                if timestamp + self.LINK_TIMEOUT < now:
-                    src = link.src
-                    if src in self.ports:
-                        port_data = self.ports.get_port(src)
-                        # LOG.debug('port_data %s', port_data)
-                        if port_data.lldp_dropped() > self.LINK_LLDP_DROP:
-                            deleted.append(link)
+            for link in self.links.expired(now - self.LINK_TIMEOUT):
+                # LOG.debug('%s timestamp %d (now %d)', link,
+                #           self.links[link], now)
+                src = link.src
+                if src in self.ports:
+                    port_data = self.ports.get_port(src)
+                    # LOG.debug('port_data %s', port_data)
+                    if port_data.lldp_dropped() > self.LINK_LLDP_DROP:
+                        deleted.append(link)
 
             for link in deleted:
                 self.links.link_down(link)